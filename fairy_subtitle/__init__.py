@@ -10,20 +10,48 @@ __version__ = "1.0.0"
 __author__ = "baby2016"
 __email__ = "2185823427@qq.com"
 
-from fairy_subtitle.exceptions import (
-    FormatError,
-    InvalidSubtitleContentError,
-    InvalidTimeFormatError,
-    ParseError,
-    SubtitleError,
-    UnsupportedFormatError,
-)
-from fairy_subtitle.models import Cue
-from fairy_subtitle.subtitle import SubtitleLoader
+import importlib
+
+# 公开名称 -> 所在模块，首次访问时才导入，避免 import fairy_subtitle 时加载全部解析器
+# Public name -> defining module, imported on first access
+_lazy_exports = {
+    "SubtitleLoader": "fairy_subtitle.subtitle",
+    "Cue": "fairy_subtitle.models",
+    "SubtitleTrackSet": "fairy_subtitle.tracks",
+    "SubtitleWatcher": "fairy_subtitle.watch",
+    "SubtitleIndex": "fairy_subtitle.search",
+    "export_dataset": "fairy_subtitle.dataset",
+    "SimilarityIndex": "fairy_subtitle.similar",
+    "LiveSubtitle": "fairy_subtitle.live",
+    "AssText": "fairy_subtitle.ass_text",
+    "SharedSubtitle": "fairy_subtitle.shared",
+    "Diagnostic": "fairy_subtitle.diagnostics",
+    "SubtitleFormat": "fairy_subtitle.registry",
+    "register_format": "fairy_subtitle.registry",
+    "profile": "fairy_subtitle.profiling",
+    "SubtitleError": "fairy_subtitle.exceptions",
+    "FormatError": "fairy_subtitle.exceptions",
+    "ParseError": "fairy_subtitle.exceptions",
+    "UnsupportedFormatError": "fairy_subtitle.exceptions",
+    "InvalidTimeFormatError": "fairy_subtitle.exceptions",
+    "InvalidSubtitleContentError": "fairy_subtitle.exceptions",
+}
 
 __all__ = [
     "SubtitleLoader",
     "Cue",
+    "SubtitleTrackSet",
+    "SubtitleWatcher",
+    "SubtitleIndex",
+    "export_dataset",
+    "SimilarityIndex",
+    "LiveSubtitle",
+    "AssText",
+    "SharedSubtitle",
+    "Diagnostic",
+    "SubtitleFormat",
+    "register_format",
+    "profile",
     "SubtitleError",
     "FormatError",
     "ParseError",
@@ -31,3 +59,16 @@ __all__ = [
     "InvalidTimeFormatError",
     "InvalidSubtitleContentError",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _lazy_exports.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value  # 缓存，之后的访问不再经过 __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_exports))
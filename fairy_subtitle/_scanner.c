@@ -0,0 +1,324 @@
+/*
+ * fairy_subtitle/_scanner.c
+ *
+ * 可选的 SRT/VTT 字幕块扫描器 C 实现，与 fairy_subtitle/formats/scanner.py 中的
+ * 纯 Python 实现输出完全一致。
+ * Optional C implementation of the SRT/VTT block scanner. Its output is identical
+ * to the pure-Python implementation in fairy_subtitle/formats/scanner.py.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+/* 每个时间字段最多 9 位数字 / At most 9 digits per time field */
+#define MAX_DIGITS 9
+
+typedef struct {
+    long long *data;
+    Py_ssize_t size;
+    Py_ssize_t capacity;
+} Buffer;
+
+static int
+buffer_append(Buffer *buffer, long long value)
+{
+    if (buffer->size == buffer->capacity) {
+        Py_ssize_t capacity = buffer->capacity ? buffer->capacity * 2 : 256;
+        long long *data = PyMem_Realloc(buffer->data, capacity * sizeof(long long));
+        if (data == NULL) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        buffer->data = data;
+        buffer->capacity = capacity;
+    }
+    buffer->data[buffer->size++] = value;
+    return 0;
+}
+
+static PyObject *
+buffer_to_array(Buffer *buffer, PyObject *array_type)
+{
+    PyObject *bytes = PyBytes_FromStringAndSize(
+        (const char *)buffer->data, buffer->size * (Py_ssize_t)sizeof(long long));
+    if (bytes == NULL) {
+        return NULL;
+    }
+    PyObject *result = PyObject_CallFunction(array_type, "sO", "q", bytes);
+    Py_DECREF(bytes);
+    return result;
+}
+
+/* 解析一个数字字段，失败返回 -1 / Parses one digit field, -1 on failure */
+static long long
+parse_digits(int kind, const void *data, Py_ssize_t *pos, Py_ssize_t end)
+{
+    long long value = 0;
+    int digits = 0;
+    Py_ssize_t i = *pos;
+    while (i < end) {
+        Py_UCS4 ch = PyUnicode_READ(kind, data, i);
+        if (ch < '0' || ch > '9') {
+            break;
+        }
+        if (++digits > MAX_DIGITS) {
+            return -1;
+        }
+        value = value * 10 + (ch - '0');
+        i++;
+    }
+    if (digits == 0) {
+        return -1;
+    }
+    *pos = i;
+    return value;
+}
+
+/* 解析 [HH:]MM:SS<decimal>mmm 格式的时间戳为毫秒，失败返回 -1
+ * Parses a [HH:]MM:SS<decimal>mmm timestamp into milliseconds, -1 on failure */
+static long long
+parse_timestamp(int kind, const void *data, Py_ssize_t *pos, Py_ssize_t end,
+                Py_UCS4 decimal)
+{
+    long long fields[3];
+    int count = 0;
+    Py_ssize_t i = *pos;
+
+    for (;;) {
+        long long value = parse_digits(kind, data, &i, end);
+        if (value < 0) {
+            return -1;
+        }
+        fields[count++] = value;
+        if (count < 3 && i < end && PyUnicode_READ(kind, data, i) == ':') {
+            i++;
+            continue;
+        }
+        break;
+    }
+    if (count < 2 || i >= end || PyUnicode_READ(kind, data, i) != decimal) {
+        return -1;
+    }
+    i++;
+    long long fraction = parse_digits(kind, data, &i, end);
+    if (fraction < 0) {
+        return -1;
+    }
+
+    *pos = i;
+    if (count == 3) {
+        return fields[0] * 3600000 + fields[1] * 60000 + fields[2] * 1000 + fraction;
+    }
+    return fields[0] * 60000 + fields[1] * 1000 + fraction;
+}
+
+static Py_ssize_t
+skip_blanks(int kind, const void *data, Py_ssize_t i, Py_ssize_t end)
+{
+    while (i < end) {
+        Py_UCS4 ch = PyUnicode_READ(kind, data, i);
+        if (ch != ' ' && ch != '\t') {
+            break;
+        }
+        i++;
+    }
+    return i;
+}
+
+/* 解析时间轴行，成功时写入开始/结束毫秒和设置的起始位置
+ * Parses a timing line, storing start/end milliseconds and the settings offset */
+static int
+parse_timing(int kind, const void *data, Py_ssize_t i, Py_ssize_t end,
+             Py_UCS4 decimal, long long *start, long long *stop,
+             Py_ssize_t *settings)
+{
+    *start = parse_timestamp(kind, data, &i, end, decimal);
+    if (*start < 0) {
+        return -1;
+    }
+    i = skip_blanks(kind, data, i, end);
+    if (i + 3 > end || PyUnicode_READ(kind, data, i) != '-' ||
+        PyUnicode_READ(kind, data, i + 1) != '-' ||
+        PyUnicode_READ(kind, data, i + 2) != '>') {
+        return -1;
+    }
+    i = skip_blanks(kind, data, i + 3, end);
+    *stop = parse_timestamp(kind, data, &i, end, decimal);
+    if (*stop < 0) {
+        return -1;
+    }
+    *settings = i;
+    return 0;
+}
+
+static int
+contains_arrow(int kind, const void *data, Py_ssize_t i, Py_ssize_t end)
+{
+    for (; i + 3 <= end; i++) {
+        if (PyUnicode_READ(kind, data, i) == '-' &&
+            PyUnicode_READ(kind, data, i + 1) == '-' &&
+            PyUnicode_READ(kind, data, i + 2) == '>') {
+            return 1;
+        }
+    }
+    return 0;
+}
+
+enum { STARTS, ENDS, BLOCK_STARTS, TIMING_STARTS, SETTINGS_STARTS, TEXT_STARTS,
+       BLOCK_ENDS, N_COLUMNS };
+
+typedef struct {
+    long long start;
+    long long end;
+    Py_ssize_t block_start;
+    Py_ssize_t timing_start;
+    Py_ssize_t settings_start;
+    Py_ssize_t text_start;
+    Py_ssize_t block_end;
+} Block;
+
+static int
+emit_block(Buffer *columns, const Block *block)
+{
+    Py_ssize_t text_start = block->text_start < 0 ? block->block_end : block->text_start;
+    return (buffer_append(&columns[STARTS], block->start) ||
+            buffer_append(&columns[ENDS], block->end) ||
+            buffer_append(&columns[BLOCK_STARTS], block->block_start) ||
+            buffer_append(&columns[TIMING_STARTS], block->timing_start) ||
+            buffer_append(&columns[SETTINGS_STARTS], block->settings_start) ||
+            buffer_append(&columns[TEXT_STARTS], text_start) ||
+            buffer_append(&columns[BLOCK_ENDS], block->block_end)) ? -1 : 0;
+}
+
+static PyObject *
+scan_blocks(PyObject *module, PyObject *args)
+{
+    PyObject *text;
+    Py_UCS4 decimal;
+    PyObject *result = NULL;
+    Buffer columns[N_COLUMNS] = {{0}};
+
+    if (!PyArg_ParseTuple(args, "UC:scan_blocks", &text, &decimal)) {
+        return NULL;
+    }
+#if PY_VERSION_HEX < 0x030C0000
+    if (PyUnicode_READY(text) < 0) {
+        return NULL;
+    }
+#endif
+
+    int kind = PyUnicode_KIND(text);
+    const void *data = PyUnicode_DATA(text);
+    Py_ssize_t length = PyUnicode_GET_LENGTH(text);
+
+    Block block = {0};
+    int in_block = 0;
+    int timing_found = 0;
+    int text_pending = 0;
+    Py_ssize_t line_start = 0;
+
+    while (line_start <= length) {
+        Py_ssize_t line_end = line_start;
+        while (line_end < length && PyUnicode_READ(kind, data, line_end) != '\n') {
+            line_end++;
+        }
+
+        Py_ssize_t first = line_start;
+        while (first < line_end && Py_UNICODE_ISSPACE(PyUnicode_READ(kind, data, first))) {
+            first++;
+        }
+
+        if (first == line_end) {
+            /* 空行结束当前字幕块 / A blank line closes the current block */
+            if (in_block) {
+                if (emit_block(columns, &block) < 0) {
+                    goto done;
+                }
+                in_block = 0;
+            }
+        }
+        else {
+            Py_ssize_t last = line_end;
+            while (Py_UNICODE_ISSPACE(PyUnicode_READ(kind, data, last - 1))) {
+                last--;
+            }
+            if (!in_block) {
+                in_block = 1;
+                timing_found = 0;
+                text_pending = 0;
+                block.start = block.end = -1;
+                block.block_start = first;
+                block.timing_start = block.settings_start = block.text_start = -1;
+            }
+            if (text_pending) {
+                block.text_start = line_start;
+                text_pending = 0;
+            }
+            if (!timing_found && contains_arrow(kind, data, first, line_end)) {
+                timing_found = 1;
+                text_pending = 1;
+                block.timing_start = first;
+                if (parse_timing(kind, data, first, line_end, decimal, &block.start,
+                                 &block.end, &block.settings_start) < 0) {
+                    block.start = block.end = -2;
+                    block.settings_start = -1;
+                }
+            }
+            block.block_end = last;
+        }
+        line_start = line_end + 1;
+    }
+    if (in_block && emit_block(columns, &block) < 0) {
+        goto done;
+    }
+
+    PyObject *array_module = PyImport_ImportModule("array");
+    if (array_module == NULL) {
+        goto done;
+    }
+    PyObject *array_type = PyObject_GetAttrString(array_module, "array");
+    Py_DECREF(array_module);
+    if (array_type == NULL) {
+        goto done;
+    }
+    result = PyTuple_New(N_COLUMNS);
+    if (result != NULL) {
+        for (int c = 0; c < N_COLUMNS; c++) {
+            PyObject *column = buffer_to_array(&columns[c], array_type);
+            if (column == NULL) {
+                Py_CLEAR(result);
+                break;
+            }
+            PyTuple_SET_ITEM(result, c, column);
+        }
+    }
+    Py_DECREF(array_type);
+
+done:
+    for (int c = 0; c < N_COLUMNS; c++) {
+        PyMem_Free(columns[c].data);
+    }
+    return result;
+}
+
+static PyMethodDef scanner_methods[] = {
+    {"scan_blocks", scan_blocks, METH_VARARGS,
+     "scan_blocks(text, decimal) -> tuple of seven array('q') columns\n\n"
+     "Splits text into blank-line separated blocks and parses the first\n"
+     "timing line of each block."},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef scanner_module = {
+    PyModuleDef_HEAD_INIT,
+    "_scanner",
+    "C implementation of the SRT/VTT block scanner.",
+    -1,
+    scanner_methods,
+};
+
+PyMODINIT_FUNC
+PyInit__scanner(void)
+{
+    return PyModule_Create(&scanner_module);
+}
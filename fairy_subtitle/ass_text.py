@@ -0,0 +1,300 @@
+# fairy_subtitle/ass_text.py
+# ASS 字幕文本的覆盖标签 ({\k20}、{\pos(10,20)}、{\t(...)} 等) 解析，以及卡拉 OK 音节时间
+# ASS override tags ({\k20}, {\pos(10,20)}, {\t(...)} ...) and karaoke syllable timings
+#
+# 一行文本被切分为若干 Segment(tags, text)：tags 是紧挨在文本前面的覆盖标签，
+# text 是到下一个覆盖块为止的文本 (\N、\h 等保持原样)。
+# A line is split into Segment(tags, text) pairs: the override tags right before a
+# span of text, and the text up to the next override block (\N, \h kept as is).
+
+import re
+from array import array
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import NamedTuple
+
+from .models import Subtitle
+
+# 已知的标签名，较长的名称在前，使 \fscx 不会被当作 \fs 加参数 cx
+# Known tag names, longest first so \fscx is not read as \fs with value "cx"
+_TAG_NAMES = sorted(
+    (
+        "alpha 1a 2a 3a 4a 1c 2c 3c 4c c bord xbord ybord shad xshad yshad blur be "
+        "fscx fscy fsp fs fn fe frx fry frz fr fax fay an a kf ko kt k K q r "
+        "pos move org fade fad clip iclip t pbo p b i u s"
+    ).split(),
+    key=len,
+    reverse=True,
+)
+# 覆盖块 / Override blocks
+_OVERRIDE = re.compile(r"\{([^}]*)\}")
+# 覆盖块中的一个标签：名称，以及括号参数 (允许一层嵌套，如 \t(\clip(...))) 或直到下一个 \ 的值
+# One tag: its name, then parenthesized arguments (one nesting level allowed) or
+# a value running to the next backslash
+_TAG = re.compile(
+    r"\\(?:(%s)|([A-Za-z]+|\d[A-Za-z]+))(\((?:[^()]|\([^()]*\))*\)?|[^\\]*)"
+    % "|".join(map(re.escape, _TAG_NAMES))
+)
+# 卡拉 OK 标签 / Karaoke tags
+_KARAOKE = frozenset(("k", "K", "kf", "ko"))
+
+
+class Tag(NamedTuple):
+    """An override tag, e.g. \\pos(10,20) -> Tag("pos", ("10", "20"))
+    一个覆盖标签"""
+
+    name: str
+    args: tuple  # Parenthesized arguments, or a single value ("" when absent)
+
+
+class Segment(NamedTuple):
+    """Override tags followed by the text they apply to
+    覆盖标签及其后面的文本"""
+
+    tags: tuple  # Tag objects, in order
+    text: str  # Text up to the next override block
+
+
+@lru_cache(maxsize=65536)
+def tokenize_ass(text: str) -> tuple:
+    """
+    Splits an ASS dialogue text into Segment(tags, text) pairs.
+    把 ASS 对白文本切分为 Segment(tags, text)。
+
+    Consecutive override blocks are merged into one segment; tags at the end of a
+    line give a final segment with empty text. Braces without a backslash (comments)
+    are dropped. Results are cached by text, and identical texts share one result.
+    相邻的覆盖块合并到同一段；行尾的标签产生文本为空的最后一段。不含反斜杠的花括号
+    (注释) 被忽略。结果按文本缓存，相同的文本共享同一个结果。
+    """
+    parts = _OVERRIDE.split(text)
+    if len(parts) == 1:
+        return (Segment((), text),)
+    segments = []
+    if parts[0]:
+        segments.append(Segment((), parts[0]))
+    tags = []
+    for i in range(1, len(parts), 2):
+        block = parts[i]
+        if "\\" in block:
+            tags += _parse_block(block)
+        if parts[i + 1]:
+            segments.append(Segment(tuple(tags), parts[i + 1]))
+            tags = []
+    if tags:
+        segments.append(Segment(tuple(tags), ""))
+    return tuple(segments)
+
+
+def strip_overrides(text: str) -> str:
+    """
+    Returns the text without override blocks, with \\N / \\n as line breaks and
+    \\h as a no-break space.
+    返回去掉覆盖块的文本，\\N / \\n 转为换行，\\h 转为不换行空格。
+    """
+    if "{" in text:
+        text = "".join(segment.text for segment in tokenize_ass(text))
+    if "\\" in text:
+        text = text.replace("\\N", "\n").replace("\\n", "\n").replace("\\h", "\u00a0")
+    return text
+
+
+@dataclass
+class KaraokeTable:
+    """
+    Karaoke syllables of a whole subtitle, stored column by column.
+    整个字幕的卡拉 OK 音节，按列存储。
+    """
+
+    cue: array = field(default_factory=lambda: array("q"))  # Cue position
+    start: array = field(default_factory=lambda: array("d"))  # Absolute start (s)
+    end: array = field(default_factory=lambda: array("d"))  # Absolute end (s)
+    kind: list = field(default_factory=list)  # "k", "K", "kf" or "ko"
+    text: list = field(default_factory=list)  # Syllable text, overrides removed
+
+    def __len__(self) -> int:
+        return len(self.cue)
+
+
+class AssText:
+    """
+    Override-tag model of every cue of a subtitle, tokenized once.
+    字幕中每个字幕块的覆盖标签模型，只解析一次。
+
+    The segments of a cue are cached and re-tokenized only when the cue's text
+    changes, so the object can be kept while the subtitle is edited.
+    每个字幕块的分段被缓存，只有文本变化时才重新解析，因此编辑字幕期间可以一直使用同一个对象。
+
+    Example:
+        model = AssText(subtitle)
+        for segment in model[0]:
+            print(segment.tags, segment.text)
+        syllables = model.karaoke()
+    """
+
+    def __init__(self, subtitle: Subtitle):
+        self.subtitle = subtitle
+        self._texts = []
+        self._segments = []
+        # 每个字幕块相对其开始时间的卡拉 OK 音节，尚未计算时为 None
+        # Karaoke syllables of each cue relative to its start, None until computed
+        self._syllables = []
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._segments)
+
+    def __getitem__(self, index: int) -> tuple:
+        """Segments of the cue at index
+        指定位置字幕块的分段"""
+        text = self.subtitle.cues[index].text
+        if len(self._texts) != len(self.subtitle.cues):
+            self.refresh()
+        if self._texts[index] is not text:
+            self._update(index, text)
+        return self._segments[index]
+
+    def refresh(self) -> "AssText":
+        """
+        Re-tokenizes the cues whose text changed, after cues were inserted or removed.
+        在插入或删除字幕块后，重新解析文本发生变化的字幕块。
+        """
+        cues = self.subtitle.cues
+        # 文本 -> (分段, 音节)，已解析过的文本直接复用
+        # Text -> (segments, syllables), texts parsed before are reused
+        old = {}
+        for text, segments, syllables in zip(
+            self._texts, self._segments, self._syllables
+        ):
+            old[text] = (segments, syllables)
+        texts = [cue.text for cue in cues]
+        segments = []
+        syllables = []
+        for text in texts:
+            result = old.get(text)
+            if result is None:
+                result = old[text] = (tokenize_ass(text), None)
+            segments.append(result[0])
+            syllables.append(result[1])
+        self._texts = texts
+        self._segments = segments
+        self._syllables = syllables
+        return self
+
+    def _update(self, index: int, text: str):
+        """Re-tokenizes the cue at index after its text changed"""
+        self._texts[index] = text
+        self._segments[index] = tokenize_ass(text)
+        self._syllables[index] = None
+
+    def plain_text(self, index: int) -> str:
+        """Text of the cue at index without override tags
+        指定位置字幕块去掉覆盖标签后的文本"""
+        return strip_overrides("".join(segment.text for segment in self[index]))
+
+    def karaoke(self) -> KaraokeTable:
+        """
+        Returns the karaoke syllables (\\k, \\K, \\kf, \\ko) of every cue.
+        返回所有字幕块的卡拉 OK 音节 (\\k、\\K、\\kf、\\ko)。
+
+        A syllable starts at its karaoke tag and lasts the tag's value in
+        centiseconds; its text runs to the next karaoke tag. \\kt moves the start of
+        the next syllable to the given offset from the cue start.
+        音节从卡拉 OK 标签开始，持续标签值 (厘秒)；其文本到下一个卡拉 OK 标签为止。
+        \\kt 把下一个音节的开始时间设为相对字幕块开始的指定偏移。
+        """
+        table = KaraokeTable()
+        cue_column, start_column, end_column = table.cue, table.start, table.end
+        kinds, texts = table.kind, table.text
+        cues = self.subtitle.cues
+        if len(self._texts) != len(cues):
+            self.refresh()
+        cached_texts, cached_syllables = self._texts, self._syllables
+        for index, cue in enumerate(cues):
+            text = cue.text
+            if cached_texts[index] is not text:
+                self._update(index, text)
+            syllables = cached_syllables[index]
+            if syllables is None:
+                syllables = cached_syllables[index] = _syllables(
+                    text, self._segments[index]
+                )
+            if not syllables:
+                continue
+            start = cue.start
+            for syllable_start, syllable_end, kind, syllable_text in syllables:
+                cue_column.append(index)
+                start_column.append(start + syllable_start)
+                end_column.append(start + syllable_end)
+                kinds.append(kind)
+                texts.append(syllable_text)
+        return table
+
+
+def karaoke_timings(subtitle: Subtitle) -> KaraokeTable:
+    """Karaoke syllables of every cue, see AssText.karaoke
+    所有字幕块的卡拉 OK 音节，见 AssText.karaoke"""
+    return AssText(subtitle).karaoke()
+
+
+def _syllables(text: str, segments: tuple) -> tuple:
+    """(start, end, kind, text) of the karaoke syllables of a line given its
+    segments, times in seconds relative to the cue start"""
+    if "\\k" not in text and "\\K" not in text:
+        return ()
+    syllables = []
+    offset = 0  # 厘秒 / centiseconds
+    for tags, span in segments:
+        for name, args in tags:
+            if name in _KARAOKE:
+                duration = _centiseconds(args)
+                syllables.append([offset / 100, (offset + duration) / 100, name, ""])
+                offset += duration
+            elif name == "kt":
+                offset = _centiseconds(args)
+        if syllables and span:
+            syllables[-1][3] += span
+    return tuple(
+        (start, end, kind, strip_overrides(span) if "\\" in span else span)
+        for start, end, kind, span in syllables
+    )
+
+
+@lru_cache(maxsize=65536)
+def _parse_block(block: str) -> tuple:
+    """Tags of one override block; blocks such as {\\k20} repeat across lines and
+    are parsed once"""
+    tags = []
+    for known, other, value in _TAG.findall(block):
+        if value.startswith("("):
+            args = _split_args(value[1:-1] if value.endswith(")") else value[1:])
+        else:
+            args = (value.rstrip(),)
+        tags.append(Tag(known or other, args))
+    return tuple(tags)
+
+
+def _split_args(value: str) -> tuple:
+    """Splits arguments at top-level commas: \\t(0,500,\\clip(1,2,3,4))"""
+    if "(" not in value:
+        return tuple(arg.strip() for arg in value.split(","))
+    args = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(value):
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            args.append(value[start:i].strip())
+            start = i + 1
+    args.append(value[start:].strip())
+    return tuple(args)
+
+
+def _centiseconds(args: tuple) -> int:
+    try:
+        return int(float(args[0]))
+    except (ValueError, IndexError):
+        return 0
@@ -0,0 +1,450 @@
+# fairy_subtitle/dataset.py
+# 把大量字幕文件导出为列式数据集 (用于 ASR / 翻译模型训练)
+# Export many subtitle files as a columnar dataset (ASR / translation training data)
+#
+# 默认的 .fsd 文件格式只依赖标准库：文件头 MAGIC 之后是若干行组，每个行组为
+# 8 字节小端长度 + zlib 压缩的内容；内容为 4 字节小端的 JSON 头长度、JSON 头
+# ({"rows": n, "columns": [[名称, 类型, 字节数], ...]}) 和各列数据。int64 列是小端
+# int64 数组，string 列是 n + 1 个 int64 偏移量加 UTF-8 数据 (与 Arrow 的布局相同)。
+# 输出路径以 .parquet 结尾且安装了 pyarrow 时写入 Parquet。
+# The default .fsd format needs only the standard library: MAGIC, then row groups of
+# an 8-byte little-endian length and a zlib-compressed payload (4-byte JSON header
+# length, JSON header, column buffers). int64 columns are little-endian int64 arrays,
+# string columns are n + 1 int64 offsets followed by UTF-8 data (the Arrow layout).
+# Paths ending in .parquet are written as Parquet when pyarrow is installed.
+
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Union
+
+from .exceptions import SubtitleError
+
+MAGIC = b"FSDATA1\n"
+# 每个行组的默认行数 / Default number of rows per row group
+DEFAULT_ROW_GROUP_SIZE = 65536
+
+INT64 = "int64"
+STRING = "string"
+
+# 逐条字幕的数据集 / One row per cue
+CUE_SCHEMA = (
+    ("file", STRING),
+    ("index", INT64),
+    ("start_ms", INT64),
+    ("end_ms", INT64),
+    ("text", STRING),
+    ("language", STRING),
+    ("format", STRING),
+)
+# 双语对照的数据集 / One row per aligned cue pair
+PAIR_SCHEMA = (
+    ("file", STRING),
+    ("index", INT64),
+    ("start_ms", INT64),
+    ("end_ms", INT64),
+    ("source_text", STRING),
+    ("target_text", STRING),
+    ("source_language", STRING),
+    ("target_language", STRING),
+)
+
+Language = Union[str, Callable[[str], Optional[str]], None]
+
+
+@dataclass
+class RecordBatch:
+    """A group of rows stored column by column
+    按列存储的一组行"""
+
+    columns: dict  # Column name -> list of values
+
+    @property
+    def num_rows(self) -> int:
+        return len(next(iter(self.columns.values()), ()))
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def to_pylist(self) -> list[dict]:
+        """Returns the rows as dictionaries
+        以字典列表的形式返回各行"""
+        names = list(self.columns)
+        return [dict(zip(names, row)) for row in zip(*self.columns.values())]
+
+
+class ExportReport(NamedTuple):
+    """Summary of an export
+    导出结果摘要"""
+
+    files: int  # Files (or file pairs) exported
+    rows: int  # Rows written
+    row_groups: int  # Row groups written
+    failures: list  # (path, exception) of files that could not be read or parsed
+
+
+def export_dataset(
+    file_paths: Iterable[str],
+    output_path: str,
+    language: Language = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    workers: Optional[int] = None,
+    format: str = "auto",
+    encoding: str = "utf-8",
+    errors: Optional[str] = None,
+) -> ExportReport:
+    """
+    Streams the cues of many files into a columnar dataset, one row per cue.
+    把大量文件的字幕块流式写入列式数据集，每个字幕块一行。
+
+    Files are parsed in parallel worker processes with a bounded number of files in
+    flight, and rows are written in row groups of row_group_size, so memory stays
+    bounded whatever the number of files. Columns: file, index, start_ms, end_ms,
+    text, language, format.
+    文件在多个工作进程中并行解析，同时处理的文件数有上限，各行按 row_group_size 分组写入，
+    因此内存占用与文件总数无关。列: file, index, start_ms, end_ms, text, language, format。
+
+    :param language: Language of every file, or a function path -> language.
+    :param language: 所有文件的语言，或 路径 -> 语言 的函数。
+    :param workers: Number of worker processes, defaults to the number of CPUs.
+    :param workers: 工作进程数，默认为 CPU 数。
+    """
+    jobs = ((path, format, encoding, errors) for path in file_paths)
+    files = 0
+    failures = []
+    with _open_writer(output_path, CUE_SCHEMA, row_group_size) as writer:
+        for job, result in _run_parallel(_cue_rows, jobs, workers):
+            if isinstance(result, Exception):
+                failures.append((job[0], result))
+                continue
+            path = job[0]
+            file_format, starts, ends, texts = result
+            file_language = _language_of(language, path)
+            n = len(texts)
+            writer.extend(
+                {
+                    "file": [path] * n,
+                    "index": range(n),
+                    "start_ms": starts,
+                    "end_ms": ends,
+                    "text": texts,
+                    "language": [file_language] * n,
+                    "format": [file_format] * n,
+                }
+            )
+            files += 1
+    return ExportReport(files, writer.rows, writer.row_groups, failures)
+
+
+def export_pairs(
+    file_pairs: Iterable[tuple[str, str]],
+    output_path: str,
+    languages: tuple = ("", ""),
+    min_overlap: float = 0.5,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    workers: Optional[int] = None,
+    format: str = "auto",
+    encoding: str = "utf-8",
+    errors: Optional[str] = None,
+) -> ExportReport:
+    """
+    Aligns the cues of (source, target) file pairs by time overlap and writes one row
+    per aligned pair, for translation training.
+    按时间重叠对齐 (源语言, 目标语言) 文件对中的字幕块，每对对齐的字幕写一行，用于翻译训练。
+
+    Alignment uses SubtitleTrackSet.merge; groups present in only one of the files
+    are left out. Columns: file (the source path), index, start_ms, end_ms,
+    source_text, target_text, source_language, target_language.
+    对齐使用 SubtitleTrackSet.merge；只出现在其中一个文件中的分组会被忽略。
+    列: file (源文件路径), index, start_ms, end_ms, source_text, target_text,
+    source_language, target_language。
+
+    :param languages: (source language, target language), each a string or a
+                      function path -> language.
+    :param languages: (源语言, 目标语言)，每项为字符串或 路径 -> 语言 的函数。
+    :param min_overlap: See SubtitleTrackSet.merge.
+    :param min_overlap: 见 SubtitleTrackSet.merge。
+    """
+    jobs = (
+        (source, target, format, encoding, errors, min_overlap)
+        for source, target in file_pairs
+    )
+    source_language, target_language = languages
+    files = 0
+    failures = []
+    with _open_writer(output_path, PAIR_SCHEMA, row_group_size) as writer:
+        for job, result in _run_parallel(_pair_rows, jobs, workers):
+            if isinstance(result, Exception):
+                failures.append((job[0], result))
+                continue
+            source, target = job[0], job[1]
+            starts, ends, source_texts, target_texts = result
+            n = len(starts)
+            writer.extend(
+                {
+                    "file": [source] * n,
+                    "index": range(n),
+                    "start_ms": starts,
+                    "end_ms": ends,
+                    "source_text": source_texts,
+                    "target_text": target_texts,
+                    "source_language": [_language_of(source_language, source)] * n,
+                    "target_language": [_language_of(target_language, target)] * n,
+                }
+            )
+            files += 1
+    return ExportReport(files, writer.rows, writer.row_groups, failures)
+
+
+def read_dataset(path: str) -> Iterator[RecordBatch]:
+    """
+    Reads a dataset written by export_dataset / export_pairs one row group at a time.
+    逐个行组读取 export_dataset / export_pairs 写入的数据集。
+    """
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            f.close()
+            yield from _read_parquet(path)
+            return
+        while True:
+            size = f.read(8)
+            if not size:
+                return
+            (length,) = struct.unpack("<Q", size)
+            yield _decode_row_group(zlib.decompress(f.read(length)))
+
+
+# 工作进程 / Workers
+
+
+def _cue_rows(args: tuple) -> Union[tuple, Exception]:
+    """Worker: (format, start ms, end ms, texts) of one file"""
+    from .subtitle import SubtitleLoader
+
+    path, format, encoding, errors = args
+    try:
+        subtitle = SubtitleLoader.load(path, format, encoding, errors)
+    except (OSError, UnicodeDecodeError, SubtitleError) as e:
+        return e
+    cues = subtitle.cues
+    return (
+        subtitle.info.format,
+        [round(cue.start * 1000) for cue in cues],
+        [round(cue.end * 1000) for cue in cues],
+        [cue.text for cue in cues],
+    )
+
+
+def _pair_rows(args: tuple) -> Union[tuple, Exception]:
+    """Worker: (start ms, end ms, source texts, target texts) of one file pair"""
+    from .subtitle import SubtitleLoader
+    from .tracks import SubtitleTrackSet
+
+    source, target, format, encoding, errors, min_overlap = args
+    try:
+        tracks = SubtitleTrackSet(
+            {
+                "source": SubtitleLoader.load(source, format, encoding, errors),
+                "target": SubtitleLoader.load(target, format, encoding, errors),
+            }
+        )
+    except (OSError, UnicodeDecodeError, SubtitleError) as e:
+        return e
+    starts, ends, source_texts, target_texts = [], [], [], []
+    for merged in tracks.merge(min_overlap):
+        if len(merged.cues) < 2:
+            continue
+        starts.append(round(merged.start * 1000))
+        ends.append(round(merged.end * 1000))
+        source_texts.append("\n".join(cue.text for cue in merged.cues["source"]))
+        target_texts.append("\n".join(cue.text for cue in merged.cues["target"]))
+    return starts, ends, source_texts, target_texts
+
+
+def _run_parallel(
+    func: Callable, jobs: Iterable[tuple], workers: Optional[int]
+) -> Iterator[tuple]:
+    """Yields (job, result) in job order, with at most 2 * workers jobs in flight so
+    finished results never pile up faster than they are written"""
+    workers = workers or os.cpu_count() or 1
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for job in jobs:
+            pending.append((job, executor.submit(func, job)))
+            if len(pending) >= 2 * workers:
+                job, future = pending.popleft()
+                yield job, future.result()
+        while pending:
+            job, future = pending.popleft()
+            yield job, future.result()
+
+
+def _language_of(language: Language, path: str) -> str:
+    if callable(language):
+        language = language(path)
+    return language or ""
+
+
+# 写入 / Writers
+
+
+def _open_writer(output_path: str, schema: tuple, row_group_size: int):
+    if row_group_size <= 0:
+        raise ValueError("row_group_size must be positive")
+    if output_path.lower().endswith(".parquet"):
+        return _ParquetWriter(output_path, schema, row_group_size)
+    return _ColumnarWriter(output_path, schema, row_group_size)
+
+
+class _BufferedWriter:
+    """Buffers rows column by column and flushes them in row groups of a fixed size"""
+
+    def __init__(self, schema: tuple, row_group_size: int):
+        self.schema = schema
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self.row_groups = 0
+        self._buffer = {name: [] for name, _ in schema}
+        self._buffered = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None and self._buffered:
+            self._flush(self._buffered)
+        self.close()
+
+    def extend(self, columns: dict):
+        """Appends rows given as column name -> values"""
+        n = len(columns[self.schema[0][0]])
+        for name, _ in self.schema:
+            self._buffer[name].extend(columns[name])
+        self._buffered += n
+        while self._buffered >= self.row_group_size:
+            self._flush(self.row_group_size)
+
+    def _flush(self, n: int):
+        batch = {}
+        for name, _ in self.schema:
+            values = self._buffer[name]
+            batch[name] = values[:n]
+            del values[:n]
+        self._buffered -= n
+        self.write_row_group(batch, n)
+        self.rows += n
+        self.row_groups += 1
+
+    def write_row_group(self, columns: dict, n: int):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+
+class _ColumnarWriter(_BufferedWriter):
+    """The standard library .fsd format described at the top of this module"""
+
+    def __init__(self, output_path: str, schema: tuple, row_group_size: int):
+        super().__init__(schema, row_group_size)
+        self._file = open(output_path, "wb")
+        self._file.write(MAGIC)
+
+    def write_row_group(self, columns: dict, n: int):
+        header = {"rows": n, "columns": []}
+        buffers = []
+        for name, kind in self.schema:
+            data = _encode_column(columns[name], kind)
+            header["columns"].append([name, kind, len(data)])
+            buffers.append(data)
+        header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        payload = zlib.compress(
+            struct.pack("<I", len(header_bytes)) + header_bytes + b"".join(buffers)
+        )
+        self._file.write(struct.pack("<Q", len(payload)))
+        self._file.write(payload)
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetWriter(_BufferedWriter):
+    """Parquet through pyarrow (optional dependency)"""
+
+    def __init__(self, output_path: str, schema: tuple, row_group_size: int):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError(
+                "写入 Parquet 需要安装 pyarrow (pip install pyarrow)。"
+                "Writing Parquet requires pyarrow (pip install pyarrow)."
+            )
+        super().__init__(schema, row_group_size)
+        self._pa = pa
+        types = {INT64: pa.int64(), STRING: pa.string()}
+        self._schema = pa.schema([(name, types[kind]) for name, kind in schema])
+        self._writer = pq.ParquetWriter(output_path, self._schema)
+
+    def write_row_group(self, columns: dict, n: int):
+        table = self._pa.Table.from_pydict(columns, schema=self._schema)
+        self._writer.write_table(table, row_group_size=n)
+
+    def close(self):
+        self._writer.close()
+
+
+def _encode_column(values: list, kind: str) -> bytes:
+    if kind == INT64:
+        return _little_endian(array("q", values)).tobytes()
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = array("q", [0])
+    position = 0
+    for data in encoded:
+        position += len(data)
+        offsets.append(position)
+    return _little_endian(offsets).tobytes() + b"".join(encoded)
+
+
+def _decode_row_group(payload: bytes) -> RecordBatch:
+    (header_length,) = struct.unpack_from("<I", payload)
+    position = 4 + header_length
+    header = json.loads(payload[4:position].decode("utf-8"))
+    n = header["rows"]
+    columns = {}
+    for name, kind, length in header["columns"]:
+        data = payload[position : position + length]
+        position += length
+        if kind == INT64:
+            columns[name] = _little_endian(array("q", data)).tolist()
+            continue
+        offsets = _little_endian(array("q", data[: 8 * (n + 1)]))
+        text = data[8 * (n + 1) :]
+        columns[name] = [
+            text[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(n)
+        ]
+    return RecordBatch(columns)
+
+
+def _little_endian(values: array) -> array:
+    """The file format is little-endian, swap in place on big-endian machines"""
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _read_parquet(path: str) -> Iterator[RecordBatch]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError(f"Not a dataset file: {path}")
+    parquet_file = pq.ParquetFile(path)
+    for i in range(parquet_file.num_row_groups):
+        yield RecordBatch(parquet_file.read_row_group(i).to_pydict())
@@ -0,0 +1,54 @@
+# fairy_subtitle/diagnostics.py
+# 解析错误策略与诊断信息
+# Parse error policies and diagnostics
+
+from typing import NamedTuple
+
+# 错误策略 / Error policies
+STRICT = "strict"  # 遇到第一个错误即抛出异常 / raise on the first error
+LENIENT = "lenient"  # 跳过无效的字幕块 / skip invalid blocks
+COLLECT = "collect"  # 跳过无效的字幕块并记录诊断信息 / skip invalid blocks and record diagnostics
+
+ERROR_POLICIES = (STRICT, LENIENT, COLLECT)
+
+
+class Diagnostic(NamedTuple):
+    """A parse error recorded in 'collect' mode
+    'collect' 模式下记录的解析错误"""
+
+    line: int  # 1-based line number
+    offset: int  # Character offset in the parsed content
+    reason: str  # Error message
+
+
+class ErrorHandler:
+    """Handles parse errors according to an error policy
+    按错误策略处理解析错误"""
+
+    def __init__(self, content: str, errors: str = STRICT):
+        if errors not in ERROR_POLICIES:
+            raise ValueError(
+                f"Unknown error policy: {errors}, expected one of {ERROR_POLICIES}"
+            )
+        self.errors = errors
+        self.diagnostics = []
+        self._content = content
+        # 行号按偏移量递增计算，错误按顺序出现时总开销与文本长度成正比
+        self._line = 1
+        self._line_offset = 0
+
+    @property
+    def strict(self) -> bool:
+        return self.errors == STRICT
+
+    def handle(self, error: Exception, offset: int):
+        """Raises the error in 'strict' mode, records it in 'collect' mode
+        'strict' 模式下抛出错误，'collect' 模式下记录错误"""
+        if self.errors == STRICT:
+            raise error
+        if self.errors == COLLECT:
+            if offset < self._line_offset:
+                self._line, self._line_offset = 1, 0
+            self._line += self._content.count("\n", self._line_offset, offset)
+            self._line_offset = offset
+            self.diagnostics.append(Diagnostic(self._line, offset, str(error)))
@@ -0,0 +1,246 @@
+# fairy_subtitle/diff.py
+# 字幕差异比较与补丁
+# Subtitle diff and patch
+#
+# 编辑脚本按顺序作用于旧字幕，每条编辑的 index 是应用到该条编辑时字幕块的位置。
+# An edit script is applied to the old subtitle in order, the index of each edit is
+# the cue position at the time that edit is applied.
+
+from bisect import bisect_left
+from typing import NamedTuple, Optional
+
+from .models import Cue, Subtitle
+
+# 编辑操作 / Edit operations
+INSERT = "insert"  # 在 index 处插入 (start, end, text)
+REMOVE = "remove"  # 删除 index 处的字幕块
+RETIME = "retime"  # 修改 index 处字幕块的时间为 (start, end)
+RETEXT = "retext"  # 修改 index 处字幕块的文本为 text
+MERGE = "merge"  # 合并 index 开始的 count 个字幕块 (Subtitle.merge)
+SPLIT = "split"  # 在时间 start 处分割 index 处的字幕块 (Subtitle.split)
+
+# 时间重叠超过较长字幕块时长的这个比例时，视为同一字幕块被修改了时间
+# Overlap ratio above which two cues are treated as the same cue with new timing
+_SAME_CUE_OVERLAP = 0.5
+
+
+class Edit(NamedTuple):
+    """One step of an edit script produced by Subtitle.diff
+    Subtitle.diff 生成的编辑脚本中的一步"""
+
+    op: str  # One of INSERT, REMOVE, RETIME, RETEXT, MERGE, SPLIT
+    index: int  # Cue position when the edit is applied
+    start: Optional[float] = None  # New start (INSERT, RETIME) or split time (SPLIT)
+    end: Optional[float] = None  # New end (INSERT, RETIME)
+    text: Optional[str] = None  # New text (INSERT, RETEXT)
+    count: Optional[int] = None  # Number of merged cues (MERGE)
+
+
+def diff(old: Subtitle, new: Subtitle) -> list[Edit]:
+    """
+    Computes an edit script that turns old into new.
+    计算把 old 变成 new 的编辑脚本。
+
+    Identical leading and trailing cues are skipped first, cues whose text is unique
+    in both versions are then aligned as anchors (longest increasing subsequence),
+    and the short gaps between anchors are aligned by timing. On mostly similar
+    inputs this runs in O(n log n).
+    先跳过首尾相同的字幕块，再以两个版本中文本唯一的字幕块为锚点对齐 (最长递增子序列)，
+    锚点之间的少量字幕块按时间对齐。对大部分相同的输入，复杂度为 O(n log n)。
+    """
+    a = list(old.cues)
+    b = list(new.cues)
+    script = _Script()
+
+    # 1. 跳过相同的开头和结尾
+    lo = 0
+    while lo < len(a) and lo < len(b) and _same(a[lo], b[lo]):
+        lo += 1
+    a_hi, b_hi = len(a), len(b)
+    while a_hi > lo and b_hi > lo and _same(a[a_hi - 1], b[b_hi - 1]):
+        a_hi -= 1
+        b_hi -= 1
+    script.pos = lo
+
+    # 2. 以文本唯一的字幕块为锚点，锚点之间按时间对齐
+    i, j = lo, lo
+    for anchor_i, anchor_j in _anchors(a, b, lo, a_hi, b_hi):
+        _align_gap(a, b, i, anchor_i, j, anchor_j, script)
+        script.change(a[anchor_i], b[anchor_j])
+        i, j = anchor_i + 1, anchor_j + 1
+    _align_gap(a, b, i, a_hi, j, b_hi, script)
+    return script.edits
+
+
+def apply_patch(subtitle: Subtitle, edits: list[Edit]) -> Subtitle:
+    """
+    Applies an edit script in place, with the semantics of Subtitle's
+    insert/remove/merge/split.
+    就地应用编辑脚本，语义与 Subtitle 的 insert/remove/merge/split 相同。
+
+    The edits are applied to the cue list directly, and the indices and the duration
+    are recalculated once at the end instead of after every edit.
+    编辑直接作用于字幕块列表，序号和时长在最后统一重新计算一次，而不是每条编辑后都计算。
+    """
+    if not edits:
+        return subtitle
+    first = max(min(edit.index for edit in edits), 0)
+    subtitle._before_mutation(first)
+    cues = subtitle.cues
+    try:
+        for edit in edits:
+            op = edit.op
+            index = edit.index
+            if op == INSERT:
+                if index < 0 or index > len(cues):
+                    raise IndexError("Index out of range")
+                cues.insert(index, Cue(start=edit.start, end=edit.end, text=edit.text))
+                continue
+            last = index + edit.count - 1 if op == MERGE else index
+            if index < 0 or last >= len(cues) or index > last:
+                raise IndexError("Index out of range")
+            if op == REMOVE:
+                del cues[index]
+            elif op == MERGE:
+                if last > index:
+                    text = "\n".join(cue.text for cue in cues[index : last + 1])
+                    merged = Cue(start=cues[index].start, end=cues[last].end, text=text)
+                    cues[index : last + 1] = [merged]
+            elif op == SPLIT:
+                cue = cues[index]
+                if edit.start < cue.start or edit.start > cue.end:
+                    raise ValueError("Time is not within the cue")
+                cues.insert(index + 1, Cue(start=edit.start, end=cue.end, text=cue.text))
+                cue.end = edit.start
+            elif op == RETIME:
+                cues[index].start, cues[index].end = edit.start, edit.end
+            elif op == RETEXT:
+                cues[index].text = edit.text
+            else:
+                raise ValueError(f"Unknown edit operation: {op}")
+    finally:
+        subtitle._recalculate_indices(first)
+        subtitle._recalcluate_duration()
+    return subtitle
+
+
+class _Script:
+    """Collects edits while tracking the current cue position"""
+
+    def __init__(self):
+        self.edits = []
+        self.pos = 0
+
+    def change(self, old: Cue, new: Cue):
+        """old and new are the same cue: emits RETIME/RETEXT if needed"""
+        if old.start != new.start or old.end != new.end:
+            self.edits.append(Edit(RETIME, self.pos, start=new.start, end=new.end))
+        if old.text != new.text:
+            self.edits.append(Edit(RETEXT, self.pos, text=new.text))
+        self.pos += 1
+
+    def insert(self, new: Cue):
+        self.edits.append(Edit(INSERT, self.pos, new.start, new.end, new.text))
+        self.pos += 1
+
+    def remove(self):
+        self.edits.append(Edit(REMOVE, self.pos))
+
+
+def _same(old: Cue, new: Cue) -> bool:
+    return old.start == new.start and old.end == new.end and old.text == new.text
+
+
+def _anchors(a: list, b: list, lo: int, a_hi: int, b_hi: int) -> list:
+    """Pairs (i, j) of cues whose text is unique in both ranges, in increasing order
+    of both i and j (longest increasing subsequence, patience sorting)"""
+    a_pos = {}
+    for i in range(lo, a_hi):
+        text = a[i].text
+        a_pos[text] = -1 if text in a_pos else i
+    b_pos = {}
+    for j in range(lo, b_hi):
+        text = b[j].text
+        if a_pos.get(text, -1) >= 0:
+            b_pos[text] = -1 if text in b_pos else j
+    pairs = [(a_pos[text], j) for text, j in b_pos.items() if j >= 0]
+    pairs.sort(key=lambda pair: pair[1])
+
+    # 按 j 排序后，求 i 的最长递增子序列
+    tails = []  # tails[k]: 长度为 k+1 的递增子序列的最小结尾 i
+    tail_pairs = []  # tails[k] 对应的 pairs 下标
+    previous = [-1] * len(pairs)
+    for n, (i, _) in enumerate(pairs):
+        k = bisect_left(tails, i)
+        if k == len(tails):
+            tails.append(i)
+            tail_pairs.append(n)
+        else:
+            tails[k] = i
+            tail_pairs[k] = n
+        previous[n] = tail_pairs[k - 1] if k else -1
+
+    anchors = []
+    n = tail_pairs[-1] if tail_pairs else -1
+    while n >= 0:
+        anchors.append(pairs[n])
+        n = previous[n]
+    anchors.reverse()
+    return anchors
+
+
+def _overlap_ratio(old: Cue, new: Cue) -> float:
+    overlap = min(old.end, new.end) - max(old.start, new.start)
+    longest = max(old.end - old.start, new.end - new.start)
+    if longest <= 0:
+        return 1.0 if old.start == new.start else 0.0
+    return overlap / longest
+
+
+def _align_gap(a: list, b: list, i: int, a_end: int, j: int, b_end: int, script):
+    """Aligns a[i:a_end] with b[j:b_end] by timing with two pointers"""
+    while i < a_end and j < b_end:
+        old, new = a[i], b[j]
+
+        if old.start == new.start and old.end != new.end:
+            # 几个旧字幕块被合并: 新字幕块从第一个开始，到最后一个结束
+            k = i + 1
+            while k < a_end and a[k].end < new.end:
+                k += 1
+            if new.end > old.end and k < a_end and a[k].end == new.end:
+                script.edits.append(Edit(MERGE, script.pos, count=k - i + 1))
+                merged_text = "\n".join(cue.text for cue in a[i : k + 1])
+                merged = Cue(start=old.start, end=new.end, text=merged_text)
+                script.change(merged, new)
+                i, j = k + 1, j + 1
+                continue
+
+            # 旧字幕块被分割: 几个首尾相接的新字幕块正好覆盖它
+            k = j
+            while k + 1 < b_end and b[k].end < old.end and b[k + 1].start == b[k].end:
+                k += 1
+            if new.end < old.end and k > j and b[k].end == old.end:
+                for m in range(j, k):
+                    script.edits.append(Edit(SPLIT, script.pos, start=b[m].end))
+                    piece = Cue(start=b[m].start, end=b[m].end, text=old.text)
+                    script.change(piece, b[m])
+                script.change(Cue(start=b[k].start, end=old.end, text=old.text), b[k])
+                i, j = i + 1, k + 1
+                continue
+
+        if (old.start == new.start and old.end == new.end) or _overlap_ratio(
+            old, new
+        ) >= _SAME_CUE_OVERLAP:
+            script.change(old, new)
+            i, j = i + 1, j + 1
+        elif old.start <= new.start:
+            script.remove()
+            i += 1
+        else:
+            script.insert(new)
+            j += 1
+
+    for _ in range(i, a_end):
+        script.remove()
+    for m in range(j, b_end):
+        script.insert(b[m])
@@ -0,0 +1,63 @@
+# fairy_subtitle/formats/__init__.py
+# 每种字幕格式的解析与转换函数都放在独立模块中，由 fairy_subtitle.registry 在首次使用时导入
+# Each subtitle format lives in its own module, imported by fairy_subtitle.registry
+# on first use
+
+from typing import Iterable, Iterator
+
+
+def iter_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """Groups lines into blocks separated by blank lines
+    将文本行按空行分组为字幕块"""
+    block = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip():
+            block.append(line)
+        elif block:
+            yield "\n".join(block)
+            block = []
+    if block:
+        yield "\n".join(block)
+
+
+def split_blocks(content: str, separator) -> Iterator[tuple[int, str]]:
+    """Splits content into blocks, yielding (offset, block) pairs
+    按分隔符分割字幕块，产出 (偏移量, 字幕块)"""
+    position = 0
+    for match in separator.finditer(content):
+        yield position, content[position : match.start()]
+        position = match.end()
+    yield position, content[position:]
+
+
+def split_at_timing_lines(
+    block: str, is_timing_line, has_index: bool
+) -> Iterator[tuple[int, str]]:
+    """
+    Splits a block that contains several timing lines (for example when the
+    blank line between two cues is missing), yielding (offset, piece) pairs.
+    将包含多条时间轴行的字幕块 (例如缺少分隔空行) 在每条时间轴行处重新分割，
+    产出 (偏移量, 片段)。
+
+    :param has_index: Whether a timing line is preceded by an index line.
+    :param has_index: 时间轴行前是否有序号行。
+    """
+    lines = block.split("\n")
+    offsets = []
+    position = 0
+    for line in lines:
+        offsets.append(position)
+        position += len(line) + 1
+
+    cuts = [0]
+    for i in range(1, len(lines)):
+        if not is_timing_line(lines[i]):
+            continue
+        cut = i - 1 if has_index and lines[i - 1].strip().isdigit() else i
+        if cut > cuts[-1]:
+            cuts.append(cut)
+    cuts.append(len(lines))
+
+    for begin, end in zip(cuts, cuts[1:]):
+        yield offsets[begin], "\n".join(lines[begin:end])
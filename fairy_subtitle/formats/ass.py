@@ -0,0 +1,797 @@
+# fairy_subtitle/formats/ass.py
+
+import sys
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from fairy_subtitle.block import ass_script_info
+from fairy_subtitle.diagnostics import LENIENT, ErrorHandler
+from fairy_subtitle.exceptions import (
+    InvalidSubtitleContentError,
+    InvalidTimeFormatError,
+)
+from fairy_subtitle.models import AssInfo, Cue, Subtitle, SubtitleInfo
+from fairy_subtitle.profiling import stage
+
+
+class AssEventRow(NamedTuple):
+    """
+    One parsed event line of the source, used by the writer to copy unchanged lines.
+    源文件中解析出的一行事件，写回时用来原样复制未修改的行。
+
+    The source text between the previous event line and this one (line breaks,
+    blank lines, ';' comments, invalid lines) is source[trivia_start:line_start].
+    上一行事件与本行之间的原文 (换行、空行、';' 注释、无效行) 为
+    source[trivia_start:line_start]。
+    """
+
+    kind: str  # Dialogue / Comment
+    fields: list  # Event fields, shared with AssInfo.events
+    cue: Cue  # The Cue object created for this line
+    start: float  # Parsed start time
+    end: float  # Parsed end time
+    text: str  # Parsed text
+    trivia_start: int  # End of the previous line in the source
+    line_start: int  # Start of this line in the source
+    line_end: int  # End of this line in the source
+
+
+def validate_ass(content: str) -> bool:
+    """
+    Validates if content matches ASS format characteristics
+    验证内容是否符合ASS格式特征
+
+    ASS format typically starts with "[Script Info]"
+    ASS格式通常以"[Script Info]"开头
+    """
+    return content.strip().startswith("[Script Info]")
+
+
+def parse_ass_script_info(content: str) -> dict:
+    """
+    解析 ASS 格式的 [Script Info] 部分，并返回一个字典。
+    Parse the [Script Info] section of ASS format and return a dictionary.
+    """
+    script_info = {}
+    script_info_set = set(ass_script_info)  # 集合查找速度为O(1)
+    for line in content.split("\n"):
+        line = line.strip()
+        if not line or line.startswith("!:"):
+            continue
+        if ":" in line:
+            key, value = line.split(":", 1)
+            key = key.strip()
+            value = value.strip()
+            if key in script_info_set:
+                script_info[key] = value
+
+    return script_info
+
+
+def parse_ass_v4_style(content: str) -> dict:
+    """
+    解析 ASS 格式的 [V4+ Styles] 部分，并返回一个字典。
+    Parse the [V4+ Styles] section of ASS format and return a dictionary.
+    """
+    v4_style = {}
+
+    read_v4_styles = list(filter(None, content.split("\n")))
+    read_styles_format = read_v4_styles[0].split(":", 1)[-1].split(",")
+
+    format = []
+    style_name_index = 0
+    for index, format_item in enumerate(read_styles_format):
+        format.append(format_item.strip())
+        if format_item.strip() == "Name":
+            style_name_index = index
+    v4_style["Format"] = format
+
+    for style_items in read_v4_styles[1:]:
+        style_item = style_items.split(":", 1)[-1].split(",")
+        style_list = []
+        style_name = ""
+        for index, item in enumerate(style_item):
+            style_list.append(item.strip())
+            if index == style_name_index:
+                style_name = item.strip()
+        v4_style[style_name] = style_list
+
+    return v4_style
+
+
+def parse_ass_events(
+    content: str,
+    handler: Optional[ErrorHandler] = None,
+    offset: int = 0,
+    rows: Optional[list] = None,
+    dedupe_text: bool = True,
+) -> tuple[dict, list[Cue], float]:
+    """
+    解析 ASS 格式的 [Events] 部分。
+    Parse the [Events] section of ASS format.
+
+    handler: 处理无效行的 ErrorHandler，默认跳过无效行
+    handler: ErrorHandler for invalid lines, skips them by default
+    offset: [Events] 部分在整个文件中的偏移量，用于诊断信息
+    offset: Offset of the [Events] section in the whole file, used for diagnostics
+    rows: 传入列表时，为每行有效事件追加一个 AssEventRow (用于无损写回)
+    rows: When given, an AssEventRow is appended for every valid event line
+    dedupe_text: 相同的文本是否共享同一个字符串对象
+    dedupe_text: Whether identical texts share one string object
+
+    样式名、说话人、特效、边距等字段几乎在每一行重复，解析时通过字符串池共享
+    同一个对象，事件表只保存对象引用 (见 ass_memory_report)。
+    Style, actor, effect and margin fields repeat on almost every line; they are
+    interned through a per-parse pool so the event table only holds references
+    (see ass_memory_report).
+    """
+    if handler is None:
+        handler = ErrorHandler(content, LENIENT)
+    events = {}
+
+    # 一次性分割所有行并过滤空行，同时记录每行的偏移量
+    read_events = []
+    line_offsets = []
+    line_ends = []
+    position = offset
+    for line in content.split("\n"):
+        stripped = line.strip()
+        if stripped:
+            read_events.append(stripped)
+            line_offsets.append(position)
+            line_ends.append(position + len(line))
+        position += len(line) + 1
+
+    # 解析格式行
+    if not read_events:
+        return events, [], 0.0
+
+    format_line = read_events[0]
+    # 一次性分割并提取格式字段
+    format_items = format_line.split(":", 1)[-1].split(",")
+
+    # 预计算并缓存关键索引位置
+    format_mapping = {}
+    text_index = 9
+    start_index = 1
+    end_index = 2
+
+    for idx, item in enumerate(format_items):
+        item_stripped = item.strip()
+        format_mapping[item_stripped] = idx
+        if item_stripped == "Text":
+            text_index = idx
+        elif item_stripped == "Start":
+            start_index = idx
+        elif item_stripped == "End":
+            end_index = idx
+
+    # 存储格式列表
+    events["Format"] = [item.strip() for item in format_items]
+    # Text 是最后一个字段，其中可以包含逗号，因此最多分割 len(format_items) - 1 次
+    max_split = len(format_items) - 1
+    previous_end = line_ends[0]
+
+    # 字符串池: 重复的字段值共享同一个对象
+    pool = {}
+    intern = pool.setdefault
+
+    # 初始化变量
+    earliest_start_time = float("inf")
+    latest_end_time = 0.0
+    text_dialogue = []
+    text_comment = []
+    cues = []
+
+    # 处理每一行事件数据
+    for i, line in enumerate(read_events[1:], 0):
+        # 只分割一次获取类型和数据部分
+        if ":" in line:
+            event_type, data_part = line.split(":", 1)
+            event_type = event_type.strip()
+
+            # 分割数据部分
+            data_items = data_part.split(",", max_split)
+
+            # 确保索引有效
+            if (
+                text_index >= len(data_items)
+                or start_index >= len(data_items)
+                or end_index >= len(data_items)
+            ):
+                handler.handle(
+                    InvalidSubtitleContentError(f"事件行字段数量不足: {line}"),
+                    line_offsets[i + 1],
+                )
+                continue
+
+            # 直接获取所需字段
+            text = data_items[text_index].strip()
+            if dedupe_text:
+                text = intern(text, text)
+
+            try:
+                # 解析时间
+                start_time = _parse_ass_time(data_items[start_index].strip())
+                end_time = _parse_ass_time(data_items[end_index].strip())
+            except ValueError:
+                handler.handle(
+                    InvalidTimeFormatError(f"时间格式错误: {line}"),
+                    line_offsets[i + 1],
+                )
+                continue
+
+            # 更新时间范围
+            earliest_start_time = min(earliest_start_time, start_time)
+            latest_end_time = max(latest_end_time, end_time)
+
+            # 创建Cue对象
+            cue = Cue(start=start_time, end=end_time, text=text, index=i)
+            cues.append(cue)
+
+            # 根据类型存储数据
+            stripped_items = [intern(item, item) for item in map(str.strip, data_items)]
+            stripped_items[text_index] = text
+            if event_type == "Dialogue":
+                text_dialogue.append(stripped_items)
+            elif event_type == "Comment":
+                text_comment.append(stripped_items)
+
+            if rows is not None:
+                rows.append(
+                    AssEventRow(
+                        kind=event_type,
+                        fields=stripped_items,
+                        cue=cue,
+                        start=start_time,
+                        end=end_time,
+                        text=text,
+                        trivia_start=previous_end,
+                        line_start=line_offsets[i + 1],
+                        line_end=line_ends[i + 1],
+                    )
+                )
+                previous_end = line_ends[i + 1]
+
+    events["Dialogue"] = text_dialogue
+    events["Comment"] = text_comment
+    duration = latest_end_time - earliest_start_time if cues else 0.0
+
+    return events, cues, duration
+
+
+class MemoryReport(NamedTuple):
+    """String memory of ASS event tables, see ass_memory_report
+    ASS 事件表的字符串内存统计，见 ass_memory_report"""
+
+    strings: int  # References to field and text strings
+    unique: int  # Distinct string objects behind those references
+    unshared_bytes: int  # Size if every reference held its own string
+    shared_bytes: int  # Size of the distinct string objects
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.unshared_bytes - self.shared_bytes
+
+    @property
+    def ratio(self) -> float:
+        """Shared size / unshared size (lower is better)"""
+        return self.shared_bytes / self.unshared_bytes if self.unshared_bytes else 1.0
+
+
+def ass_memory_report(subtitles: Iterable[Subtitle]) -> MemoryReport:
+    """
+    Measures how much string memory interning saves over a corpus of ASS subtitles.
+    统计一批 ASS 字幕中字符串共享节省的内存。
+
+    Counts the event fields in AssInfo.events and the cue texts; a string shared by
+    several rows is counted once in shared_bytes and once per reference in
+    unshared_bytes.
+    统计 AssInfo.events 中的事件字段和字幕块文本；被多行共享的字符串在 shared_bytes
+    中只计一次，在 unshared_bytes 中按引用次数计算。
+
+    :param subtitles: Subtitle objects (or a single one) loaded from ASS files.
+    :param subtitles: 从 ASS 文件加载的 Subtitle 对象 (或单个对象)。
+    """
+    if isinstance(subtitles, Subtitle):
+        subtitles = [subtitles]
+    strings = 0
+    unshared_bytes = 0
+    seen = {}  # id -> distinct string object (kept alive so ids stay unique)
+    for subtitle in subtitles:
+        values = [cue.text for cue in subtitle.cues]
+        ass_info = subtitle.info.other_info
+        if isinstance(ass_info, AssInfo):
+            for kind in ("Dialogue", "Comment"):
+                for fields in ass_info.events.get(kind, ()):
+                    values.extend(fields)
+        for value in values:
+            size = sys.getsizeof(value)
+            strings += 1
+            unshared_bytes += size
+            seen[id(value)] = value
+    return MemoryReport(
+        strings=strings,
+        unique=len(seen),
+        unshared_bytes=unshared_bytes,
+        shared_bytes=sum(map(sys.getsizeof, seen.values())),
+    )
+
+
+def parse_ass_fonts(content: str) -> dict:
+    """
+    解析 ASS 格式的 [Fonts] 部分，并返回一个字典。
+    Parse the [Fonts] section of ASS format and return a dictionary.
+    """
+    fonts = []
+    for line in content.split("\n"):
+        line = line.strip()
+        if line and not line.startswith("!"):
+            fonts.append(line)
+    return {"fonts": fonts}
+
+
+def parse_ass_graphics(content: str) -> dict:
+    """
+    解析 ASS 格式的 [Graphics] 部分，并返回一个字典。
+    Parse the [Graphics] section of ASS format and return a dictionary.
+    """
+    graphics = []
+    for line in content.split("\n"):
+        line = line.strip()
+        if line and not line.startswith("!"):
+            graphics.append(line)
+    return {"graphics": graphics}
+
+
+def parse_ass(file_path: str, content: str, errors: str = LENIENT) -> Subtitle:
+    """
+    解析 ASS 格式的文本内容，并返回一个 Subtitle 对象。
+    组成:
+        [Script Info]
+        [V4+ Styles]
+        [Events]
+        [fonts]
+        [Graphics]
+    Parse ASS format text content and return a Subtitle object.
+    Components:
+        [Script Info]
+        [V4+ Styles]
+        [Events]
+        [fonts]
+        [Graphics]
+
+    errors: 错误策略 'strict' / 'lenient' / 'collect' (见 fairy_subtitle.diagnostics)
+    errors: Error policy 'strict' / 'lenient' / 'collect' (see fairy_subtitle.diagnostics)
+    """
+    handler = ErrorHandler(content, errors)
+
+    # 使用正则表达式分割各个部分
+    parts = {}
+    part_offsets = {}  # 各部分内容在文件中的偏移量
+    sections = []  # (部分名称, 标题行开始, 部分结束) / (name, header start, end)
+    current_part = None
+    current_content = []
+    position = 0
+
+    # 按标题行把文件分割为各个部分
+    with stage("scan") as stats:
+        for line in content.split("\n"):
+            # 检查是否是新的部分开始
+            if line.strip().startswith("[") and line.strip().endswith("]"):
+                # 如果有当前部分，保存它
+                if current_part is not None:
+                    parts[current_part] = "\n".join(current_content)
+                # 开始新的部分
+                current_part = line.strip()
+                current_content = []
+                part_offsets[current_part] = position + len(line) + 1
+                if sections:
+                    sections[-1][2] = position
+                sections.append([current_part, position, None])
+            else:
+                if current_part is not None:
+                    current_content.append(line)
+            position += len(line) + 1
+
+        # 保存最后一个部分
+        if current_part is not None:
+            parts[current_part] = "\n".join(current_content)
+            sections[-1][2] = len(content)
+        if stats is not None:
+            stats.size = len(content)
+
+    # 初始化默认值
+    script_info = {}
+    v4_style = {}
+    events = {}
+    rows = []
+    cues = []
+    duration = 0.0
+    fonts = {}
+    graphics = {}
+
+    # 解析各个部分
+    with stage("build") as stats:
+        if "[Script Info]" in parts:
+            script_info = parse_ass_script_info(parts["[Script Info]"])
+
+        if "[V4+ Styles]" in parts:
+            v4_style = parse_ass_v4_style(parts["[V4+ Styles]"])
+
+        if "[Events]" in parts:
+            events, cues, duration = parse_ass_events(
+                parts["[Events]"], handler, part_offsets["[Events]"], rows
+            )
+
+        if "[Fonts]" in parts:
+            fonts = parse_ass_fonts(parts["[Fonts]"])
+
+        if "[Graphics]" in parts:
+            graphics = parse_ass_graphics(parts["[Graphics]"])
+        if stats is not None:
+            stats.cues = len(cues)
+
+    # 创建 AssInfo 对象
+    ass_info = AssInfo(
+        script_Info=script_info,
+        v4_Styles=v4_style,
+        events=events,
+        fonts=fonts,
+        graphics=graphics,
+        source=content,
+        sections=[tuple(section) for section in sections],
+        rows=rows,
+        parsed=_section_state(script_info, v4_style, events, fonts, graphics),
+    )
+
+    # 创建 SubtitleInfo 对象
+    info = SubtitleInfo(
+        path=file_path,
+        format="ass",
+        duration=round(duration, 3),
+        size=len(cues),
+        other_info=ass_info,
+        diagnostics=handler.diagnostics,
+    )
+
+    return Subtitle(cues=cues, info=info)
+
+
+def _parse_ass_time(time_str: str) -> float:
+    """将 'H:MM:SS.cc' 格式的时间转换为秒数 (float)，小数部分是厘秒"""
+    h, m, s_cs = time_str.split(":")
+    s, fraction = s_cs.split(".")
+    # 小数部分按十进制小数解析: "5" / "50" / "500" 都是 0.5 秒
+    ms = int(fraction[:3].ljust(3, "0"))
+    total_ms = int(h) * 3600000 + int(m) * 60000 + int(s) * 1000 + ms
+    return total_ms / 1000
+
+
+def _format_ass_time(seconds: float) -> str:
+    """将秒数转换为ASS格式时间字符串 (H:MM:SS.cc)
+    Convert seconds to ASS format time string (H:MM:SS.cc)
+    """
+    # 先取整到厘秒，避免浮点误差 (7.8 实际是 7.79999...) 使结果少一个单位
+    centiseconds = round(seconds * 100)
+    hours, centiseconds = divmod(centiseconds, 360000)
+    minutes, centiseconds = divmod(centiseconds, 6000)
+    seconds_int, centiseconds = divmod(centiseconds, 100)
+    return f"{hours:d}:{minutes:02d}:{seconds_int:02d}.{centiseconds:02d}"
+
+
+# 与 AssInfo 字段对应的部分，修改后需要重新生成
+# Sections backed by an AssInfo field, regenerated when that field was edited
+_SECTION_FIELDS = {
+    "[Script Info]": "script_Info",
+    "[V4+ Styles]": "v4_Styles",
+    "[Fonts]": "fonts",
+    "[Graphics]": "graphics",
+}
+
+# 新增事件行的默认字段值 / Default field values of new event lines
+_EVENT_DEFAULTS = {
+    "Layer": "0",
+    "Style": "Default",
+    "MarginL": "0",
+    "MarginR": "0",
+    "MarginV": "0",
+}
+
+_DEFAULT_EVENT_FORMAT = [
+    "Layer",
+    "Start",
+    "End",
+    "Style",
+    "Name",
+    "MarginL",
+    "MarginR",
+    "MarginV",
+    "Effect",
+    "Text",
+]
+
+
+def _section_state(
+    script_info: dict, v4_style: dict, events: dict, fonts: dict, graphics: dict
+) -> dict:
+    """Copies of the parsed sections, compared with AssInfo on write to find edits"""
+    return {
+        "[Script Info]": dict(script_info),
+        "[V4+ Styles]": {name: list(items) for name, items in v4_style.items()},
+        "[Events]": list(events.get("Format", [])),
+        "[Fonts]": {name: list(items) for name, items in fonts.items()},
+        "[Graphics]": {name: list(items) for name, items in graphics.items()},
+    }
+
+
+def to_ass(subtitle: Subtitle) -> str:
+    """将Subtitle对象转换为ASS格式字符串
+    Convert Subtitle object to ASS format string
+
+    从 ASS 文件加载的字幕会保留原有的样式、脚本信息、注释和事件字段，
+    未修改的部分逐字节写回 (见 iter_ass)。
+    Subtitles loaded from ASS keep their styles, script info, comments and event
+    fields, unchanged parts are written back byte for byte (see iter_ass).
+    """
+    return "".join(iter_ass(subtitle))
+
+
+def iter_ass(subtitle: Subtitle) -> Iterator[str]:
+    """
+    Writes ASS chunk by chunk.
+    逐块输出 ASS 内容。
+
+    When the subtitle was parsed from ASS, the source is walked section by section:
+    unchanged sections and event lines are copied from the source, edited ones are
+    rendered from AssInfo and the cues, and new cues get Dialogue lines with
+    default fields. Other subtitles get a fixed header with a Default style.
+    字幕由 ASS 解析而来时，按部分遍历原文：未修改的部分和事件行从原文复制，
+    修改过的部分根据 AssInfo 和字幕块重新生成，新增的字幕块使用默认字段生成 Dialogue 行。
+    其他字幕使用固定的文件头和 Default 样式。
+    """
+    ass_info = subtitle.info.other_info
+    if not isinstance(ass_info, AssInfo) or ass_info.source is None:
+        yield from _iter_plain_ass(subtitle)
+        return
+
+    source = ass_info.source
+    position = 0
+    has_events = False
+    for name, start, end in ass_info.sections:
+        yield source[position:start]
+        if name == "[Events]":
+            has_events = True
+            yield from _iter_ass_events(subtitle, ass_info, start, end)
+        elif name in _SECTION_FIELDS and getattr(
+            ass_info, _SECTION_FIELDS[name]
+        ) != ass_info.parsed.get(name):
+            yield _render_section(ass_info, name, source[start:end])
+        else:
+            yield source[start:end]
+        position = end
+    yield source[position:]
+
+    if not has_events and subtitle.cues:
+        # 原文没有 [Events] 部分: 追加一个
+        format_items = ass_info.events.get("Format") or _DEFAULT_EVENT_FORMAT
+        yield "\n\n[Events]\nFormat: " + ", ".join(format_items)
+        for cue in subtitle.cues:
+            yield "\n" + _render_event("Dialogue", None, cue, format_items)
+
+
+def _iter_ass_events(
+    subtitle: Subtitle, ass_info: AssInfo, start: int, end: int
+) -> Iterator[str]:
+    """The [Events] section: matched event lines are copied from the source when
+    neither the cue nor the fields changed"""
+    source = ass_info.source
+    rows = ass_info.rows
+    format_items = ass_info.events.get("Format") or _DEFAULT_EVENT_FORMAT
+    format_changed = format_items != ass_info.parsed.get("[Events]")
+
+    # 标题行和 Format 行之后即为第一行事件之前的内容
+    if rows:
+        header_end = rows[0].trivia_start
+    else:
+        format_start = source.find("Format:", start, end)
+        header_end = source.find("\n", format_start, end) if format_start >= 0 else -1
+        if header_end < 0:
+            header_end = end
+    if format_changed:
+        yield source[start:header_end].split("\n", 1)[0]
+        yield "\nFormat: " + ", ".join(format_items)
+    else:
+        yield source[start:header_end]
+
+    matched = _match_rows(subtitle.cues, rows)
+    used = set(k for k in matched if k is not None)
+    max_split = len(ass_info.parsed.get("[Events]") or format_items) - 1
+    next_row = 0  # 尚未输出的第一行 / First source row not yet passed
+    previous = None  # 上一个字幕块对应的行 / Row of the previous cue
+    for cue, k in zip(subtitle.cues, matched):
+        if k is None:
+            # 新字幕块 (split / merge / insert 产生) 继承来源行的样式、层、说话人、边距和特效
+            # New cues (from split / merge / insert) inherit the style, layer, actor,
+            # margins and effect of the row they come from
+            source_row = _merged_row(cue, rows, used, next_row)
+            if source_row is not None:
+                # 合并的结果占据第一个被合并行的位置，保留它之前的注释和空行
+                # A merged cue takes the place of the first row merged into it,
+                # keeping the lines before that row
+                for j in range(next_row, source_row):
+                    yield _removed_trivia(source, rows[j])
+                next_row = source_row + 1
+                previous = rows[source_row]
+                yield source[previous.trivia_start : previous.line_start]
+                yield _render_event(
+                    previous.kind, previous.fields, cue, format_items
+                )
+                continue
+            template = previous
+            if template is None and next_row < len(rows):
+                # 插入到开头: 使用第一行 / Inserted at the start: use the first row
+                template = rows[next_row]
+            if template is None:
+                yield "\n" + _render_event("Dialogue", None, cue, format_items)
+            else:
+                kind = template.kind if cue.text == template.text else "Dialogue"
+                yield "\n" + _render_event(kind, template.fields, cue, format_items)
+            continue
+
+        if k >= next_row:
+            # 被删除的行之前的注释和空行保留下来 / Keep the lines before removed rows
+            for j in range(next_row, k):
+                if j not in used:
+                    yield _removed_trivia(source, rows[j])
+            next_row = k + 1
+        row = rows[k]
+        previous = row
+        yield source[row.trivia_start : row.line_start]
+        line = source[row.line_start : row.line_end]
+        if (
+            not format_changed
+            and cue.start == row.start
+            and cue.end == row.end
+            and cue.text == row.text
+            and [
+                item.strip() for item in line.split(":", 1)[1].split(",", max_split)
+            ]
+            == row.fields
+        ):
+            yield line
+        else:
+            yield _render_event(row.kind, row.fields, cue, format_items)
+
+    for j in range(next_row, len(rows)):
+        if j not in used:
+            yield _removed_trivia(source, rows[j])
+    yield source[rows[-1].line_end if rows else header_end : end]
+
+
+def _match_rows(cues: list, rows: list) -> list:
+    """Row position of each cue in rows, or None for new cues. Cues are matched by
+    object first; copied cues (materialized views, copy) then by content"""
+    by_cue = {id(row.cue): k for k, row in enumerate(rows)}
+    matched = []
+    used = set()
+    for cue in cues:
+        k = by_cue.get(id(cue))
+        if k is not None and rows[k].cue is cue and k not in used:
+            used.add(k)
+            matched.append(k)
+        else:
+            matched.append(None)
+    if None not in matched:
+        return matched
+
+    by_content = {}
+    for k in range(len(rows) - 1, -1, -1):
+        if k not in used:
+            row = rows[k]
+            by_content.setdefault((row.start, row.end, row.text), []).append(k)
+    for i, cue in enumerate(cues):
+        if matched[i] is None:
+            candidates = by_content.get((cue.start, cue.end, cue.text))
+            if candidates:
+                matched[i] = candidates.pop()
+    return matched
+
+
+def _merged_row(cue: Cue, rows: list, used: set, next_row: int) -> Optional[int]:
+    """Position of the removed row a new cue was merged from: the first of the
+    unmatched rows before the next matched one that starts with the cue"""
+    for j in range(next_row, len(rows)):
+        if j in used:
+            break
+        row = rows[j]
+        if row.start == cue.start and cue.text.startswith(row.text):
+            return j
+    return None
+
+
+def _removed_trivia(source: str, row: AssEventRow) -> str:
+    """The lines before a removed row (comments, blank lines), without the line
+    break that ended them, since the removed line itself is not written"""
+    trivia = source[row.trivia_start : row.line_start]
+    return trivia[: trivia.rfind("\n")] if "\n" in trivia else trivia
+
+
+def _render_event(
+    kind: str, fields: Optional[list], cue: Cue, format_items: list
+) -> str:
+    """Renders one event line, the Start/End/Text fields come from the cue"""
+    values = []
+    for i, name in enumerate(format_items):
+        if name == "Start":
+            values.append(_format_ass_time(cue.start))
+        elif name == "End":
+            values.append(_format_ass_time(cue.end))
+        elif name == "Text":
+            values.append(cue.text.replace("\n", "\\N"))
+        elif fields is not None and i < len(fields):
+            values.append(fields[i])
+        else:
+            values.append(_EVENT_DEFAULTS.get(name, ""))
+    return f"{kind}: " + ",".join(values)
+
+
+def _render_section(ass_info: AssInfo, name: str, text: str) -> str:
+    """Regenerates an edited section, keeping the whitespace that follows it"""
+    body = text.rstrip()
+    trailing = text[len(body) :]
+    lines = [name]
+    if name == "[Script Info]":
+        # 保留原有的行顺序和注释，只替换、删除或追加键值
+        script_info = ass_info.script_Info
+        written = set()
+        for line in body.split("\n")[1:]:
+            key = line.split(":", 1)[0].strip() if ":" in line else None
+            if key in ass_info.parsed[name]:
+                if key in script_info:
+                    lines.append(f"{key}: {script_info[key]}")
+                    written.add(key)
+                continue
+            lines.append(line)
+        for key, value in script_info.items():
+            if key not in written:
+                lines.append(f"{key}: {value}")
+    elif name == "[V4+ Styles]":
+        for style_name, items in ass_info.v4_Styles.items():
+            if style_name == "Format":
+                lines.append("Format: " + ", ".join(items))
+            else:
+                lines.append("Style: " + ",".join(items))
+    else:
+        for items in getattr(ass_info, _SECTION_FIELDS[name]).values():
+            lines.extend(items)
+    return "\n".join(lines) + trailing
+
+
+def _iter_plain_ass(subtitle: Subtitle) -> Iterator[str]:
+    """Fixed header with a Default style, used for subtitles not parsed from ASS"""
+    ass_content = [
+        "[Script Info]",
+        "Title: Converted Subtitle",
+        "ScriptType: v4.00+",
+        "PlayResX: 1920",
+        "PlayResY: 1080",
+        "Aspect Ratio: 16:9",
+        "Collisions: Normal",
+        "Timer: 100.0000",
+        "WrapStyle: 0",
+        "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+        "Style: Default,Arial,20,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,2,2,10,10,10,0",
+        "",
+        "[Events]",
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+    ]
+    yield "\n".join(ass_content)
+
+    for cue in subtitle.cues:
+        start_time = _format_ass_time(cue.start)
+        end_time = _format_ass_time(cue.end)
+        # 简单转换，只保留文本内容
+        text = cue.text.replace("\n", "\\N")
+        yield f"\nDialogue: 0,{start_time},{end_time},Default,,0,0,0,,{text}"
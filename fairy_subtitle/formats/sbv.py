@@ -0,0 +1,160 @@
+# fairy_subtitle/formats/sbv.py
+
+import re
+from typing import Iterable, Iterator
+
+from fairy_subtitle.diagnostics import STRICT, ErrorHandler
+from fairy_subtitle.exceptions import (
+    InvalidSubtitleContentError,
+    InvalidTimeFormatError,
+    ParseError,
+)
+from fairy_subtitle.formats import iter_blocks, split_at_timing_lines, split_blocks
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+from fairy_subtitle.profiling import stage
+
+# SBV 字幕块之间由两个或更多的换行符分隔
+_BLOCK_SEPARATOR = re.compile(r"\n\s*\n")
+# SBV 时间戳格式 (00:00:00.000,00:00:00.000)
+_TIMESTAMP_PATTERN = re.compile(r"\d{2}:\d{2}:\d{2}\.\d{3},\d{2}:\d{2}:\d{2}\.\d{3}")
+# 位于行首的时间轴行，用于重新同步
+_TIMING_LINE = re.compile(r"^[ \t]*\d+:\d+:\d+\.\d+,\d+:\d+:\d+\.\d+", re.MULTILINE)
+
+
+def parse_sbv(file_path: str, content: str, errors: str = STRICT) -> Subtitle:
+    """
+    解析 SBV 格式的文本内容，并返回一个 Subtitle 对象。
+    Parse SBV format text content and return a Subtitle object.
+
+    errors: 错误策略 'strict' / 'lenient' / 'collect' (见 fairy_subtitle.diagnostics)
+    errors: Error policy 'strict' / 'lenient' / 'collect' (see fairy_subtitle.diagnostics)
+    """
+    handler = ErrorHandler(content, errors)
+    cues = []
+
+    # 按空行分割字幕块 / Split the blocks at blank lines
+    with stage("scan") as stats:
+        blocks = list(split_blocks(content, _BLOCK_SEPARATOR))
+        if stats is not None:
+            stats.size = len(content)
+            stats.cues = len(blocks)
+
+    with stage("build") as stats:
+        for offset, block in blocks:
+            if handler.strict:
+                cues.append(_parse_sbv_block(block, len(cues)))
+                continue
+
+            # 非严格模式下，在每条时间轴行处重新同步
+            pieces = [(0, block)]
+            first_newline = block.find("\n")
+            if first_newline >= 0 and _TIMING_LINE.search(block, first_newline + 1):
+                pieces = split_at_timing_lines(
+                    block, _TIMING_LINE.match, has_index=False
+                )
+            for piece_offset, piece in pieces:
+                try:
+                    cues.append(_parse_sbv_block(piece, len(cues)))
+                except ParseError as e:
+                    handler.handle(e, offset + piece_offset)
+        if stats is not None:
+            stats.cues = len(cues)
+
+    duration = 0.0
+    if cues:
+        duration = max(cue.end for cue in cues) - min(cue.start for cue in cues)
+
+    # 创建 SubtitleInfo 对象
+    info = SubtitleInfo(
+        path=file_path,
+        format="sbv",
+        duration=round(duration, 3),
+        size=len(cues),
+        other_info=None,
+        diagnostics=handler.diagnostics,
+    )
+
+    return Subtitle(cues=cues, info=info)
+
+
+def iter_sbv(lines: Iterable[str]) -> Iterator[Cue]:
+    """
+    逐块解析 SBV 格式的文本行，每解析出一个字幕块就产出一个 Cue 对象。
+    Parse SBV format lines block by block, yielding a Cue object for each block.
+    """
+    for index, block in enumerate(iter_blocks(lines)):
+        yield _parse_sbv_block(block, index)
+
+
+def validate_sbv(content: str) -> bool:
+    """
+    Validates if content matches SBV format characteristics
+    验证内容是否符合SBV格式特征
+
+    SBV format typically starts with timestamps in format "00:00:00.000,00:00:00.000"
+    SBV格式通常以时间戳格式 "00:00:00.000,00:00:00.000" 开头
+    """
+    return bool(_TIMESTAMP_PATTERN.search(content))
+
+
+def _parse_sbv_block(block: str, index: int) -> Cue:
+    """解析单个 SBV 字幕块"""
+    lines = block.strip().split("\n")
+    if len(lines) < 2:
+        raise InvalidSubtitleContentError(f"无效的字幕块，行数不足2行:\n{block}")
+
+    try:
+        # 1. 解析时间轴
+        time_sbv = lines[0]
+        start_str, end_str = time_sbv.split(",")
+        start_time = _parse_sbv_time(start_str)
+        end_time = _parse_sbv_time(end_str)
+
+        # 2. 解析文本 (可能有多行)
+        text = "\n".join(lines[1:])
+
+    except (ValueError, IndexError) as e:
+        if "unpack" in str(e):
+            raise InvalidTimeFormatError(f"时间格式错误: {time_sbv}")
+        elif "int" in str(e):
+            raise InvalidTimeFormatError(f"时间格式错误: {time_sbv}")
+        else:
+            raise InvalidSubtitleContentError(f"解析字幕块失败: {e}")
+
+    # 3. 创建 Cue 对象
+    return Cue(start=start_time, end=end_time, text=text, index=index)
+
+
+def _parse_sbv_time(time_str: str) -> float:
+    """将 'HH:MM:SS.ms' 格式的时间转换为秒数 (float)"""
+    h, m, s_ms = time_str.split(":")
+    s, ms = s_ms.split(".")
+    total_ms = int(h) * 3600000 + int(m) * 60000 + int(s) * 1000 + int(ms)
+    return total_ms / 1000
+
+
+def _format_sbv_time(seconds: float) -> str:
+    """将秒数转换为SBV格式时间字符串 (HH:MM:SS.ms)
+    Convert seconds to SBV format time string (HH:MM:SS.ms)
+    """
+    # 先取整到毫秒，避免浮点误差 (7.8 实际是 7.79999...) 使结果少一个单位
+    milliseconds = round(seconds * 1000)
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds_int, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds_int:02d}.{milliseconds:03d}"
+
+
+def to_sbv(subtitle: Subtitle) -> str:
+    """将Subtitle对象转换为SBV格式字符串
+    Convert Subtitle object to SBV format string
+    """
+    sbv_content = []
+    for i, cue in enumerate(subtitle.cues, 1):
+        sbv_content.append(str(i))
+        start_time = _format_sbv_time(cue.start)
+        end_time = _format_sbv_time(cue.end)
+        sbv_content.append(f"{start_time} --> {end_time}")
+        sbv_content.append(cue.text)
+        sbv_content.append("")  # 空行分隔字幕块
+    return "\n".join(sbv_content)
@@ -0,0 +1,125 @@
+# fairy_subtitle/formats/scanner.py
+# SRT/VTT 字幕块扫描器：把文本切分为以空行分隔的字幕块，并解析每块的第一条时间轴行
+# SRT/VTT block scanner: splits text into blank-line separated blocks and parses
+# the first timing line of each block
+#
+# 如果编译了 fairy_subtitle._scanner 扩展模块，则使用其 C 实现，否则使用本模块的纯 Python 实现。
+# The C implementation in fairy_subtitle._scanner is used when it has been built,
+# otherwise the pure-Python implementation below is used.
+#
+# scan_blocks(text, decimal) 返回 7 个等长的 array("q") 列，每个字幕块占一个位置:
+# scan_blocks(text, decimal) returns seven parallel array("q") columns, one entry per block:
+#   starts, ends      开始/结束时间 (毫秒)；-1 表示没有时间轴行，-2 表示时间轴行无效
+#                     start/end time in ms; -1 if there is no timing line, -2 if it is invalid
+#   block_starts      字幕块第一个非空白字符的位置 / offset of the block's first non-space char
+#   timing_starts     时间轴行的位置，没有时为 -1 / offset of the timing line, -1 if missing
+#   settings_starts   结束时间之后的位置，时间轴无效时为 -1 / offset after the end time, -1 if invalid
+#   text_starts       时间轴行下一行的位置，没有时等于 block_ends / offset of the line after the timing line
+#   block_ends        字幕块最后一个非空白字符之后的位置 / offset after the block's last non-space char
+
+import re
+from array import array
+
+# 每个时间字段最多 9 位数字，与 C 实现保持一致
+_TIMESTAMP = r"(\d{1,9}):(\d{1,9})(?::(\d{1,9}))?%s(\d{1,9})"
+_timing_patterns = {}
+
+
+def _timing_pattern(decimal: str):
+    """Returns the compiled timing line pattern for the specified decimal separator
+    返回指定小数分隔符对应的时间轴行正则表达式"""
+    pattern = _timing_patterns.get(decimal)
+    if pattern is None:
+        timestamp = _TIMESTAMP % re.escape(decimal)
+        pattern = re.compile(
+            timestamp + r"[ \t]*-->[ \t]*" + timestamp + r"(?!\d)", re.ASCII
+        )
+        _timing_patterns[decimal] = pattern
+    return pattern
+
+
+def _to_ms(a: str, b: str, c, fraction: str) -> int:
+    """Converts matched timestamp fields to milliseconds
+    将匹配到的时间字段转换为毫秒"""
+    if c is None:
+        return int(a) * 60000 + int(b) * 1000 + int(fraction)
+    return int(a) * 3600000 + int(b) * 60000 + int(c) * 1000 + int(fraction)
+
+
+def scan_blocks_py(text: str, decimal: str) -> tuple:
+    """Pure-Python implementation of scan_blocks
+    scan_blocks 的纯 Python 实现"""
+    timing = _timing_pattern(decimal)
+    starts, ends = array("q"), array("q")
+    block_starts, timing_starts, settings_starts = array("q"), array("q"), array("q")
+    text_starts, block_ends = array("q"), array("q")
+
+    in_block = False
+    text_pending = False
+    start = end = block_start = timing_start = settings_start = 0
+    text_start = block_end = -1
+    line_start = 0
+    for line in text.split("\n"):
+        stripped = line.lstrip()
+        if not stripped:
+            # 空行结束当前字幕块
+            if in_block:
+                starts.append(start)
+                ends.append(end)
+                block_starts.append(block_start)
+                timing_starts.append(timing_start)
+                settings_starts.append(settings_start)
+                text_starts.append(block_end if text_start < 0 else text_start)
+                block_ends.append(block_end)
+                in_block = False
+        else:
+            first = line_start + len(line) - len(stripped)
+            if not in_block:
+                in_block = True
+                text_pending = False
+                start = end = -1
+                block_start = first
+                timing_start = settings_start = text_start = -1
+            if text_pending:
+                text_start = line_start
+                text_pending = False
+            if timing_start < 0 and "-->" in stripped:
+                text_pending = True
+                timing_start = first
+                match = timing.match(stripped)
+                if match:
+                    start = _to_ms(*match.group(1, 2, 3, 4))
+                    end = _to_ms(*match.group(5, 6, 7, 8))
+                    settings_start = first + match.end()
+                else:
+                    start = end = -2
+            block_end = line_start + len(line.rstrip())
+        line_start += len(line) + 1
+
+    if in_block:
+        starts.append(start)
+        ends.append(end)
+        block_starts.append(block_start)
+        timing_starts.append(timing_start)
+        settings_starts.append(settings_start)
+        text_starts.append(block_end if text_start < 0 else text_start)
+        block_ends.append(block_end)
+
+    return (
+        starts,
+        ends,
+        block_starts,
+        timing_starts,
+        settings_starts,
+        text_starts,
+        block_ends,
+    )
+
+
+try:
+    from fairy_subtitle._scanner import scan_blocks
+
+    HAS_C_SCANNER = True
+except ImportError:
+    scan_blocks = scan_blocks_py
+    HAS_C_SCANNER = False
@@ -0,0 +1,204 @@
+# fairy_subtitle/formats/srt.py
+
+import re
+from typing import Iterable, Iterator
+
+from fairy_subtitle.diagnostics import STRICT, ErrorHandler
+from fairy_subtitle.exceptions import (
+    InvalidSubtitleContentError,
+    InvalidTimeFormatError,
+    ParseError,
+)
+from fairy_subtitle.formats import iter_blocks, split_at_timing_lines
+from fairy_subtitle.formats.scanner import scan_blocks
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+from fairy_subtitle.profiling import stage
+
+# SRT 时间戳格式 (00:00:00,000 --> 00:00:00,000)
+_TIMESTAMP_PATTERN = re.compile(r"\d{2}:\d{2}:\d{2},\d{3} --> \d{2}:\d{2}:\d{2},\d{3}")
+
+
+def parse_srt(file_path: str, content: str, errors: str = STRICT) -> Subtitle:
+    """
+    解析 SRT 格式的文本内容，并返回一个 Subtitle 对象。
+    Parse SRT format text content and return a Subtitle object.
+
+    errors: 错误策略 'strict' / 'lenient' / 'collect' (见 fairy_subtitle.diagnostics)
+    errors: Error policy 'strict' / 'lenient' / 'collect' (see fairy_subtitle.diagnostics)
+    """
+    handler = ErrorHandler(content, errors)
+    if not content.strip():
+        handler.handle(
+            InvalidSubtitleContentError(f"无效的字幕块，行数不足3行:\n{content}"), 0
+        )
+
+    cues = []
+    # 一次扫描得到所有字幕块的时间 (毫秒) 和文本位置
+    with stage("scan") as stats:
+        (
+            starts,
+            ends,
+            block_starts,
+            timing_starts,
+            settings_starts,
+            text_starts,
+            block_ends,
+        ) = scan_blocks(content, ",")
+        if stats is not None:
+            stats.size = len(content)
+            stats.cues = len(starts)
+
+    with stage("build") as stats:
+        for i in range(len(starts)):
+            block_start = block_starts[i]
+            text_start = text_starts[i]
+            block_end = block_ends[i]
+            try:
+                # 标准字幕块: 序号行 + 时间轴行 + 至少一行文本
+                if starts[i] < 0 or text_start >= block_end:
+                    raise ValueError
+                index = int(content[block_start : timing_starts[i]]) - 1
+                settings = content[settings_starts[i] : text_start]
+                if settings and not settings.isspace():
+                    raise ValueError
+                text = content[text_start:block_end]
+                # 非严格模式下，文本中的时间轴行说明缺少了分隔空行
+                if not handler.strict and "-->" in text:
+                    raise ValueError
+            except ValueError:
+                # 非标准字幕块逐行解析，以给出准确的错误信息
+                cues.extend(
+                    _parse_irregular_block(
+                        content[block_start:block_end], block_start, handler
+                    )
+                )
+            else:
+                cues.append(
+                    Cue(
+                        start=starts[i] / 1000,
+                        end=ends[i] / 1000,
+                        text=text,
+                        index=index,
+                    )
+                )
+        if stats is not None:
+            stats.cues = len(cues)
+
+    duration = 0.0
+    if cues:
+        duration = max(cue.end for cue in cues) - min(cue.start for cue in cues)
+
+    # 创建 SubtitleInfo 对象
+    info = SubtitleInfo(
+        path=file_path,
+        format="srt",
+        duration=round(duration, 3),
+        size=len(cues),
+        other_info=None,
+        diagnostics=handler.diagnostics,
+    )
+
+    return Subtitle(cues=cues, info=info)
+
+
+def iter_srt(lines: Iterable[str]) -> Iterator[Cue]:
+    """
+    逐块解析 SRT 格式的文本行，每解析出一个字幕块就产出一个 Cue 对象。
+    Parse SRT format lines block by block, yielding a Cue object for each block.
+    """
+    for block in iter_blocks(lines):
+        yield _parse_srt_block(block)
+
+
+def validate_srt(content: str) -> bool:
+    """
+    Validates if content matches SRT format characteristics
+    验证内容是否符合SRT格式特征
+
+    SRT format typically starts with numbers followed by timestamp format (00:00:00,000 --> 00:00:00,000)
+    SRT格式通常以数字开头，后面跟着时间戳格式 (00:00:00,000 --> 00:00:00,000)
+    """
+    return bool(_TIMESTAMP_PATTERN.search(content))
+
+
+def _is_timing_line(line: str) -> bool:
+    return "-->" in line
+
+
+def _parse_irregular_block(block: str, offset: int, handler: ErrorHandler) -> list:
+    """解析非标准字幕块，非严格模式下在每条时间轴行处重新同步"""
+    if handler.strict:
+        return [_parse_srt_block(block)]
+
+    cues = []
+    for piece_offset, piece in split_at_timing_lines(
+        block, _is_timing_line, has_index=True
+    ):
+        try:
+            cues.append(_parse_srt_block(piece))
+        except ParseError as e:
+            handler.handle(e, offset + piece_offset)
+    return cues
+
+
+def _parse_srt_block(block: str) -> Cue:
+    """解析单个 SRT 字幕块"""
+    lines = block.strip().split("\n")
+    if len(lines) < 3:
+        raise InvalidSubtitleContentError(f"无效的字幕块，行数不足3行:\n{block}")
+
+    # 1. 解析序号
+    try:
+        index = int(lines[0]) - 1
+    except ValueError:
+        raise InvalidSubtitleContentError(f"序号格式错误: {lines[0]}")
+
+    # 2. 解析时间轴
+    time_str = lines[1]
+    try:
+        start_str, end_str = time_str.split(" --> ")
+        start_time = _parse_srt_time(start_str)
+        end_time = _parse_srt_time(end_str)
+    except ValueError:
+        raise InvalidTimeFormatError(f"时间格式错误: {time_str}")
+
+    # 3. 解析文本 (可能有多行)
+    text = "\n".join(lines[2:])
+
+    # 4. 创建 Cue 对象
+    return Cue(start=start_time, end=end_time, text=text, index=index)
+
+
+def _parse_srt_time(time_str: str) -> float:
+    """将 'HH:MM:SS,ms' 格式的时间转换为秒数 (float)"""
+    h, m, s_ms = time_str.split(":")
+    s, ms = s_ms.split(",")
+    total_ms = int(h) * 3600000 + int(m) * 60000 + int(s) * 1000 + int(ms)
+    return total_ms / 1000
+
+
+def _format_srt_time(seconds: float) -> str:
+    """将秒数转换为SRT格式时间字符串 (HH:MM:SS,ms)
+    Convert seconds to SRT format time string (HH:MM:SS,ms)
+    """
+    # 先取整到毫秒，避免浮点误差 (7.8 实际是 7.79999...) 使结果少一个单位
+    milliseconds = round(seconds * 1000)
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds_int, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds_int:02d},{milliseconds:03d}"
+
+
+def to_srt(subtitle: Subtitle) -> str:
+    """将Subtitle对象转换为SRT格式字符串
+    Convert Subtitle object to SRT format string
+    """
+    srt_content = []
+    for i, cue in enumerate(subtitle.cues, 1):
+        srt_content.append(str(i))
+        start_time = _format_srt_time(cue.start)
+        end_time = _format_srt_time(cue.end)
+        srt_content.append(f"{start_time} --> {end_time}")
+        srt_content.append(cue.text)
+        srt_content.append("")  # 空行分隔字幕块
+    return "\n".join(srt_content)
@@ -0,0 +1,148 @@
+# fairy_subtitle/formats/sub.py
+
+import re
+
+from fairy_subtitle.diagnostics import STRICT, ErrorHandler
+from fairy_subtitle.exceptions import InvalidSubtitleContentError
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+from fairy_subtitle.profiling import stage
+from fairy_subtitle.timing import (
+    FramerateLike,
+    Timebase,
+    format_framerate,
+    plain_framerate,
+)
+
+# MicroDVD字幕使用{帧范围}文本格式
+_CUE_PATTERN = re.compile(r"\{([0-9]+)\}\{([0-9]+)\}(.*?)(?=\{[0-9]+\}|$)", re.DOTALL)
+# 指定帧率的信息行的文本: "{0}{0}#$#23.976" 或常见的 "{1}{1}23.976"
+_FPS_TEXT = re.compile(r"(?:#\$#)?([0-9]+(?:\.[0-9]+)?(?:/[0-9]+)?)")
+# 格式验证使用的特征
+_VALIDATE_PATTERN = re.compile(r"\{[0-9]+\}\{[0-9]+\}")
+
+
+def parse_sub(file_path: str, content: str, errors: str = STRICT) -> Subtitle:
+    """
+    解析MicroDVD (.sub)格式的文本内容，并返回一个Subtitle对象。
+    Parse MicroDVD (.sub) format text content and return a Subtitle object.
+
+    errors: 错误策略 'strict' / 'lenient' / 'collect' (见 fairy_subtitle.diagnostics)
+    errors: Error policy 'strict' / 'lenient' / 'collect' (see fairy_subtitle.diagnostics)
+    """
+    handler = ErrorHandler(content, errors)
+    cues = []
+    with stage("scan") as stats:
+        matches = list(_CUE_PATTERN.finditer(content))
+        if stats is not None:
+            stats.size = len(content)
+            stats.cues = len(matches)
+
+    # 默认帧率24，如果第一行是指定帧率的信息行，使用指定的帧率 (支持 23.976 等 NTSC 帧率)
+    fps = 24
+    if matches and matches[0].group(1) == matches[0].group(2):
+        fps_match = _FPS_TEXT.fullmatch(matches[0].group(3).strip())
+        if fps_match:
+            matches = matches[1:]
+            try:
+                fps = plain_framerate(fps_match.group(1))
+            except ValueError:
+                handler.handle(
+                    InvalidSubtitleContentError(f"帧率格式错误: {fps_match.group(1)}"), 0
+                )
+    timebase = Timebase(fps)
+
+    earliest_start_time = float("inf")
+    latest_end_time = 0
+    index = 0
+
+    with stage("build") as stats:
+        for match in matches:
+            start_frame, end_frame, text = match.groups()
+            try:
+                # 1. 解析时间轴（将帧号转换为秒数）
+                start_time = timebase.frame_to_seconds(int(start_frame))
+                end_time = timebase.frame_to_seconds(int(end_frame))
+                earliest_start_time = min(earliest_start_time, start_time)
+                latest_end_time = max(latest_end_time, end_time)
+
+                # 2. 处理文本
+                text = text.strip().replace("|", "\n")  # MicroDVD使用|分隔多行文本
+
+                # 3. 创建Cue对象并添加到列表
+                cue = Cue(start=start_time, end=end_time, text=text, index=index)
+                cues.append(cue)
+                index += 1
+
+            except (ValueError, OverflowError) as e:
+                handler.handle(
+                    InvalidSubtitleContentError(f"解析MicroDVD字幕块失败: {e}"),
+                    match.start(),
+                )
+                continue
+        if stats is not None:
+            stats.cues = len(cues)
+
+    if not cues:
+        handler.handle(InvalidSubtitleContentError("未找到有效的MicroDVD字幕块"), 0)
+        earliest_start_time = latest_end_time = 0
+
+    # 创建SubtitleInfo对象
+    info = SubtitleInfo(
+        path=file_path,
+        format="sub",
+        duration=round(latest_end_time - earliest_start_time, 3),
+        size=len(cues),
+        other_info={"fps": fps},  # 保存帧率信息
+        diagnostics=handler.diagnostics,
+    )
+
+    return Subtitle(cues=cues, info=info)
+
+
+def validate_sub(content: str) -> bool:
+    """
+    Validates if content matches MicroDVD (.sub) format characteristics
+    验证内容是否符合MicroDVD (.sub)格式特征
+
+    MicroDVD format typically uses {frame_range}text format
+    MicroDVD格式通常使用{帧范围}文本格式
+    """
+    return bool(_VALIDATE_PATTERN.search(content))
+
+
+def _parse_sub_time(time_str: str, fps: FramerateLike = 24) -> float:
+    """将MicroDVD格式的帧号转换为秒数 (帧率可以是 24000/1001 这样的有理数)
+    Convert MicroDVD format frame number to seconds (fps may be rational)
+    """
+    return Timebase(fps).frame_to_seconds(int(time_str))
+
+
+def _format_sub_time(time: float, fps: FramerateLike = 24) -> str:
+    """将秒数转换为MicroDVD格式的帧号
+    Convert seconds to MicroDVD format frame number
+    """
+    return str(Timebase(fps).seconds_to_frame(time))
+
+
+def to_sub(subtitle: Subtitle) -> str:
+    """将Subtitle对象转换为MicroDVD (.sub)格式字符串
+    Convert Subtitle object to MicroDVD (.sub) format string
+    """
+    sub_content = []
+
+    # 获取帧率信息，如果没有则使用默认值24 (其他格式的 other_info 不是字典)
+    other_info = subtitle.info.other_info
+    fps = other_info.get("fps", 24) if isinstance(other_info, dict) else 24
+
+    # 添加帧率信息行
+    sub_content.append(f"{{0}}{{0}}#$#{format_framerate(fps)}")
+
+    timebase = Timebase(fps)
+    for cue in subtitle.cues:
+        start_frame = timebase.seconds_to_frame(cue.start)
+        end_frame = timebase.seconds_to_frame(cue.end)
+        # 将多行文本转换为MicroDVD格式（使用|分隔）
+        text = cue.text.replace("\n", "|")
+        sub_content.append(f"{{{start_frame}}}{{{end_frame}}}{text}")
+
+    return "\n".join(sub_content)
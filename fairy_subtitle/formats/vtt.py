@@ -0,0 +1,335 @@
+# fairy_subtitle/formats/vtt.py
+
+import re
+from typing import Iterable, Iterator, Optional
+
+from fairy_subtitle.diagnostics import LENIENT, ErrorHandler
+from fairy_subtitle.exceptions import InvalidTimeFormatError, ParseError
+from fairy_subtitle.formats import iter_blocks, split_at_timing_lines
+from fairy_subtitle.formats.scanner import scan_blocks
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo, VttInfo
+from fairy_subtitle.profiling import stage
+
+# 时间戳的正则表达式
+_TIMESTAMP_PATTERN = re.compile(
+    r"(\d{2}:\d{2}:\d{2}\.\d{3}|\d{2}:\d{2}\.\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2}\.\d{3}|\d{2}:\d{2}\.\d{3})"
+)
+
+
+def parse_vtt(file_path: str, content: str, errors: str = LENIENT) -> Subtitle:
+    """
+    解析 VTT 格式的文本内容，并返回一个 Subtitle 对象。
+    Parse VTT format text content and return a Subtitle object.
+
+    字幕块的标识符和设置保存在 Cue.identifier / Cue.settings 中，文件头、STYLE 和 REGION
+    块保存在 info.other_info (VttInfo) 中，to_vtt 会把它们写回。
+    Cue identifiers and settings are kept in Cue.identifier / Cue.settings, the
+    header, STYLE and REGION blocks in info.other_info (VttInfo); to_vtt writes them back.
+
+    errors: 错误策略 'strict' / 'lenient' / 'collect' (见 fairy_subtitle.diagnostics)
+    errors: Error policy 'strict' / 'lenient' / 'collect' (see fairy_subtitle.diagnostics)
+    """
+    cues = []
+    vtt_info = VttInfo()
+
+    # 处理BOM
+    if content.startswith("\ufeff"):
+        content = content[1:]
+
+    # 一次扫描得到所有字幕块的时间 (毫秒) 和文本位置，每个字幕块只匹配一次时间轴
+    with stage("scan") as stats:
+        (
+            starts,
+            ends,
+            block_starts,
+            timing_starts,
+            settings_starts,
+            text_starts,
+            block_ends,
+        ) = scan_blocks(content, ".")
+        if stats is not None:
+            stats.size = len(content)
+            stats.cues = len(starts)
+    handler = ErrorHandler(content, errors)
+
+    with stage("build") as stats:
+        for i in range(len(starts)):
+            block_start = block_starts[i]
+            block_end = block_ends[i]
+            timing_start = timing_starts[i]
+
+            # 没有时间轴的块: WEBVTT 头部、STYLE、REGION 和注释
+            if timing_start < 0:
+                _parse_metadata_block(content[block_start:block_end], i, vtt_info)
+                continue
+            if content.startswith(("NOTE", "STYLE"), block_start):
+                continue
+
+            text = content[text_starts[i] : block_end]
+            if starts[i] < 0 or "-->" in text:
+                # 非标准字幕块使用正则逐行解析
+                cues.extend(
+                    _parse_irregular_block(
+                        content[block_start:block_end], block_start, handler
+                    )
+                )
+                continue
+
+            # 跳过序号行 (数字行) 和空行
+            text_lines = [line.strip() for line in text.split("\n")]
+            text = "\n".join(
+                line for line in text_lines if line and not line.isdecimal()
+            )
+            if not text:
+                continue
+            cue = Cue(start=starts[i] / 1000, end=ends[i] / 1000, text=text)
+            # 时间轴行之前是标识符，时间轴之后是设置
+            if timing_start > block_start:
+                identifier = content[block_start:timing_start].rstrip()
+                if i == 0 and identifier.startswith("WEBVTT"):
+                    # 文件头后面没有空行
+                    vtt_info.header = identifier[6:]
+                else:
+                    cue.identifier = identifier
+            settings_start = settings_starts[i]
+            if settings_start < block_end and content[settings_start] != "\n":
+                line_end = content.find("\n", settings_start, block_end)
+                settings = content[
+                    settings_start : block_end if line_end < 0 else line_end
+                ].strip()
+                if settings:
+                    cue.settings = settings
+            cues.append(cue)
+        if stats is not None:
+            stats.cues = len(cues)
+
+    # 设置索引
+    for i, cue in enumerate(cues):
+        cue.index = i
+
+    # 计算时长
+    duration = 0.0
+    if cues:
+        duration = max(cue.end for cue in cues) - min(cue.start for cue in cues)
+
+    # 创建 SubtitleInfo 对象
+    info = SubtitleInfo(
+        path=file_path,
+        format="vtt",
+        duration=round(duration, 3),
+        size=len(cues),
+        other_info=vtt_info,
+        diagnostics=handler.diagnostics,
+    )
+
+    return Subtitle(cues=cues, info=info)
+
+
+def parse_cue_settings(settings: Optional[str]) -> dict:
+    """
+    Splits cue settings ("align:start position:10%") into a dictionary.
+    把字幕块设置 ("align:start position:10%") 拆分为字典。
+    """
+    if not settings:
+        return {}
+    result = {}
+    for setting in settings.split():
+        name, _, value = setting.partition(":")
+        if name and value:
+            result[name] = value
+    return result
+
+
+def _parse_metadata_block(block: str, block_number: int, vtt_info: VttInfo):
+    """Records the header, STYLE and REGION blocks in vtt_info, ignores NOTE blocks"""
+    first_line, _, rest = block.partition("\n")
+    if block_number == 0 and first_line.startswith("WEBVTT"):
+        vtt_info.header = block[6:]
+        return
+    keyword = first_line.strip()
+    if keyword == "STYLE":
+        vtt_info.styles.append(rest.strip())
+    elif keyword == "REGION":
+        vtt_info.regions.append(parse_cue_settings(rest))
+
+
+def iter_vtt(lines: Iterable[str]) -> Iterator[Cue]:
+    """
+    逐块解析 VTT 格式的文本行，每解析出一个字幕块就产出一个 Cue 对象。
+    Parse VTT format lines block by block, yielding a Cue object for each block.
+    """
+    index = 0
+    for block in iter_blocks(lines):
+        if index == 0 and block.startswith("\ufeff"):
+            block = block[1:]
+        try:
+            cue = _parse_vtt_block(block)
+        except ParseError:
+            # 与 parse_vtt 的默认策略一致，跳过无效的字幕块
+            continue
+        if cue is not None:
+            cue.index = index
+            index += 1
+            yield cue
+
+
+def validate_vtt(content: str) -> bool:
+    """
+    Validates if content matches VTT format characteristics
+    验证内容是否符合VTT格式特征
+
+    VTT format typically starts with "WEBVTT"
+    VTT格式通常以"WEBVTT"开头
+    """
+    return content.strip().startswith("WEBVTT")
+
+
+def _parse_vtt_block(block: str) -> Optional[Cue]:
+    """解析单个 VTT 字幕块，头部、注释、样式块或没有文本的块返回 None，
+    时间轴无效时抛出 InvalidTimeFormatError
+
+    逐行处理：时间轴行之前为标识符，之后为文本，只对含有 "-->" 的行匹配时间戳"""
+    stripped = block.strip()
+    # 跳过空块、WEBVTT头部、注释块和样式块
+    if not stripped or stripped == "WEBVTT" or stripped.startswith(("NOTE", "STYLE")):
+        return None
+
+    lines = block.split("\n")
+    timestamp_match = None
+    timing_line = -1
+    for n, line in enumerate(lines):
+        if "-->" in line:
+            timestamp_match = _TIMESTAMP_PATTERN.search(line)
+            if timestamp_match:
+                timing_line = n
+                break
+    if timestamp_match is None:
+        if "-->" in block:
+            first = next(line for line in lines if "-->" in line)
+            raise InvalidTimeFormatError(f"时间格式错误: {first.strip()}")
+        return None
+
+    # 提取字幕文本 (时间戳后面的部分)，跳过序号行 (数字行)、空行和多余的时间轴行
+    text_lines = []
+    for line in lines[timing_line + 1 :]:
+        line = line.strip()
+        if not line or line.isdecimal():
+            continue
+        if "-->" in line and _TIMESTAMP_PATTERN.search(line):
+            continue
+        text_lines.append(line)
+
+    # 如果有文本内容，创建字幕
+    if not text_lines:
+        return None
+    cue = Cue(
+        start=_parse_vtt_time(timestamp_match.group(1)),
+        end=_parse_vtt_time(timestamp_match.group(2)),
+        text="\n".join(text_lines),
+        index=None,
+    )
+    identifier = "\n".join(line.strip() for line in lines[:timing_line]).strip()
+    if identifier and not identifier.startswith("WEBVTT"):
+        cue.identifier = identifier
+    settings = lines[timing_line][timestamp_match.end() :].strip()
+    if settings:
+        cue.settings = settings
+    return cue
+
+
+def _is_timing_line(line: str) -> bool:
+    return "-->" in line
+
+
+def _parse_irregular_block(block: str, offset: int, handler: ErrorHandler) -> list:
+    """解析非标准字幕块，非严格模式下在每条时间轴行处重新同步"""
+    pieces = [(0, block)]
+    if not handler.strict:
+        pieces = split_at_timing_lines(block, _is_timing_line, has_index=True)
+
+    cues = []
+    for piece_offset, piece in pieces:
+        try:
+            cue = _parse_vtt_block(piece)
+        except ParseError as e:
+            handler.handle(e, offset + piece_offset)
+            continue
+        if cue is not None:
+            cues.append(cue)
+    return cues
+
+
+def _parse_vtt_time(time_str: str) -> float:
+    """将 VTT 格式的时间字符串转换为秒数 (float)"""
+    # VTT 格式: 00:00:00.000 或 00:00.000
+    parts = time_str.split(":")
+    if len(parts) == 2:
+        # MM:SS.mmm 格式
+        minutes, seconds_ms = parts
+        hours = 0
+    elif len(parts) == 3:
+        # HH:MM:SS.mmm 格式
+        hours, minutes, seconds_ms = parts
+    else:
+        raise InvalidTimeFormatError(f"无效的 VTT 时间格式: {time_str}")
+
+    seconds, ms = seconds_ms.split(".")
+    total_ms = int(hours) * 3600000 + int(minutes) * 60000 + int(seconds) * 1000
+    return (total_ms + int(ms)) / 1000
+
+
+def _format_vtt_time(seconds: float) -> str:
+    """将秒数转换为VTT格式时间字符串 (HH:MM:SS.mmm)
+    Convert seconds to VTT format time string (HH:MM:SS.mmm)
+    """
+    # 先取整到毫秒，避免浮点误差 (7.8 实际是 7.79999...) 使结果少一个单位
+    milliseconds = round(seconds * 1000)
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds_int, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds_int:02d}.{milliseconds:03d}"
+
+
+def to_vtt(subtitle: Subtitle) -> str:
+    """将Subtitle对象转换为VTT格式字符串，保留文件头、REGION、STYLE 块以及字幕块的标识符和设置
+    Convert Subtitle object to VTT format string, keeping the header, REGION and
+    STYLE blocks and the cue identifiers and settings
+    """
+    vtt_info = _vtt_info(subtitle)
+    vtt_content = ["WEBVTT" + vtt_info.header, ""]
+    vtt_content += _metadata_lines(vtt_info)
+    for cue in subtitle.cues:
+        vtt_content += _cue_lines(cue)
+    return "\n".join(vtt_content)
+
+
+def _vtt_info(subtitle: Subtitle) -> VttInfo:
+    vtt_info = subtitle.info.other_info
+    return vtt_info if isinstance(vtt_info, VttInfo) else VttInfo()
+
+
+def _metadata_lines(vtt_info: VttInfo) -> list[str]:
+    """REGION 和 STYLE 块的各行 (每块后面有一个空行)"""
+    lines = []
+    for region in vtt_info.regions:
+        lines.append("REGION")
+        lines.extend(f"{name}:{value}" for name, value in region.items())
+        lines.append("")
+    for style in vtt_info.styles:
+        lines.append("STYLE")
+        if style:
+            lines.append(style)
+        lines.append("")
+    return lines
+
+
+def _cue_lines(cue: Cue) -> list[str]:
+    """一个字幕块的各行 (后面有一个空行)"""
+    lines = [cue.identifier] if cue.identifier else []
+    timing = f"{_format_vtt_time(cue.start)} --> {_format_vtt_time(cue.end)}"
+    if cue.settings:
+        timing += " " + cue.settings
+    lines.append(timing)
+    lines.append(cue.text)
+    lines.append("")  # 空行分隔字幕块
+    return lines
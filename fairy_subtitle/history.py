@@ -0,0 +1,274 @@
+# fairy_subtitle/history.py
+# 字幕的快照与撤销：快照按块保存字幕块，未修改的块在快照之间共享
+# Subtitle snapshots for undo: cues are stored in chunks, and unchanged chunks are
+# shared between snapshots
+#
+# 快照中的每个字幕块保存为不可变的元组 (start, end, text, identifier, settings)，
+# 每 CHUNK_SIZE 个组成一个块。Subtitle 记录自上次快照以来各次修改前后未触及的字幕块
+# 数量 (见 Subtitle._before_mutation)，下一次快照只重建中间被修改的块，其余的块直接
+# 从上一个快照复用。
+# Each cue of a snapshot is an immutable tuple (start, end, text, identifier,
+# settings), CHUNK_SIZE of them per chunk. A Subtitle records how many cues at its
+# start and end were left untouched by the edits since its last snapshot (see
+# Subtitle._before_mutation); the next snapshot rebuilds only the chunks in between
+# and reuses the others from the previous snapshot.
+
+from array import array
+from bisect import bisect_right
+from dataclasses import replace
+from typing import Iterator, Optional
+
+from .models import Cue, Subtitle, SubtitleInfo, _copy_other_info
+
+CHUNK_SIZE = 256
+# 比这更小的块在重建时与相邻的修改合并，避免反复编辑后块越来越碎
+# Smaller chunks are rebuilt together with an adjacent edit, so that repeated
+# edits do not fragment the sequence
+_MIN_CHUNK = CHUNK_SIZE // 4
+
+
+class _Chunk:
+    """Up to CHUNK_SIZE cues of a snapshot"""
+
+    __slots__ = ("states", "deltas")
+
+    def __init__(self, states: tuple, deltas: Optional[tuple]):
+        self.states = states  # (start, end, text, identifier, settings) per cue
+        # Cue.index 与位置之差，全部为 0 (序号等于位置) 时为 None
+        # Cue.index minus the position, None when every index equals its position
+        self.deltas = deltas
+
+
+class SubtitleSnapshot:
+    """
+    Immutable state of a Subtitle, returned by Subtitle.snapshot().
+    Subtitle 的不可变状态，由 Subtitle.snapshot() 返回。
+
+    Cues read from a snapshot are new Cue objects, so the snapshot never changes.
+    从快照读取的字幕块都是新的 Cue 对象，快照本身永远不变。
+    """
+
+    __slots__ = ("_chunks", "_offsets", "_info", "__weakref__")
+
+    def __init__(self, chunks: list, info: SubtitleInfo):
+        self._chunks = tuple(chunks)
+        offsets = array("q", [0])  # 每个块的起始位置 / Start position of each chunk
+        for chunk in self._chunks:
+            offsets.append(offsets[-1] + len(chunk.states))
+        self._offsets = offsets
+        self._info = info
+
+    def __len__(self) -> int:
+        return self._offsets[-1]
+
+    def __getitem__(self, position: int) -> Cue:
+        size = len(self)
+        if position < 0:
+            position += size
+        if not 0 <= position < size:
+            raise IndexError("Index out of range")
+        k = bisect_right(self._offsets, position) - 1
+        return _make_cue(self._chunks[k], position - self._offsets[k], position)
+
+    def __iter__(self) -> Iterator[Cue]:
+        for chunk, offset in zip(self._chunks, self._offsets):
+            for i in range(len(chunk.states)):
+                yield _make_cue(chunk, i, offset + i)
+
+    def __repr__(self) -> str:
+        return (
+            f"SubtitleSnapshot(cues={len(self)}, chunks={len(self._chunks)}, "
+            f"path={self._info.path!r})"
+        )
+
+    @property
+    def info(self) -> SubtitleInfo:
+        """A copy of the subtitle information at the time of the snapshot
+        快照时的字幕信息的副本"""
+        return _copy_info(self._info)
+
+    @property
+    def duration(self) -> float:
+        return self._info.duration
+
+    def to_subtitle(self) -> Subtitle:
+        """
+        Returns a new Subtitle with the cues and information of the snapshot.
+        返回包含快照中字幕块和信息的新 Subtitle。
+        """
+        subtitle = Subtitle(cues=list(self), info=self.info)
+        subtitle._snapshot = self
+        return subtitle
+
+
+def snapshot(subtitle: Subtitle, verify: bool = False) -> SubtitleSnapshot:
+    """
+    Takes a snapshot of the subtitle, sharing the chunks that did not change since
+    the previous snapshot.
+    为字幕创建快照，与上一个快照共享自那以后没有变化的块。
+
+    Edits made through the Subtitle methods (merge / split / insert / remove ...)
+    are tracked, so a snapshot after a local edit only copies the chunks around it.
+    After other edits (shift, or changing Cue objects directly) the chunks are
+    compared with the previous snapshot, and the equal ones are still shared.
+    通过 Subtitle 的方法 (merge / split / insert / remove ...) 进行的修改会被记录，
+    局部修改之后的快照只复制修改位置附近的块。其他修改 (shift，或直接修改 Cue 对象)
+    之后，逐块与上一个快照比较，相同的块仍然共享。
+
+    :param verify: Compare all chunks with the previous snapshot, use it after
+                   changing Cue objects directly.
+    :param verify: 逐块与上一个快照比较，直接修改 Cue 对象之后使用。
+    """
+    base = subtitle._snapshot
+    dirty = subtitle._dirty
+    if verify:
+        dirty = (0, 0)
+    cues = subtitle.cues
+    count = len(cues)
+    info = _copy_info(subtitle.info)
+
+    if base is None:
+        chunks = _build_chunks(cues, 0, count)
+    elif dirty is None:
+        # 自上次快照以来没有修改 / Nothing changed since the last snapshot
+        chunks = base._chunks
+    else:
+        chunks = _rebuild(base, cues, dirty[0], dirty[1], dirty == (0, 0))
+
+    result = SubtitleSnapshot(chunks, info)
+    subtitle._snapshot = result
+    subtitle._dirty = None
+    return result
+
+
+def restore(subtitle: Subtitle, snapshot: SubtitleSnapshot) -> Subtitle:
+    """
+    In-place modification. Replaces the cues and information of the subtitle with
+    those of the snapshot.
+    就地修改。用快照中的字幕块和信息替换字幕的内容。
+
+    The cues are rebuilt as new Cue objects, so the snapshot can be restored again
+    later; other snapshots stay valid.
+    字幕块被重建为新的 Cue 对象，因此同一个快照之后还可以再次恢复，其他快照也不受影响。
+    """
+    if not isinstance(snapshot, SubtitleSnapshot):
+        raise TypeError(f"Expected a SubtitleSnapshot, got {type(snapshot).__name__}")
+    subtitle._before_mutation()
+    subtitle.cues[:] = list(snapshot)
+    subtitle.info = _copy_info(snapshot._info)
+    subtitle._snapshot = snapshot
+    subtitle._dirty = None
+    return subtitle
+
+
+def _rebuild(
+    base: SubtitleSnapshot, cues, head: int, tail: int, compare: bool
+) -> list:
+    """Chunks of cues, reusing the chunks of base among the first head and the last
+    tail cues (unchanged since base). With compare, other chunks equal to the cues
+    at the same position from either end are reused as well."""
+    count = len(cues)
+    old = base._chunks
+    head = min(head, count, len(base))
+    tail = min(tail, count - head, len(base) - head)
+
+    # 开头未修改的块 / Unchanged chunks at the start
+    first = 0
+    position = 0
+    while first < len(old):
+        chunk = old[first]
+        size = len(chunk.states)
+        if position + size > head and not (
+            compare and _matches(chunk, cues, position)
+        ):
+            break
+        position += size
+        first += 1
+    # 结尾未修改的块：它们随修改移动了位置，序号也已重新计算
+    # Unchanged chunks at the end: they moved with the edit and were renumbered
+    last = len(old)
+    end = count
+    while last > first:
+        chunk = old[last - 1]
+        size = len(chunk.states)
+        if end - size < position:
+            break
+        untouched = count - end + size <= tail
+        if untouched and chunk.deltas is None:
+            reusable = _indices_follow(cues, end - size, end)
+        else:
+            reusable = (untouched or compare) and _matches(chunk, cues, end - size)
+        if not reusable:
+            break
+        end -= size
+        last -= 1
+
+    # 把过小的相邻块并入重建范围 / Rebuild small neighbours with the edit
+    while first > 0 and len(old[first - 1].states) < _MIN_CHUNK:
+        first -= 1
+        position -= len(old[first].states)
+    while last < len(old) and len(old[last].states) < _MIN_CHUNK:
+        end += len(old[last].states)
+        last += 1
+
+    return [*old[:first], *_build_chunks(cues, position, end), *old[last:]]
+
+
+def _matches(chunk: _Chunk, cues, position: int) -> bool:
+    """Whether the cues from position equal the cues of the chunk"""
+    if position + len(chunk.states) > len(cues):
+        return False
+    return _states(cues, position, position + len(chunk.states)) == (
+        chunk.states,
+        chunk.deltas,
+    )
+
+
+def _indices_follow(cues, start: int, end: int) -> bool:
+    """Whether the indices of cues[start:end] equal their positions"""
+    return cues[start].index == start and cues[end - 1].index == end - 1
+
+
+def _build_chunks(cues, start: int, end: int) -> list:
+    chunks = []
+    # 均分为不超过 CHUNK_SIZE 的块 / Even chunks of at most CHUNK_SIZE cues
+    count = -(-(end - start) // CHUNK_SIZE)
+    for k in range(count):
+        chunk_start = start + (end - start) * k // count
+        chunk_end = start + (end - start) * (k + 1) // count
+        chunks.append(_Chunk(*_states(cues, chunk_start, chunk_end)))
+    return chunks
+
+
+def _states(cues, start: int, end: int) -> tuple:
+    states = []
+    deltas = []
+    nonzero = False
+    for position in range(start, end):
+        cue = cues[position]
+        states.append((cue.start, cue.end, cue.text, cue.identifier, cue.settings))
+        delta = None if cue.index is None else cue.index - position
+        if delta != 0:
+            nonzero = True
+        deltas.append(delta)
+    return tuple(states), tuple(deltas) if nonzero else None
+
+
+def _make_cue(chunk: _Chunk, i: int, position: int) -> Cue:
+    start, end, text, identifier, settings = chunk.states[i]
+    if chunk.deltas is None:
+        index = position
+    else:
+        delta = chunk.deltas[i]
+        index = None if delta is None else position + delta
+    return Cue(start, end, text, index, identifier, settings)
+
+
+def _copy_info(info: SubtitleInfo) -> SubtitleInfo:
+    """A copy of the information that shares nothing mutable with it (header, styles
+    and events in other_info included), so undo also restores their edits"""
+    return replace(
+        info,
+        other_info=_copy_other_info(info.other_info),
+        diagnostics=list(info.diagnostics),
+    )
@@ -0,0 +1,131 @@
+# fairy_subtitle/hls.py
+# 为 HLS 流媒体把字幕切分为固定时长的 WebVTT 分段，并生成媒体播放列表
+# Cut a subtitle into fixed-duration WebVTT segments with a media playlist for HLS
+
+import math
+import os
+from typing import NamedTuple, Optional
+
+from .formats.vtt import _cue_lines, _metadata_lines, _vtt_info
+from .models import Subtitle
+
+
+class HlsSegment(NamedTuple):
+    """One WebVTT segment written by segment()
+    segment() 写入的一个 WebVTT 分段"""
+
+    file_name: str  # File name in out_dir, as listed in the playlist
+    start: float  # Start of the segment in seconds
+    duration: float  # Duration of the segment in seconds
+    cues: int  # Cues written to the segment, repeated cues included
+
+
+def segment(
+    subtitle: Subtitle,
+    duration: float,
+    out_dir: str,
+    playlist: str = "index.m3u8",
+    name: str = "segment{}.vtt",
+    mpegts: int = 0,
+    total: Optional[float] = None,
+    live: bool = False,
+) -> list[HlsSegment]:
+    """
+    Writes the subtitle as WebVTT segments of duration seconds plus an HLS media
+    playlist, in one pass over the cues sorted by start time.
+    把字幕写成每段 duration 秒的 WebVTT 分段和 HLS 媒体播放列表，只需按开始时间
+    排序后遍历一次字幕块。
+
+    Every segment file starts with an X-TIMESTAMP-MAP header mapping local time 0 to
+    the MPEG-TS timestamp mpegts, and cue times stay absolute. A cue that spans
+    segment boundaries is written, with its full timing, to every segment it
+    overlaps, as HLS requires; players drop the repeats. Segments without cues
+    are still written, so the playlist has no gaps.
+    每个分段以 X-TIMESTAMP-MAP 开头，把本地时间 0 映射到 MPEG-TS 时间戳 mpegts，
+    字幕时间保持绝对时间。跨越分段边界的字幕块按 HLS 的要求以完整的时间写入它覆盖的
+    每个分段，播放器会去掉重复。没有字幕的分段也会写入，播放列表中不留空缺。
+
+    :param duration: Target segment duration in seconds.
+    :param duration: 分段的目标时长 (秒)。
+    :param playlist: File name of the media playlist written in out_dir.
+    :param playlist: 写入 out_dir 的媒体播放列表文件名。
+    :param name: Segment file name pattern, formatted with the segment number.
+    :param name: 分段文件名模板，用分段序号格式化。
+    :param mpegts: MPEG-TS timestamp (90 kHz) of the video's first frame.
+    :param mpegts: 视频第一帧的 MPEG-TS 时间戳 (90 kHz)。
+    :param total: Length of the media in seconds, defaults to the last cue end.
+    :param total: 媒体的时长 (秒)，默认为最后一个字幕块的结束时间。
+    :param live: Leave the playlist open (no EXT-X-ENDLIST, no VOD playlist type).
+    :param live: 播放列表保持开放 (不写 EXT-X-ENDLIST 和 VOD 类型)。
+    :return: The segments written, in order.
+    :return: 按顺序返回写入的分段。
+    """
+    if duration <= 0:
+        raise ValueError("duration must be positive")
+    cues = sorted(subtitle.cues, key=lambda cue: cue.start)
+    if total is None:
+        total = max((cue.end for cue in cues), default=0.0)
+    count = max(math.ceil(total / duration - 1e-9), 1)
+
+    vtt_info = _vtt_info(subtitle)
+    header = "\n".join(
+        [
+            "WEBVTT" + vtt_info.header,
+            f"X-TIMESTAMP-MAP=MPEGTS:{mpegts},LOCAL:00:00:00.000",
+            "",
+            *_metadata_lines(vtt_info),
+        ]
+    )
+    os.makedirs(out_dir, exist_ok=True)
+
+    segments = []
+    active = []  # 已开始、可能延续到当前分段的字幕块 / Cues started before the segment end
+    position = 0
+    for k in range(count):
+        segment_start = k * duration
+        segment_end = (k + 1) * duration
+        while position < len(cues) and cues[position].start < segment_end:
+            active.append(cues[position])
+            position += 1
+        # 与本分段重叠的字幕块；零时长的字幕块只属于其开始时间所在的分段
+        shown = [
+            cue
+            for cue in active
+            if cue.end > segment_start or cue.start >= segment_start
+        ]
+        lines = [header]
+        for cue in shown:
+            lines += _cue_lines(cue)
+        file_name = name.format(k)
+        with open(os.path.join(out_dir, file_name), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        # 最后一个分段到媒体结束为止 / The last segment ends with the media
+        length = min(segment_end, max(total, segment_start)) - segment_start
+        segments.append(HlsSegment(file_name, segment_start, length, len(shown)))
+        # 在本分段内结束的字幕块不会出现在后面的分段中
+        active = [cue for cue in active if cue.end > segment_end]
+
+    with open(os.path.join(out_dir, playlist), "w", encoding="utf-8") as f:
+        f.write(_playlist(segments, duration, live))
+    return segments
+
+
+def _playlist(segments: list, duration: float, live: bool) -> str:
+    """HLS media playlist listing the segments"""
+    # 每个分段的时长四舍五入后都不能超过 EXT-X-TARGETDURATION
+    target = max(round(s.duration) for s in segments)
+    target = max(target, math.ceil(duration - 1e-9), 1)
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        f"#EXT-X-TARGETDURATION:{target}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+    ]
+    if not live:
+        lines.append("#EXT-X-PLAYLIST-TYPE:VOD")
+    for s in segments:
+        lines.append(f"#EXTINF:{s.duration:.3f},")
+        lines.append(s.file_name)
+    if not live:
+        lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
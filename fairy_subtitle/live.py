@@ -0,0 +1,319 @@
+# fairy_subtitle/live.py
+# 直播字幕：持续追加字幕块，只在内存中保留最近一段时间的字幕
+# Live captions: cues are appended continuously and only a recent window is kept
+
+import re
+import time
+from dataclasses import replace
+from typing import Callable, Iterator, Optional
+
+from .diagnostics import COLLECT, ERROR_POLICIES, LENIENT, STRICT, Diagnostic
+from .exceptions import ParseError
+from .formats.srt import _parse_srt_block
+from .formats.vtt import _parse_vtt_block
+from .models import Cue, Subtitle, SubtitleInfo
+
+# 字幕块之间的空行 / Blank line between blocks
+_BLOCK_SEPARATOR = re.compile(r"\n[ \t\r]*\n")
+
+
+class LiveSubtitle:
+    """
+    Append-only subtitle that keeps the cues of the last window seconds.
+    只能追加的字幕，保留最近 window 秒内的字幕块。
+
+    Cues are stored in a ring buffer: append and eviction are O(1) amortized, and a
+    cue is found by position or by ID in O(1). Every cue gets a monotonically
+    increasing ID in Cue.index that never changes, even after older cues are
+    evicted. Cues are expected to arrive in start time order, as in a live stream.
+    字幕块保存在环形缓冲区中：追加和淘汰均摊 O(1)，按位置或 ID 查找为 O(1)。每个字幕块
+    在 Cue.index 中获得一个单调递增且不再改变的 ID，淘汰旧字幕块后也不变。字幕块应按
+    开始时间顺序到达 (直播流即是如此)。
+
+    Example:
+        live = LiveSubtitle(window=300)
+        for cue in live.follow(open("stream.vtt", encoding="utf-8")):
+            render(live.active(player_time()))
+    """
+
+    def __init__(
+        self,
+        window: float = 300.0,
+        format: str = "auto",
+        max_cues: Optional[int] = None,
+        errors: str = LENIENT,
+    ):
+        """
+        :param window: Cues that ended more than window seconds before the latest
+                       end time are evicted.
+        :param window: 结束时间早于最新结束时间 window 秒以上的字幕块会被淘汰。
+        :param format: Format of the text given to feed(): 'srt', 'vtt' or 'auto'.
+        :param format: feed() 接收的文本格式: 'srt'、'vtt' 或 'auto'。
+        :param max_cues: Optional upper bound on the number of cues kept.
+        :param max_cues: 可选，最多保留的字幕块数量。
+        :param errors: Error policy for invalid blocks in feed() (see
+                       fairy_subtitle.diagnostics).
+        :param errors: feed() 遇到无效字幕块时的错误策略 (见 fairy_subtitle.diagnostics)。
+        """
+        if window <= 0:
+            raise ValueError("window must be positive")
+        if format not in ("auto", "srt", "vtt"):
+            raise ValueError(f"Unsupported live format: {format}")
+        if errors not in ERROR_POLICIES:
+            raise ValueError(
+                f"Unknown error policy: {errors}, expected one of {ERROR_POLICIES}"
+            )
+        self.window = window
+        self.format = format
+        self.max_cues = max_cues
+        self.errors = errors
+        self.diagnostics = []  # Invalid blocks skipped in 'collect' mode
+        self.now = float("-inf")  # Latest end time seen (stream clock)
+
+        # 环形缓冲区，容量为 2 的幂 / Ring buffer, capacity is a power of two
+        self._ring: list = [None] * 16
+        self._head = 0
+        self._size = 0
+        self._next_id = 0
+        # 窗口内字幕块的最长时长的上界，用于 active() 提前结束查找
+        self._longest = 0.0
+
+        # feed() 的状态 / State of feed()
+        self._pending = ""  # 尚未结束的字幕块 / Text of the unfinished block
+        self._search_from = 0
+        self._offset = 0  # 已处理的字符数 / Characters consumed before _pending
+        self._line = 1  # _pending 开头的行号 / Line number where _pending starts
+        self._started = False
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, position: int) -> Cue:
+        """Cue by position in the window, 0 is the oldest"""
+        size = self._size
+        if position < 0:
+            position += size
+        if not 0 <= position < size:
+            raise IndexError("Index out of range")
+        return self._ring[(self._head + position) & (len(self._ring) - 1)]
+
+    def __iter__(self) -> Iterator[Cue]:
+        ring, head, mask = self._ring, self._head, len(self._ring) - 1
+        for position in range(self._size):
+            yield ring[(head + position) & mask]
+
+    def __repr__(self) -> str:
+        return (
+            f"LiveSubtitle(cues={self._size}, first_id={self.first_id}, "
+            f"window={self.window})"
+        )
+
+    @property
+    def first_id(self) -> int:
+        """ID of the oldest cue kept (the next ID when empty)"""
+        return self._next_id - self._size
+
+    @property
+    def last_id(self) -> int:
+        """ID of the newest cue, -1 before the first append"""
+        return self._next_id - 1
+
+    def get(self, cue_id: int) -> Cue:
+        """
+        Returns the cue with the specified ID.
+        返回指定 ID 的字幕块。
+
+        :raises KeyError: If the cue was evicted or does not exist yet.
+        :raises KeyError: 字幕块已被淘汰或尚不存在时。
+        """
+        position = cue_id - self.first_id
+        if not 0 <= position < self._size:
+            raise KeyError(cue_id)
+        return self[position]
+
+    def __contains__(self, cue_id: int) -> bool:
+        return 0 <= cue_id - self.first_id < self._size
+
+    def append(self, cue: Cue) -> int:
+        """
+        Appends a cue and evicts the cues that left the window.
+        追加一个字幕块，并淘汰移出窗口的字幕块。
+
+        :return: The ID given to the cue (also stored in cue.index).
+        :return: 分配给字幕块的 ID (同时保存在 cue.index 中)。
+        """
+        ring = self._ring
+        if self._size == len(ring):
+            # 容量翻倍，按顺序复制，均摊 O(1)
+            mask = len(ring) - 1
+            ring = [ring[(self._head + i) & mask] for i in range(self._size)]
+            ring += [None] * len(ring)
+            self._ring = ring
+            self._head = 0
+        cue.index = self._next_id
+        self._next_id += 1
+        ring[(self._head + self._size) & (len(ring) - 1)] = cue
+        self._size += 1
+        if cue.end > self.now:
+            self.now = cue.end
+        if cue.end - cue.start > self._longest:
+            self._longest = cue.end - cue.start
+        self._evict()
+        return cue.index
+
+    def active(self, time: float) -> list[Cue]:
+        """
+        Returns the cues visible at time, searching back from the newest cue.
+        返回指定时间显示的字幕块，从最新的字幕块向前查找。
+
+        Near the live edge this looks at a few cues only, whatever the window size.
+        在直播进度附近只需检查少量字幕块，与窗口大小无关。
+        """
+        cues = []
+        ring, head, mask = self._ring, self._head, len(self._ring) - 1
+        earliest = time - self._longest
+        for position in range(self._size - 1, -1, -1):
+            cue = ring[(head + position) & mask]
+            if cue.start < earliest:
+                break
+            if cue.start <= time < cue.end:
+                cues.append(cue)
+        cues.reverse()
+        return cues
+
+    def to_subtitle(self, path: str = "<live>") -> Subtitle:
+        """
+        Returns a Subtitle with copies of the cues in the window, indexed from 0.
+        返回包含窗口内字幕块副本的 Subtitle，序号从 0 开始。
+        """
+        cues = [replace(cue, index=i) for i, cue in enumerate(self)]
+        duration = 0.0
+        if cues:
+            duration = max(cue.end for cue in cues) - min(cue.start for cue in cues)
+        info = SubtitleInfo(
+            path=path,
+            format="srt" if self.format == "auto" else self.format,
+            duration=round(duration, 3),
+            size=len(cues),
+        )
+        return Subtitle(cues=cues, info=info)
+
+    def feed(self, text: str) -> list[Cue]:
+        """
+        Parses a chunk of a growing SRT / VTT stream and appends the complete cues.
+        解析持续增长的 SRT / VTT 流中的一段文本，并追加其中完整的字幕块。
+
+        A block is complete once the blank line after it has arrived; the rest is
+        kept until the next call or close(). Chunks may split lines anywhere.
+        字幕块在其后的空行到达后才算完整，剩余部分保留到下一次调用或 close()。
+        文本块可以在任意位置断开。
+
+        :return: The cues appended.
+        :return: 追加的字幕块。
+        """
+        if not self._started:
+            if not text:
+                return []
+            self._started = True
+            if text.startswith("\ufeff"):
+                text = text[1:]
+        pending = self._pending + text
+        appended = []
+        position = 0
+        for match in _BLOCK_SEPARATOR.finditer(pending, self._search_from):
+            self._add_block(pending, position, match.start(), appended)
+            position = match.end()
+        self._consume(pending, position)
+        # 未完成的分隔只可能从最后一个换行开始
+        # An unfinished separator can only start at the last newline
+        self._search_from = max(self._pending.rfind("\n"), 0)
+        return appended
+
+    def close(self) -> list[Cue]:
+        """
+        Parses the last block of a finished stream.
+        解析已结束的流中的最后一个字幕块。
+        """
+        appended = []
+        pending = self._pending
+        self._add_block(pending, 0, len(pending), appended)
+        self._consume(pending, len(pending))
+        self._search_from = 0
+        return appended
+
+    def read_from(self, stream) -> list[Cue]:
+        """
+        Feeds everything that can currently be read from a file-like object.
+        读取文件类对象当前可读的全部内容并解析。
+        """
+        appended = []
+        for chunk in iter(lambda: stream.read(65536), ""):
+            appended += self.feed(chunk)
+        return appended
+
+    def follow(
+        self,
+        stream,
+        interval: float = 0.5,
+        stop: Optional[Callable[[], bool]] = None,
+    ) -> Iterator[Cue]:
+        """
+        Follows a growing file-like object (like tail -f), yielding each new cue.
+        跟随持续增长的文件类对象 (类似 tail -f)，产出每个新的字幕块。
+
+        :param stop: Called before each read, following ends when it returns True.
+        :param stop: 每次读取前调用，返回 True 时结束跟随。
+        """
+        while stop is None or not stop():
+            appended = self.read_from(stream)
+            yield from appended
+            if not appended:
+                time.sleep(interval)
+
+    def _evict(self):
+        ring, mask = self._ring, len(self._ring) - 1
+        limit = self.now - self.window
+        max_cues = self.max_cues
+        while self._size:
+            cue = ring[self._head]
+            if cue.end > limit and (max_cues is None or self._size <= max_cues):
+                break
+            ring[self._head] = None
+            self._head = (self._head + 1) & mask
+            self._size -= 1
+        if not self._size:
+            self._longest = 0.0
+
+    def _add_block(self, pending: str, start: int, end: int, appended: list):
+        """Parses pending[start:end] as one block"""
+        # 换行符在这里统一，\r\n 可能被拆到两次 feed() 中
+        block = pending[start:end].replace("\r\n", "\n").strip("\n")
+        if not block.strip():
+            return
+        if self.format == "auto":
+            self.format = "vtt" if block.lstrip().startswith("WEBVTT") else "srt"
+        try:
+            if self.format == "vtt":
+                cue = _parse_vtt_block(block)
+            else:
+                cue = _parse_srt_block(block)
+        except ParseError as e:
+            if self.errors == STRICT:
+                raise
+            if self.errors == COLLECT:
+                # 与完整解析相同，位置指向第一个非空行的开头
+                # Like a full parse, point at the start of the first non-blank line
+                raw = pending[start:end]
+                start += raw.rfind("\n", 0, len(raw) - len(raw.lstrip())) + 1
+                line = self._line + pending.count("\n", 0, start)
+                self.diagnostics.append(Diagnostic(line, self._offset + start, str(e)))
+            return
+        if cue is not None:
+            self.append(cue)
+            appended.append(cue)
+
+    def _consume(self, pending: str, position: int):
+        """Drops pending[:position], keeping the stream offset and line number"""
+        self._offset += position
+        self._line += pending.count("\n", 0, position)
+        self._pending = pending[position:]
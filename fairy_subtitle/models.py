@@ -1,7 +1,11 @@
 # fairy_subtitle/models.py
 # A simple and powerful Python subtitle parsing library
 
-from dataclasses import dataclass
+import copy
+import weakref
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass, field, replace
 from typing import Optional
 
 
@@ -14,6 +18,10 @@ class Cue:
     end: float  # End time in seconds
     text: str  # Subtitle text
     index: Optional[int] = None  # SRT index number
+    # VTT 字幕块的标识符和设置 (position / line / align 等)，不参与比较
+    # VTT cue identifier and settings (position / line / align ...), not compared
+    identifier: Optional[str] = field(default=None, repr=False, compare=False)
+    settings: Optional[str] = field(default=None, repr=False, compare=False)
 
     @property
     def duration(self) -> float:
@@ -32,6 +40,22 @@ class AssInfo:
     events: dict
     fonts: dict
     graphics: dict  # 添加graphics字段
+    # 以下字段用于无损写回 ASS 文件 (见 fairy_subtitle.formats.ass.iter_ass)
+    # The fields below let the ASS writer reuse the unchanged parts of the source
+    source: Optional[str] = field(default=None, repr=False)  # Parsed text
+    sections: list = field(default_factory=list, repr=False)  # (name, start, end)
+    rows: list = field(default_factory=list, repr=False)  # AssEventRow per event line
+    parsed: Optional[dict] = field(default=None, repr=False)  # Section -> parsed copy
+
+
+@dataclass
+class VttInfo:
+    """WebVTT document information
+    WebVTT 文件的信息"""
+
+    header: str = ""  # Text after "WEBVTT" and the header lines below it
+    styles: list = field(default_factory=list)  # CSS of each STYLE block
+    regions: list = field(default_factory=list)  # Settings dict of each REGION block
 
 
 @dataclass
@@ -44,6 +68,7 @@ class SubtitleInfo:
     duration: float  # Duration of the subtitle file in seconds
     size: int  # Total number of subtitles
     other_info: any = None  # Other information about the subtitle file
+    diagnostics: list = field(default_factory=list)  # Errors recorded in 'collect' mode
 
 
 @dataclass
@@ -53,6 +78,17 @@ class Subtitle:
 
     cues: list[Cue]  # List of subtitles
     info: SubtitleInfo  # Subtitle information, currently supports srt
+    # 尚未复制的视图 (find / filter_by_time 的结果)，本对象修改前先让它们复制数据
+    _views: Optional[weakref.WeakValueDictionary] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    # 最近一次快照，以及此后的修改前后未触及的字幕块数量 (head, tail)，None 表示没有修改
+    # Latest snapshot, and the number of cues at the start and the end untouched by
+    # the edits since then (head, tail), None when nothing was edited
+    _snapshot: Optional[object] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _dirty: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
 
     def __len__(self) -> int:
         return self.info.size
@@ -64,14 +100,44 @@ class Subtitle:
         return iter(self.cues)
 
     def _recalculate_indices(self, index: int = 0):
-        """Recalculates SRT indices starting from the specified index
-        重新计算 SRT 序号, 从 index 开始"""
-        for i, cue in enumerate(self.cues, start=index):
-            cue.index = i
+        """Recalculates SRT indices starting from the specified index,
+        together with the total number of subtitles
+        重新计算 SRT 序号, 从 index 开始，同时更新字幕总数"""
+        cues = self.cues
+        for i in range(max(index, 0), len(cues)):
+            cues[i].index = i
+        self.info.size = len(cues)
+
+    def _before_mutation(self, head: int = 0, tail: int = 0):
+        """Copy-on-write: views of this subtitle copy their cues before it is modified.
+        head / tail: number of cues at the start / end the edit leaves untouched,
+        snapshot() only copies the chunks between them
+        写时复制：修改之前，先让本对象的视图复制各自的字幕块。
+        head / tail: 本次修改不会触及的开头 / 结尾的字幕块数量，snapshot() 只复制两者之间的块"""
+        if self._views:
+            for view in list(self._views.values()):
+                view._materialize()
+        self._views = None
+        if self._snapshot is not None:
+            if self._dirty is not None:
+                head = min(head, self._dirty[0])
+                tail = min(tail, self._dirty[1])
+            self._dirty = (head, tail)
+
+    def _view(self, indices: list[int]) -> "SubtitleView":
+        return SubtitleView(self, indices)
+
+    def _read_cues(self):
+        """The cues for reading only, without copying the cues of a view
+        只用于读取的字幕块，不会复制视图的字幕块"""
+        return self.cues
 
     def _recalcluate_duration(self):
         """Recalculates the total duration of the subtitle file
         重新计算字幕文件的时长"""
+        if not self.cues:
+            self.info.duration = 0.0
+            return
         earliest_start = min(cue.start for cue in self.cues)
         latest_end = max(cue.end for cue in self.cues)
         self.info.duration = latest_end - earliest_start
@@ -112,6 +178,11 @@ class Subtitle:
         返回字幕文件的其他信息"""
         return self.info.other_info
 
+    def get_diagnostics(self) -> list:
+        """Returns the parse errors recorded in 'collect' mode
+        返回 'collect' 模式下记录的解析错误"""
+        return self.info.diagnostics
+
     def get_path(self) -> str:
         """Returns the path to the subtitle file
         返回字幕文件路径"""
@@ -142,28 +213,33 @@ class Subtitle:
         将字幕文件中所有字幕的开始和结束时间都加上偏移量"""
         if offset == 0:
             return self
+        self._before_mutation()
         for cue in self.cues:
             cue.start += offset
             cue.end += offset
         return self
 
-    def find(self, text: str):
-        """Returns a new Subtitle object with Cue objects containing the specified text
-        返回包含指定文本的新 Subtitle 对象"""
-        matched_cues = [cue for cue in self.cues if text in cue.text]
-        return Subtitle(cues=matched_cues, info=self.info)
+    def find(self, text: str) -> "SubtitleView":
+        """Returns a view of the Cue objects containing the specified text,
+        its cues are copied on its first modification
+        返回包含指定文本的字幕块的视图，视图在第一次修改时才复制字幕块"""
+        return self._view(
+            [i for i, cue in enumerate(self._read_cues()) if text in cue.text]
+        )
 
-    def filter_by_time(self, start: float, end: float):
-        """Returns a new Subtitle object with subtitles within the specified time interval
-        返回在指定时间区间内的新 Subtitle 对象"""
+    def filter_by_time(self, start: float, end: float) -> "SubtitleView":
+        """Returns a view of the subtitles within the specified time interval,
+        its cues are copied on its first modification
+        返回在指定时间区间内的字幕块的视图，视图在第一次修改时才复制字幕块"""
         if start > end:
             start, end = end, start
-        filtered_cues = [
-            cue
-            for cue in self.cues
-            if start <= cue.start <= end or start <= cue.end <= end
-        ]
-        return Subtitle(cues=filtered_cues, info=self.info)
+        return self._view(
+            [
+                i
+                for i, cue in enumerate(self._read_cues())
+                if start <= cue.start <= end or start <= cue.end <= end
+            ]
+        )
 
     def merge(self, index1: int, index2: int):
         """In-place modification. Merges subtitles within a specified range.
@@ -172,6 +248,7 @@ class Subtitle:
             raise IndexError("Index out of range")
         if index1 == index2:
             return self
+        self._before_mutation(index1, len(self.cues) - index2 - 1)
         start_time = self.cues[index1].start
         end_time = self.cues[index2].end
         merged_text = "\n".join(cue.text for cue in self.cues[index1 : index2 + 1])
@@ -188,6 +265,7 @@ class Subtitle:
             raise IndexError("Index out of range")
         if time < self.cues[index].start or time > self.cues[index].end:
             raise ValueError("Time is not within the cue")
+        self._before_mutation(index, len(self.cues) - index - 1)
         new_cue = Cue(
             start=time, end=self.cues[index].end, text=self.cues[index].text, index=None
         )
@@ -201,6 +279,7 @@ class Subtitle:
         就地修改。在指定位置插入一个字幕块。"""
         if index < 0 or index > len(self.cues):
             raise IndexError("Index out of range")
+        self._before_mutation(index, len(self.cues) - index)
         cue.index = None  # 重置索引，让_recalculate_indices统一设置
         self.cues.insert(index, cue)
         self._recalculate_indices(index)
@@ -212,11 +291,128 @@ class Subtitle:
         就地修改。删除指定位置的字幕块。"""
         if index < 0 or index >= len(self.cues):
             raise IndexError("Index out of range")
+        self._before_mutation(index, len(self.cues) - index - 1)
         self.cues.pop(index)
-        self._recalculate_indices(index - 1)
+        self._recalculate_indices(index)
         self._recalcluate_duration()
         return self
 
+    def stats(self, per_cue: bool = False):
+        """Returns reading speed (CPS, WPM) and line length statistics of all cues,
+        see fairy_subtitle.stats
+        返回所有字幕块的阅读速度 (CPS, WPM) 和行长统计，见 fairy_subtitle.stats"""
+        from fairy_subtitle.stats import compute_stats
+
+        return compute_stats(self, per_cue)
+
+    def resegment(
+        self,
+        max_chars: int = None,
+        max_duration: float = None,
+        min_duration: float = None,
+        max_lines: int = None,
+    ):
+        """In-place modification. Splits over-long cues and merges tiny adjacent
+        ones by rules, see fairy_subtitle.resegment
+        就地修改。按规则拆分过长的字幕块并合并过短的相邻字幕块，见 fairy_subtitle.resegment"""
+        from fairy_subtitle.resegment import resegment
+
+        return resegment(self, max_chars, max_duration, min_duration, max_lines)
+
+    def snap_to_frames(self, framerate, rounding: str = "nearest"):
+        """In-place modification. Moves all times onto the frame grid of an exact
+        framerate (e.g. "24000/1001" or 23.976), see fairy_subtitle.timing
+        就地修改。把所有时间对齐到精确帧率的帧边界，见 fairy_subtitle.timing"""
+        from fairy_subtitle.timing import snap_to_frames
+
+        return snap_to_frames(self, framerate, rounding)
+
+    def convert_framerate(self, source, target):
+        """In-place modification. Retimes the subtitle from a source framerate to a
+        target framerate, keeping every cue on the same frame
+        就地修改。把字幕从源帧率转换到目标帧率，每个字幕块保持在原来的帧上"""
+        from fairy_subtitle.timing import convert_framerate
+
+        return convert_framerate(self, source, target)
+
+    def diff(self, other: "Subtitle") -> list:
+        """Returns the edit script (insert/remove/retime/retext/merge/split) that
+        turns this subtitle into other, see fairy_subtitle.diff
+        返回把本字幕变成 other 的编辑脚本，见 fairy_subtitle.diff"""
+        from fairy_subtitle.diff import diff
+
+        return diff(self, other)
+
+    def apply_patch(self, edits: list):
+        """In-place modification. Applies an edit script returned by diff().
+        就地修改。应用 diff() 返回的编辑脚本。"""
+        from fairy_subtitle.diff import apply_patch
+
+        return apply_patch(self, edits)
+
+    def compile_timeline(self):
+        """Compiles the cues into a Timeline of event boundaries for fast lookup of
+        the visible cues during playback, see fairy_subtitle.timeline
+        把字幕块编译为按事件边界切分的 Timeline，用于播放时快速查询显示的字幕块，
+        见 fairy_subtitle.timeline"""
+        from fairy_subtitle.timeline import compile_timeline
+
+        return compile_timeline(self)
+
+    def collapse_repeats(self, max_gap: float = 0.5, prefix: bool = True, key=None):
+        """In-place modification. Merges consecutive cues with identical or
+        prefix-extending text (roll-up captions), returns a CollapseReport with the
+        reduction ratio, see fairy_subtitle.rollup
+        就地修改。合并文本相同或逐步延长的连续字幕块 (滚动字幕)，返回包含缩减比例的
+        CollapseReport，见 fairy_subtitle.rollup"""
+        from fairy_subtitle.rollup import collapse_repeats
+
+        return collapse_repeats(self, max_gap, prefix, key)
+
+    def karaoke(self):
+        """Returns the karaoke syllable timings (\\k, \\kf, \\ko ...) of all cues as
+        columns, see fairy_subtitle.ass_text
+        以列的形式返回所有字幕块的卡拉 OK 音节时间，见 fairy_subtitle.ass_text"""
+        from fairy_subtitle.ass_text import karaoke_timings
+
+        return karaoke_timings(self)
+
+    def segment(
+        self,
+        duration: float,
+        out_dir: str,
+        playlist: str = "index.m3u8",
+        name: str = "segment{}.vtt",
+        mpegts: int = 0,
+        total: float = None,
+        live: bool = False,
+    ):
+        """Writes HLS WebVTT segments of duration seconds and a media playlist to
+        out_dir in one pass over the cues, see fairy_subtitle.hls.segment
+        把字幕切分为每段 duration 秒的 HLS WebVTT 分段，并在 out_dir 中写入媒体播放列表，
+        见 fairy_subtitle.hls.segment"""
+        from fairy_subtitle.hls import segment
+
+        return segment(self, duration, out_dir, playlist, name, mpegts, total, live)
+
+    def snapshot(self, verify: bool = False):
+        """Returns an immutable SubtitleSnapshot of the cues and information, sharing
+        the unchanged chunks with the previous snapshot, see fairy_subtitle.history
+        返回字幕块和信息的不可变快照 SubtitleSnapshot，与上一个快照共享未变化的块，
+        见 fairy_subtitle.history"""
+        from fairy_subtitle.history import snapshot
+
+        return snapshot(self, verify)
+
+    def restore(self, snapshot):
+        """In-place modification. Restores the cues and information of a snapshot
+        taken with snapshot() (undo / redo), see fairy_subtitle.history
+        就地修改。恢复 snapshot() 创建的快照中的字幕块和信息 (撤销 / 重做)，
+        见 fairy_subtitle.history"""
+        from fairy_subtitle.history import restore
+
+        return restore(self, snapshot)
+
     def to_dict(self) -> dict:
         """Converts a Subtitle object to a dictionary.
         将 Subtitle 对象转换为字典。"""
@@ -248,20 +444,33 @@ class Subtitle:
         save_format = save_format.lower()
 
         # 检查格式是否支持
-        from fairy_subtitle.parsers import transform_functions
+        from fairy_subtitle.exceptions import UnsupportedFormatError
+        from fairy_subtitle.profiling import stage
+        from fairy_subtitle.registry import get_format
 
-        if save_format not in transform_functions:
+        try:
+            subtitle_format = get_format(save_format)
+        except UnsupportedFormatError:
+            raise ValueError(f"Unsupported format: {save_format}")
+        if not subtitle_format.can_write:
             raise ValueError(f"Unsupported format: {save_format}")
 
         # 获取转换函数
-        transform_func = transform_functions[save_format]
+        transform_func = subtitle_format.write
 
         # 转换字幕
-        content = transform_func(self)
+        with stage("convert", file_path) as stats:
+            content = transform_func(self)
+            if stats is not None:
+                stats.size = len(content)
+                stats.cues = len(self.cues)
 
         # 保存到文件
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        with stage("write", file_path) as stats:
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(content)
+                if stats is not None:
+                    stats.size = f.tell()
 
         # 返回self以支持链式调用
         return self
@@ -269,34 +478,216 @@ class Subtitle:
     def to_srt(self) -> str:
         """Converts the subtitle to SRT format string.
         将字幕转换为SRT格式字符串。"""
-        from fairy_subtitle.parsers import to_srt
+        from fairy_subtitle.formats.srt import to_srt
 
         return to_srt(self)
 
     def to_vtt(self) -> str:
         """Converts the subtitle to VTT format string.
         将字幕转换为VTT格式字符串。"""
-        from fairy_subtitle.parsers import to_vtt
+        from fairy_subtitle.formats.vtt import to_vtt
 
         return to_vtt(self)
 
     def to_ass(self) -> str:
         """Converts the subtitle to ASS format string.
         将字幕转换为ASS格式字符串。"""
-        from fairy_subtitle.parsers import to_ass
+        from fairy_subtitle.formats.ass import to_ass
 
         return to_ass(self)
 
     def to_sbv(self) -> str:
         """Converts the subtitle to SBV format string.
         将字幕转换为SBV格式字符串。"""
-        from fairy_subtitle.parsers import to_sbv
+        from fairy_subtitle.formats.sbv import to_sbv
 
         return to_sbv(self)
 
     def to_sub(self) -> str:
         """Converts the subtitle to MicroDVD (.sub) format string.
         将字幕转换为MicroDVD (.sub)格式字符串。"""
-        from fairy_subtitle.parsers import to_sub
+        from fairy_subtitle.formats.sub import to_sub
 
         return to_sub(self)
+
+
+class _CueView(Sequence):
+    """Read-only sequence of a parent cue list selected by an index array. A cue is
+    copied when it is first read, so changing it does not affect the parent
+    按索引数组选取父字幕块列表的只读序列。字幕块在第一次读取时被复制，修改它不会影响父对象"""
+
+    __slots__ = ("_cues", "_indices", "_copies")
+
+    def __init__(self, cues: list[Cue], indices: array):
+        self._cues = cues
+        self._indices = indices
+        self._copies = {}  # 已读取的字幕块的副本 / Copies of the cues read so far
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def _copy(self, position: int) -> Cue:
+        cue = self._copies.get(position)
+        if cue is None:
+            cue = replace(self._cues[self._indices[position]])
+            self._copies[position] = cue
+        return cue
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._copy(i) for i in range(len(self._indices))[index]]
+        if index < 0:
+            index += len(self._indices)
+        if not 0 <= index < len(self._indices):
+            raise IndexError("Index out of range")
+        return self._copy(index)
+
+    def __iter__(self):
+        return (self._copy(i) for i in range(len(self._indices)))
+
+    def peek(self):
+        """The cues without copying them, only for reading
+        不复制地返回字幕块，只能用于读取"""
+        cues = self._cues
+        copies = self._copies
+        for position, i in enumerate(self._indices):
+            cue = copies.get(position)
+            yield cues[i] if cue is None else cue
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, _CueView)):
+            return list(self.peek()) == list(
+                other.peek() if isinstance(other, _CueView) else other
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self.peek()))
+
+
+class SubtitleView(Subtitle):
+    """
+    A selection of another Subtitle's cues (result of find / filter_by_time).
+    另一个 Subtitle 的部分字幕块 (find / filter_by_time 的结果)。
+
+    The view only stores an index array into the parent's cues and its own copy of
+    the information. Each cue is copied when it is first read from the view, the
+    others on the first modification of either the view or the parent, so the two
+    never affect each other.
+    视图只保存指向父对象字幕块的索引数组以及自己的字幕信息副本。每个字幕块在第一次从视图
+    读取时被复制，其余的在视图或父对象第一次被修改时复制，两者互不影响。
+    """
+
+    def __init__(self, parent: Subtitle, indices: list[int]):
+        # 视图的视图直接指向最初的父对象，中间的视图可以被回收；
+        # 中间的视图已有被读取 (可能被修改) 的字幕块时，先让它复制
+        if isinstance(parent, SubtitleView) and parent._parent is not None:
+            if parent.cues._copies:
+                parent._materialize()
+            else:
+                indices = [parent._indices[i] for i in indices]
+                parent = parent._parent
+        self._parent = parent
+        self._indices = array("q", indices)
+        cues = _CueView(parent.cues, self._indices)
+
+        duration = 0.0
+        if cues:
+            duration = max(cue.end for cue in cues.peek()) - min(
+                cue.start for cue in cues.peek()
+            )
+        info = replace(
+            parent.info,
+            duration=round(duration, 3),
+            size=len(cues),
+            other_info=_copy_other_info(parent.info.other_info, cues.peek()),
+            diagnostics=list(parent.info.diagnostics),
+        )
+        super().__init__(cues=cues, info=info)
+
+        if parent._views is None:
+            parent._views = weakref.WeakValueDictionary()
+        parent._views[id(self)] = self
+
+    @property
+    def is_copied(self) -> bool:
+        """Whether the view has already copied its cues
+        视图是否已经复制了字幕块"""
+        return self._parent is None
+
+    def _materialize(self):
+        """Copies the selected cues and detaches the view from its parent
+        复制选中的字幕块，并与父对象分离"""
+        if self._parent is None:
+            return
+        self.cues = list(self.cues)  # 未读取过的字幕块在此复制 / Copies the unread cues
+        if self._parent._views is not None:
+            self._parent._views.pop(id(self), None)
+        self._parent = None
+        self._indices = None
+
+    def _before_mutation(self, head: int = 0, tail: int = 0):
+        self._materialize()
+        super()._before_mutation(head, tail)
+
+    def _read_cues(self):
+        if self._parent is None:
+            return self.cues
+        return self.cues.peek()
+
+
+def _copy_other_info(other_info, cues=None):
+    """
+    A deep copy of SubtitleInfo.other_info. For AssInfo the source text is shared
+    (strings are immutable) and the rows keep pointing at the same Cue objects, which
+    the ASS writer only compares by identity. With cues, only the events of those
+    cues are copied (a view of part of the subtitle).
+    SubtitleInfo.other_info 的深拷贝。AssInfo 的原文是共享的 (字符串不可变)，各行仍指向
+    同一批 Cue 对象 (ASS 写回时只按对象是否相同比较它们)。给出 cues 时只复制这些字幕块
+    对应的事件 (视图只包含部分字幕块)。
+    """
+    if not isinstance(other_info, AssInfo):
+        return copy.deepcopy(other_info)
+
+    rows = other_info.rows
+    if cues is not None:
+        # 按对象选取各字幕块的行，已复制的字幕块按内容选取
+        # Rows of the cues by object, cues that were copied by content
+        cues = list(cues)
+        selected = {id(cue) for cue in cues}
+        rows = [row for row in rows if id(row.cue) in selected]
+        if len(rows) < len(cues):
+            found = {id(row.cue) for row in rows}
+            keys = {
+                (cue.start, cue.end, cue.text) for cue in cues if id(cue) not in found
+            }
+            rows = [
+                row
+                for row in other_info.rows
+                if id(row.cue) in selected or (row.start, row.end, row.text) in keys
+            ]
+    # 各行的字段列表与 events 中的列表是同一个对象，复制后仍保持共享
+    # The fields of a row are the list in events, keep them shared in the copy
+    copied = {}
+    for row in rows:
+        copied[id(row.fields)] = list(row.fields)
+    events = {}
+    for key, value in other_info.events.items():
+        if key in ("Dialogue", "Comment"):
+            if cues is None:
+                events[key] = [copied.get(id(item)) or list(item) for item in value]
+            else:
+                events[key] = [copied[id(item)] for item in value if id(item) in copied]
+        else:
+            events[key] = copy.deepcopy(value)
+    return replace(
+        other_info,
+        script_Info=copy.deepcopy(other_info.script_Info),
+        v4_Styles=copy.deepcopy(other_info.v4_Styles),
+        events=events,
+        fonts=copy.deepcopy(other_info.fonts),
+        graphics=copy.deepcopy(other_info.graphics),
+        sections=list(other_info.sections),
+        rows=[row._replace(fields=copied[id(row.fields)]) for row in rows],
+        parsed=copy.deepcopy(other_info.parsed),
+    )
@@ -0,0 +1,157 @@
+# fairy_subtitle/profiling.py
+# 加载与保存各阶段的耗时与内存统计
+# Time and memory statistics for each load and save stage
+#
+# 用法 / Usage:
+#     from fairy_subtitle.profiling import profile
+#
+#     with profile(callback=print, trace_memory=True) as profiler:
+#         SubtitleLoader.load("example.srt").save("example.vtt")
+#     print(profiler.summary())
+#
+# 没有激活的 Profiler 时，stage() 返回一个共享的空上下文，开销可以忽略。
+# When no profiler is active, stage() returns a shared no-op context.
+#
+# 激活的 Profiler 和阶段栈保存在 ContextVar 中，每个线程 (或 asyncio 任务) 只统计自己的
+# 阶段。tracemalloc 是整个进程共享的，多个线程同时统计内存时峰值仍会互相影响。
+# Active profilers and the stage stack live in ContextVars, so each thread (or
+# asyncio task) only records its own stages. tracemalloc is process wide, so
+# memory peaks still overlap when several threads trace memory at once.
+
+import time
+import tracemalloc
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# 当前激活的 Profiler / Active profilers
+_profilers: ContextVar[tuple] = ContextVar("fairy_subtitle_profilers", default=())
+# 当前正在执行的阶段 (用于嵌套阶段的内存峰值统计)
+# Stages being run (for the memory peaks of nested stages)
+_stack: ContextVar[tuple] = ContextVar("fairy_subtitle_stages", default=())
+
+
+@dataclass
+class StageStats:
+    """Statistics of one load or save stage
+    加载或保存的一个阶段的统计信息"""
+
+    name: str  # Stage name, e.g. "read", "detect", "parse", "scan", "build"
+    path: Optional[str] = None  # File path, for file level stages
+    seconds: float = 0.0  # Wall time in seconds
+    size: Optional[int] = None  # Bytes read/written, or characters processed
+    cues: Optional[int] = None  # Number of cues produced or written
+    peak_memory: Optional[int] = None  # Peak traced memory in bytes (tracemalloc)
+
+
+class Profiler:
+    """Collects the statistics of every stage run while it is active
+    收集激活期间执行的每个阶段的统计信息"""
+
+    def __init__(
+        self,
+        callback: Optional[Callable[[StageStats], None]] = None,
+        trace_memory: bool = False,
+    ):
+        self.callback = callback
+        self.trace_memory = trace_memory
+        self.stages: list[StageStats] = []
+        self._started_tracing = False
+
+    def __enter__(self) -> "Profiler":
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        _profilers.set(_profilers.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _profilers.set(tuple(p for p in _profilers.get() if p is not self))
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def _record(self, stats: StageStats):
+        self.stages.append(stats)
+        if self.callback is not None:
+            self.callback(stats)
+
+    def summary(self) -> dict[str, float]:
+        """Returns the total wall time of each stage name
+        返回每个阶段名称的总耗时"""
+        totals = {}
+        for stats in self.stages:
+            totals[stats.name] = totals.get(stats.name, 0.0) + stats.seconds
+        return totals
+
+
+def profile(
+    callback: Optional[Callable[[StageStats], None]] = None,
+    trace_memory: bool = False,
+) -> Profiler:
+    """
+    Returns a context manager that profiles every load and save stage.
+    返回一个统计每个加载和保存阶段的上下文管理器。
+
+    :param callback: Called with the StageStats of each finished stage.
+    :param callback: 每个阶段结束时以其 StageStats 调用。
+    :param trace_memory: Whether to record peak memory with tracemalloc.
+    :param trace_memory: 是否使用 tracemalloc 记录内存峰值。
+    """
+    return Profiler(callback, trace_memory)
+
+
+class _Stage:
+    __slots__ = ("stats", "_start", "_memory_start", "_memory_peak", "_token")
+
+    def __init__(self, name: str, path: Optional[str]):
+        self.stats = StageStats(name=name, path=path)
+
+    def __enter__(self) -> StageStats:
+        stack = _stack.get()
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # 重置峰值之前，先把外层阶段到目前为止的峰值保存下来
+            if stack:
+                parent = stack[-1]
+                parent._memory_peak = max(parent._memory_peak, peak)
+            tracemalloc.reset_peak()
+            self._memory_start = self._memory_peak = current
+        else:
+            self._memory_start = None
+        self._token = _stack.set(stack + (self,))
+        self._start = time.perf_counter()
+        return self.stats
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stats.seconds = time.perf_counter() - self._start
+        _stack.reset(self._token)
+        if self._memory_start is not None and tracemalloc.is_tracing():
+            peak = max(self._memory_peak, tracemalloc.get_traced_memory()[1])
+            self.stats.peak_memory = peak - self._memory_start
+        for profiler in _profilers.get():
+            profiler._record(self.stats)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str, path: Optional[str] = None):
+    """Returns a context manager timing one stage; it yields the StageStats to
+    fill in, or None when profiling is disabled
+    返回统计一个阶段的上下文管理器；未启用统计时产出 None"""
+    if not _profilers.get():
+        return _NULL_STAGE
+    return _Stage(name, path)
@@ -0,0 +1,277 @@
+# fairy_subtitle/registry.py
+# 字幕格式注册表：每种格式声明自己的识别特征、解析器、写入器和能力
+# Subtitle format registry: each format declares its signature, parser, writer
+# and capabilities
+
+import importlib
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+from fairy_subtitle.exceptions import UnsupportedFormatError
+
+# 第三方格式通过该入口点组注册
+# Third-party formats register through this entry point group
+ENTRY_POINT_GROUP = "fairy_subtitle.formats"
+
+# 能力标识 / Capability flags
+CAP_STYLES = "styles"  # 支持样式 / supports styles
+CAP_FRAME_BASED = "frame_based"  # 以帧为时间单位 / timed in frames
+CAP_CUE_SETTINGS = "cue_settings"  # 支持字幕块位置设置 / supports cue settings
+
+# 解析器、写入器等既可以是可调用对象，也可以是 "模块:属性" 字符串（首次使用时才导入）
+# Parsers, writers etc. may be callables or "module:attribute" strings
+Ref = Union[Callable, str, None]
+
+
+def _resolve(ref: Ref) -> Optional[Callable]:
+    """Resolves a "module:attribute" reference to the object it names
+    将 "模块:属性" 引用解析为对应的对象"""
+    if ref is None or callable(ref):
+        return ref
+    module_name, _, attr = ref.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+@dataclass
+class SubtitleFormat:
+    """Describes a subtitle format and how to read and write it
+    描述一种字幕格式及其读写方式"""
+
+    name: str  # Format name, e.g. "srt"
+    extensions: tuple  # File extensions, e.g. (".srt",)
+    signature: Optional[str] = None  # Regex matched at the start of the content
+    parser: Ref = None  # (file_path, content[, errors]) -> Subtitle
+    stream_parser: Ref = None  # (lines) -> Iterator[Cue]
+    writer: Ref = None  # (subtitle) -> str
+    validator: Ref = None  # (content) -> bool, used when the signature misses
+    capabilities: frozenset = field(default_factory=frozenset)
+
+    def supports(self, capability: str) -> bool:
+        """Returns whether the format declares the specified capability
+        返回该格式是否声明了指定能力"""
+        return capability in self.capabilities
+
+    @property
+    def can_stream(self) -> bool:
+        return self.stream_parser is not None
+
+    @property
+    def can_write(self) -> bool:
+        return self.writer is not None
+
+    def parse(self, file_path: str, content: str, errors: Optional[str] = None):
+        """Parses content into a Subtitle object, using the parser's default
+        error policy when errors is None
+        将内容解析为 Subtitle 对象，errors 为 None 时使用解析器默认的错误策略"""
+        if self.parser is None:
+            raise UnsupportedFormatError(f"格式 '{self.name}' 不支持解析")
+        if errors is None:
+            return _resolve(self.parser)(file_path, content)
+        return _resolve(self.parser)(file_path, content, errors=errors)
+
+    def iter_cues(self, lines: Iterable[str]) -> Iterator:
+        """Parses lines one cue at a time
+        逐条解析字幕"""
+        if self.stream_parser is None:
+            raise UnsupportedFormatError(f"格式 '{self.name}' 不支持流式解析")
+        return _resolve(self.stream_parser)(lines)
+
+    def write(self, subtitle) -> str:
+        """Converts a Subtitle object into this format
+        将 Subtitle 对象转换为该格式"""
+        if self.writer is None:
+            raise UnsupportedFormatError(f"格式 '{self.name}' 不支持写入")
+        return _resolve(self.writer)(subtitle)
+
+    def validate(self, content: str) -> bool:
+        """Returns whether the content looks like this format
+        返回内容是否符合该格式特征"""
+        if self.validator is not None:
+            return _resolve(self.validator)(content)
+        if self.signature is not None:
+            return re.match(r"\ufeff?" + self.signature, content) is not None
+        return False
+
+
+_formats: dict[str, SubtitleFormat] = {}
+_extensions: dict[str, str] = {}
+_detector = None  # 合并后的识别正则，注册表变化时重建
+_entry_points_loaded = False
+
+
+def register_format(fmt: SubtitleFormat, replace: bool = False) -> SubtitleFormat:
+    """
+    Registers a subtitle format.
+    注册一种字幕格式。
+
+    :param fmt: The format description.
+    :param fmt: 格式描述。
+    :param replace: Whether to replace an already registered format of the same name.
+    :param replace: 是否替换已注册的同名格式。
+    :return: The registered format.
+    :return: 已注册的格式。
+    """
+    global _detector
+    name = fmt.name.lower()
+    if name in _formats and not replace:
+        raise ValueError(f"Format already registered: {name}")
+    fmt.name = name
+    _formats[name] = fmt
+    for extension in fmt.extensions:
+        _extensions[extension.lower()] = name
+    _detector = None
+    return fmt
+
+
+def _load_entry_points():
+    """Registers formats published by installed packages
+    注册已安装的包通过入口点发布的格式"""
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+
+    from importlib import metadata
+
+    try:
+        entry_points = metadata.entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:  # Python 3.9
+        entry_points = metadata.entry_points().get(ENTRY_POINT_GROUP, [])
+
+    for entry_point in entry_points:
+        try:
+            fmt = entry_point.load()
+            if not isinstance(fmt, SubtitleFormat):
+                fmt = fmt()
+            if fmt.name.lower() not in _formats:
+                register_format(fmt)
+        except Exception as e:
+            print(f"警告：无法加载字幕格式插件 '{entry_point.name}': {e}")
+
+
+def get_format(name: str) -> SubtitleFormat:
+    """Returns the registered format with the specified name
+    返回指定名称的已注册格式"""
+    name = name.lower()
+    if name not in _formats:
+        _load_entry_points()
+    if name not in _formats:
+        raise UnsupportedFormatError(f"不支持的格式: {name}")
+    return _formats[name]
+
+
+def list_formats() -> list[str]:
+    """Returns the names of all registered formats
+    返回所有已注册格式的名称"""
+    _load_entry_points()
+    return list(_formats)
+
+
+def _build_detector():
+    """Combines every format signature into one anchored regex
+    将所有格式的识别特征合并为一个锚定在开头的正则表达式"""
+    alternatives = [
+        f"(?P<{name}>{fmt.signature})"
+        for name, fmt in _formats.items()
+        if fmt.signature is not None and name.isidentifier()
+    ]
+    if not alternatives:
+        return None
+    return re.compile(r"\ufeff?(?:" + "|".join(alternatives) + ")")
+
+
+def detect_format(content: str, file_path: Optional[str] = None) -> Optional[str]:
+    """
+    Detects the format of subtitle content.
+    检测字幕内容的格式。
+
+    The start of the content is matched once against the signatures of all
+    formats; the validators and the file extension are used as fallbacks.
+    内容开头与所有格式的识别特征只匹配一次；验证函数和扩展名作为后备。
+
+    :return: The format name, or None if it cannot be detected.
+    :return: 格式名称，无法检测时返回 None。
+    """
+    global _detector
+    _load_entry_points()
+    if _detector is None:
+        _detector = _build_detector()
+
+    # 1. 一次匹配所有格式的开头特征
+    if _detector is not None:
+        match = _detector.match(content)
+        if match:
+            return match.lastgroup
+
+    # 2. 基于内容特征的后备检测
+    for name, fmt in _formats.items():
+        if fmt.validator is not None and fmt.validate(content):
+            return name
+
+    # 3. 基于扩展名的后备检测
+    if file_path is not None:
+        extension = "." + file_path.rsplit(".", 1)[-1].lower()
+        if extension in _extensions:
+            return _extensions[extension]
+
+    return None
+
+
+# 内置格式 / Built-in formats
+register_format(
+    SubtitleFormat(
+        name="srt",
+        extensions=(".srt",),
+        signature=r"\d+[ \t]*\r?\n\d+:\d{2}:\d{2},\d+[ \t]*-->",
+        parser="fairy_subtitle.formats.srt:parse_srt",
+        stream_parser="fairy_subtitle.formats.srt:iter_srt",
+        writer="fairy_subtitle.formats.srt:to_srt",
+        validator="fairy_subtitle.formats.srt:validate_srt",
+    )
+)
+register_format(
+    SubtitleFormat(
+        name="vtt",
+        extensions=(".vtt",),
+        signature=r"WEBVTT",
+        parser="fairy_subtitle.formats.vtt:parse_vtt",
+        stream_parser="fairy_subtitle.formats.vtt:iter_vtt",
+        writer="fairy_subtitle.formats.vtt:to_vtt",
+        validator="fairy_subtitle.formats.vtt:validate_vtt",
+        capabilities=frozenset({CAP_CUE_SETTINGS}),
+    )
+)
+register_format(
+    SubtitleFormat(
+        name="ass",
+        extensions=(".ass",),
+        signature=r"\[Script Info\]",
+        parser="fairy_subtitle.formats.ass:parse_ass",
+        writer="fairy_subtitle.formats.ass:to_ass",
+        validator="fairy_subtitle.formats.ass:validate_ass",
+        capabilities=frozenset({CAP_STYLES}),
+    )
+)
+register_format(
+    SubtitleFormat(
+        name="sbv",
+        extensions=(".sbv",),
+        signature=r"\d+:\d{2}:\d{2}\.\d+,\d+:\d{2}:\d{2}\.\d+",
+        parser="fairy_subtitle.formats.sbv:parse_sbv",
+        stream_parser="fairy_subtitle.formats.sbv:iter_sbv",
+        writer="fairy_subtitle.formats.sbv:to_sbv",
+        validator="fairy_subtitle.formats.sbv:validate_sbv",
+    )
+)
+register_format(
+    SubtitleFormat(
+        name="sub",
+        extensions=(".sub",),
+        signature=r"\{\d+\}\{\d+\}",
+        parser="fairy_subtitle.formats.sub:parse_sub",
+        writer="fairy_subtitle.formats.sub:to_sub",
+        validator="fairy_subtitle.formats.sub:validate_sub",
+        capabilities=frozenset({CAP_FRAME_BASED}),
+    )
+)
@@ -0,0 +1,265 @@
+# fairy_subtitle/resegment.py
+# 按规则自动重新切分字幕：拆分过长的字幕块，合并过短的相邻字幕块
+# Rule based re-segmentation: split over-long cues and merge tiny adjacent ones
+
+import math
+from typing import Optional
+
+from .models import Cue, Subtitle
+
+# 断句标点 (优先级从高到低) / Break punctuation, highest priority first
+_SENTENCE_END = "。！？…!?."
+_CLAUSE_END = "，、；：,;:"
+# 紧跟在标点后面、应与其留在同一段的闭合符号
+# Closing marks that stay with the punctuation before them
+_CLOSING = "」』”’)）】》\"'"
+# ASCII 标点只有后面跟着空白时才是断句点 (避免拆开 3.5、e.g 之类)
+# ASCII punctuation only breaks when followed by whitespace (not inside 3.5)
+_ASCII_PUNCTUATION = ".!?,;:"
+
+# 断点优先级 / Break priorities
+_NEWLINE, _SENTENCE, _CLAUSE, _SPACE = 3, 2, 1, 0
+
+
+def resegment(
+    subtitle: Subtitle,
+    max_chars: Optional[int] = None,
+    max_duration: Optional[float] = None,
+    min_duration: Optional[float] = None,
+    max_lines: Optional[int] = None,
+) -> Subtitle:
+    """
+    In-place modification. Splits and merges cues by rules in one linear pass.
+    就地修改。按规则在一次线性遍历中拆分和合并字幕块。
+
+    Cues over max_chars / max_duration / max_lines are split at line breaks,
+    punctuation or word boundaries, each piece getting a share of the time
+    proportional to its length. Adjacent cues shorter than min_duration are then
+    merged when the result still satisfies the limits. Indices are rebuilt once.
+    超过 max_chars / max_duration / max_lines 的字幕块在换行、标点或单词边界处拆分，
+    每段按长度比例分配时间。之后合并短于 min_duration 的相邻字幕块 (合并结果仍须满足限制)。
+    序号在最后统一重建。
+
+    :param max_chars: Maximum characters per cue, line breaks not counted.
+    :param max_chars: 每个字幕块的最大字符数，不含换行。
+    :param max_duration: Maximum display duration in seconds.
+    :param max_duration: 最长显示时间 (秒)。
+    :param min_duration: Cues shorter than this are merged with a neighbour.
+    :param min_duration: 短于此时长的字幕块与相邻字幕块合并。
+    :param max_lines: Maximum lines per cue.
+    :param max_lines: 每个字幕块的最大行数。
+
+    Pieces of a split cue keep its VTT settings, and the first piece keeps its
+    identifier (identifiers must stay unique). A merged cue keeps those of the first
+    cue.
+    拆分出的各段保留原字幕块的 VTT 设置，第一段保留其标识符 (标识符必须唯一)。
+    合并的结果保留第一个字幕块的标识符和设置。
+    """
+    for name, value in (("max_chars", max_chars), ("max_lines", max_lines)):
+        # 两者都用作切片的位置 / Both are used as slice positions
+        if value is not None and not isinstance(value, int):
+            raise TypeError(f"{name} must be an integer, got {type(value).__name__}")
+    for name, value in (
+        ("max_chars", max_chars),
+        ("max_duration", max_duration),
+        ("max_lines", max_lines),
+    ):
+        if value is not None and value <= 0:
+            raise ValueError(f"{name} must be positive")
+
+    subtitle._before_mutation()
+    limits = _Limits(max_chars, max_duration, max_lines)
+
+    cues = []
+    for cue in subtitle.cues:
+        for piece in _split_cue(cue, limits):
+            if min_duration is not None and cues:
+                merged = _merge_short(cues[-1], piece, min_duration, limits)
+                if merged is not None:
+                    cues[-1] = merged
+                    continue
+            cues.append(piece)
+
+    # 统一重建序号和时长
+    for i, cue in enumerate(cues):
+        cue.index = i
+    subtitle.cues[:] = cues
+    subtitle.info.size = len(cues)
+    subtitle._recalcluate_duration()
+    return subtitle
+
+
+class _Limits:
+    __slots__ = ("chars", "duration", "lines")
+
+    def __init__(self, chars, duration, lines):
+        self.chars = chars if chars is not None else math.inf
+        self.duration = duration if duration is not None else math.inf
+        self.lines = lines if lines is not None else math.inf
+
+    def allow(self, text: str, duration: float) -> bool:
+        return (
+            _chars(text) <= self.chars
+            and duration <= self.duration
+            and text.count("\n") + 1 <= self.lines
+        )
+
+
+def _chars(text: str) -> int:
+    return len(text) - text.count("\n")
+
+
+def _split_cue(cue: Cue, limits: _Limits) -> list:
+    """Splits one cue into pieces satisfying the limits where possible"""
+    text = cue.text
+    duration = cue.end - cue.start
+    if limits.allow(text, duration):
+        return [cue]
+
+    # 按时长需要的段数决定每段的目标长度；字符数上限是硬限制
+    chars = _chars(text)
+    pieces_needed = max(1, math.ceil(duration / limits.duration))
+    target = min(limits.chars, math.ceil(chars / pieces_needed))
+
+    pieces = []
+    for piece in _split_text(text, target, limits.chars):
+        pieces.extend(_split_lines(piece, limits.lines))
+    if len(pieces) <= 1:
+        return [cue]
+
+    # 按字符数比例分配时间，累计计算避免误差积累，最后一段正好结束于原结束时间；
+    # 原时间不是整毫秒时，取整后的分割点可能越过字幕块的边界，因此限制在边界之内
+    # Times follow the character counts, accumulated to avoid drift; the last piece
+    # ends exactly at the original end. Rounded split points are kept within the
+    # cue, as rounding may cross its bounds when the times are not whole milliseconds
+    weights = [max(_chars(piece), 1) for piece in pieces]
+    total = sum(weights)
+    result = []
+    start = cue.start
+    elapsed = 0
+    for piece, weight in zip(pieces, weights):
+        elapsed += weight
+        end = cue.end
+        if elapsed < total:
+            end = round(cue.start + duration * elapsed / total, 3)
+            end = min(max(end, start), cue.end)
+        identifier = None if result else cue.identifier
+        result.append(
+            Cue(
+                start=start,
+                end=end,
+                text=piece,
+                identifier=identifier,
+                settings=cue.settings,
+            )
+        )
+        start = end
+    return result
+
+
+def _split_text(text: str, target: float, hard_limit: float) -> list:
+    """Cuts text into pieces of about target characters, never over hard_limit"""
+    pieces = []
+    while _chars(text) > target:
+        cut = _find_break(text, target, hard_limit)
+        if cut is None:
+            break
+        end, next_start = cut
+        piece = text[:end].strip()
+        if piece:
+            pieces.append(piece)
+        text = text[next_start:].lstrip(" \t")
+    text = text.strip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def _find_break(text: str, target: float, hard_limit: float) -> Optional[tuple]:
+    """Returns (end of the first piece, start of the rest) or None to keep text whole
+
+    Prefers the highest priority break between half of target and target (the
+    latest one on ties), then the first break after target, then the latest break
+    before half of target, and finally a hard cut at hard_limit."""
+    scan_end = len(text) if hard_limit == math.inf else min(len(text), hard_limit + 1)
+    lowest = target / 2
+    best = None  # (priority, end, next_start) between lowest and target
+    early = None  # latest break before lowest
+    for i in range(1, scan_end):
+        ch = text[i]
+        if ch == "\n":
+            priority, end, next_start = _NEWLINE, i, i + 1
+        elif ch == " " or ch == "\t":
+            priority, end, next_start = _SPACE, i, i + 1
+        elif ch in _SENTENCE_END or ch in _CLAUSE_END:
+            end = i + 1
+            if ch in _ASCII_PUNCTUATION and end < len(text) and not text[end].isspace():
+                continue
+            while end < len(text) and text[end] in _CLOSING:
+                end += 1
+            priority = _SENTENCE if ch in _SENTENCE_END else _CLAUSE
+            next_start = end
+        else:
+            continue
+
+        if end >= len(text):
+            break
+        if end > target:
+            # 目标长度之前没有合适的断点时，使用之后的第一个断点
+            if best is None and end <= hard_limit:
+                return end, next_start
+            break
+        if end < lowest:
+            early = (end, next_start)
+        elif best is None or priority >= best[0]:
+            best = (priority, end, next_start)
+
+    if best is not None:
+        return best[1], best[2]
+    if early is not None:
+        return early
+    if _chars(text) > hard_limit:
+        return hard_limit, hard_limit
+    return None
+
+
+def _split_lines(text: str, max_lines: float) -> list:
+    """Cuts text into pieces of at most max_lines lines"""
+    lines = text.split("\n")
+    if len(lines) <= max_lines:
+        return [text]
+    return [
+        "\n".join(lines[i : i + max_lines]) for i in range(0, len(lines), max_lines)
+    ]
+
+
+def _merge_short(
+    previous: Cue, cue: Cue, min_duration: float, limits: _Limits
+) -> Optional[Cue]:
+    """Merges two adjacent cues when either is shorter than min_duration and the
+    result satisfies the limits; returns None otherwise"""
+    if (
+        previous.end - previous.start >= min_duration
+        and cue.end - cue.start >= min_duration
+    ):
+        return None
+    # 只合并相邻的字幕块 (间隔小于 min_duration)
+    if cue.start - previous.end >= min_duration or cue.start < previous.start:
+        return None
+
+    end = max(previous.end, cue.end)
+    for separator in ("\n", " "):
+        text = previous.text + separator + cue.text
+        if limits.allow(text, end - previous.start):
+            return Cue(
+                start=previous.start,
+                end=end,
+                text=text,
+                identifier=_first(previous.identifier, cue.identifier),
+                settings=_first(previous.settings, cue.settings),
+            )
+    return None
+
+
+def _first(value, other):
+    return value if value is not None else other
@@ -0,0 +1,119 @@
+# fairy_subtitle/rollup.py
+# 合并滚动字幕 (roll-up) 转换后产生的重复字幕块
+# Collapse the repeated cues produced by converting roll-up captions
+
+import re
+from typing import Callable, NamedTuple, Optional
+
+from .models import Subtitle
+
+# 没有词间分隔的文字 (CJK 表意文字、假名、谚文)，任意两个字之间都是词的边界
+# Scripts without word separators (CJK ideographs, kana, hangul), where any two
+# characters meet at a word boundary
+_CJK = re.compile(
+    "[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7a3]"
+)
+
+
+class CollapseReport(NamedTuple):
+    """Result of collapse_repeats
+    collapse_repeats 的结果"""
+
+    before: int  # Cues before collapsing
+    after: int  # Cues after collapsing
+
+    @property
+    def removed(self) -> int:
+        return self.before - self.after
+
+    @property
+    def ratio(self) -> float:
+        """Cues before / cues after (e.g. 3.0 for a 3x reduction)"""
+        return self.before / self.after if self.after else 1.0
+
+
+def collapse_repeats(
+    subtitle: Subtitle,
+    max_gap: float = 0.5,
+    prefix: bool = True,
+    key: Optional[Callable[[str], str]] = None,
+) -> CollapseReport:
+    """
+    In-place modification. Merges runs of consecutive cues whose text repeats or
+    extends the previous cue, in one linear pass.
+    就地修改。在一次线性遍历中合并文本重复或在前一条基础上延长的连续字幕块。
+
+    Roll-up captions converted to SRT / VTT show the same line in several cues, each
+    one adding a few words ("Hello", "Hello there", "Hello there, Tom"). Such a run
+    becomes one cue with the start of its first cue, the latest end, and the text of
+    its last (longest) cue.
+    滚动字幕转换为 SRT / VTT 后，同一行会出现在多个字幕块中，每次增加几个词。
+    这样的一组字幕块合并为一个：开始时间取第一条，结束时间取最晚的，文本取最后 (最长) 一条。
+
+    :param max_gap: Cues further apart than this (seconds) are never merged.
+    :param max_gap: 间隔超过此值 (秒) 的字幕块不合并。
+    :param prefix: Also merge a cue whose text starts with the previous text followed
+                   by a word boundary ("No" and "No, sir", not "No" and "Nobody");
+                   False merges identical texts only.
+    :param prefix: 是否也合并以前一条文本开头、且其后为词的边界的字幕块 ("No" 与
+                   "No, sir"，而不是 "No" 与 "Nobody")；False 时只合并文本相同的字幕块。
+    :param key: Text -> comparison key, defaults to collapsing whitespace so that
+                re-wrapped lines still match.
+    :param key: 文本 -> 比较用的键，默认合并空白字符，使重新换行的文本仍能匹配。
+    :return: CollapseReport with the cue counts before and after.
+    :return: 包含合并前后字幕块数量的 CollapseReport。
+    """
+    if max_gap < 0:
+        raise ValueError("max_gap must not be negative")
+    key = key or _collapse_whitespace
+    before = len(subtitle.cues)
+    if before < 2:
+        return CollapseReport(before, before)
+
+    subtitle._before_mutation()
+    cues = []
+    run = None  # 当前合并组的第一个字幕块 (原地延长)
+    run_key = None
+    for cue in subtitle.cues:
+        cue_key = key(cue.text)
+        # 字符串的 hash 会被缓存，相等比较先比较 hash；_extends 只比较前缀长度的内容
+        if (
+            run is not None
+            and cue.start - run.end <= max_gap
+            and (
+                cue_key == run_key
+                or (prefix and run_key and _extends(cue_key, run_key))
+            )
+        ):
+            run.end = max(run.end, cue.end)
+            run.text = cue.text
+            run_key = cue_key
+            continue
+        cues.append(cue)
+        run = cue
+        run_key = cue_key
+
+    after = len(cues)
+    if after < before:
+        subtitle.cues[:] = cues
+        subtitle._recalculate_indices(0)
+        subtitle._recalcluate_duration()
+    return CollapseReport(before, after)
+
+
+def _collapse_whitespace(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _extends(text: str, previous: str) -> bool:
+    """Whether text starts with previous and a word boundary follows it: the
+    characters on either side are not both letters or digits, or one is CJK"""
+    if not text.startswith(previous):
+        return False
+    if len(text) == len(previous):
+        return True
+    before = previous[-1]
+    after = text[len(previous)]
+    if not (before.isalnum() and after.isalnum()):
+        return True
+    return bool(_CJK.match(before) or _CJK.match(after))
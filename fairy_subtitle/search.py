@@ -0,0 +1,433 @@
+# fairy_subtitle/search.py
+# 大量字幕文件的全文索引：持久化在 SQLite 中的压缩倒排表，支持短语查询
+# Full-text index over large subtitle libraries: compressed postings stored in SQLite,
+# with phrase queries answered from the index alone
+#
+# 每个 (词, 文件) 对应一个倒排记录，按字幕块顺序保存 (字幕块序号, 开始毫秒, 词位置列表)，
+# 数字均以差值 + 变长整数编码。
+# Every (token, file) pair stores one postings blob: (cue index, start ms, token
+# positions) in cue order, delta encoded as varints.
+
+import os
+import re
+import sqlite3
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, NamedTuple, Optional, Union
+
+from .exceptions import SubtitleError
+from .stats import _MARKUP
+
+# 索引格式版本 / Index format version
+INDEX_VERSION = 1
+
+# 以字为单位切分的文字 (汉字、假名、谚文)，按相邻两字 (bigram) 建立索引
+# Scripts without word separators (CJK ideographs, kana, hangul), indexed as bigrams
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7a3"
+_TOKEN = re.compile(f"([{_CJK}]+)|[^\\W{_CJK}]+")
+# 每条查询绑定的文件 ID 数量，低于 SQLite 的变量数上限 (旧版本为 999)
+# File ids bound per query, below SQLite's variable limit (999 in older versions)
+_ID_BATCH = 900
+
+
+class SearchHit(NamedTuple):
+    """A cue that contains the searched phrase
+    包含所查短语的字幕块"""
+
+    path: str  # Subtitle file
+    cue: int  # Position of the cue in the file
+    start: float  # Start time of the cue in seconds
+
+
+def normalize(text: str) -> str:
+    """
+    Normalizes text for matching: strips markup, folds fullwidth / halfwidth forms
+    (NFKC) and case.
+    匹配前规范化文本：去掉标签，统一全角 / 半角 (NFKC) 和大小写。
+    """
+    if "<" in text or "{" in text:
+        text = _MARKUP.sub(" ", text)
+    text = text.replace("\\N", " ").replace("\\n", " ")
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+    return text.casefold()
+
+
+def tokenize(text: str) -> list[tuple[int, str]]:
+    """
+    Splits text into (position, token) pairs.
+    把文本切分为 (位置, 词) 对。
+
+    Words are split at non-word characters. A CJK run yields its overlapping bigrams
+    followed by its last character, so "你好吗" gives 你好, 好吗, 吗.
+    单词按非单词字符切分。连续的 CJK 文字产生相邻两字组成的词，最后再加上最后一个字，
+    例如 "你好吗" 得到 你好、好吗、吗。
+    """
+    tokens = []
+    position = 0
+    for match in _TOKEN.finditer(normalize(text)):
+        run = match.group(1)
+        if run is None:
+            tokens.append((position, match.group()))
+            position += 1
+            continue
+        for i in range(len(run) - 1):
+            tokens.append((position, run[i : i + 2]))
+            position += 1
+        tokens.append((position, run[-1]))
+        position += 1
+    return tokens
+
+
+def _query_tokens(phrase: str) -> list[tuple[int, str, bool]]:
+    """(relative position, token, prefix) triples of a phrase query
+
+    The last character of a CJK run is already covered by the bigram before it and
+    is dropped; a single CJK character is matched as a prefix, so it also finds the
+    bigrams that start with it."""
+    tokens = []
+    position = 0
+    for match in _TOKEN.finditer(normalize(phrase)):
+        run = match.group(1)
+        if run is None:
+            tokens.append((position, match.group(), False))
+            position += 1
+        elif len(run) == 1:
+            tokens.append((position, run, True))
+            position += 1
+        else:
+            for i in range(len(run) - 1):
+                tokens.append((position, run[i : i + 2], False))
+                position += 1
+            position += 1
+    return tokens
+
+
+def _encode_varints(values: list[int]) -> bytes:
+    out = bytearray()
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def _decode_varints(data: bytes) -> list[int]:
+    values = []
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+
+def _encode_postings(entries: list) -> bytes:
+    """[(cue index, start ms, [positions])] in cue order -> varint blob"""
+    values = []
+    previous_cue = previous_start = 0
+    for cue, start, positions in entries:
+        delta = start - previous_start
+        values.append(cue - previous_cue)
+        values.append(delta * 2 if delta >= 0 else -delta * 2 - 1)  # zigzag
+        values.append(len(positions))
+        previous_position = 0
+        for position in positions:
+            values.append(position - previous_position)
+            previous_position = position
+        previous_cue, previous_start = cue, start
+    return _encode_varints(values)
+
+
+def _decode_postings(data: bytes) -> dict:
+    """varint blob -> {cue index: (start ms, [positions])}"""
+    values = _decode_varints(data)
+    entries = {}
+    cue = start = 0
+    i = 0
+    while i < len(values):
+        cue += values[i]
+        zigzag = values[i + 1]
+        start += zigzag // 2 if not zigzag & 1 else -(zigzag + 1) // 2
+        count = values[i + 2]
+        i += 3
+        positions = []
+        position = 0
+        for delta in values[i : i + count]:
+            position += delta
+            positions.append(position)
+        i += count
+        entries[cue] = (start, positions)
+    return entries
+
+
+def _index_file(args: tuple) -> Union[tuple, Exception]:
+    """Worker: parses one file and returns (path, mtime_ns, size, cues, postings)"""
+    from .subtitle import SubtitleLoader
+
+    path, format, encoding, errors = args
+    try:
+        stat = os.stat(path)
+        subtitle = SubtitleLoader.load(path, format, encoding, errors)
+    except (OSError, UnicodeDecodeError, SubtitleError) as e:
+        return e
+
+    postings = {}  # token -> [(cue, start ms, positions)]
+    for cue_index, cue in enumerate(subtitle.cues):
+        start = round(cue.start * 1000)
+        cue_tokens = {}
+        for position, token in tokenize(cue.text):
+            cue_tokens.setdefault(token, []).append(position)
+        for token, positions in cue_tokens.items():
+            postings.setdefault(token, []).append((cue_index, start, positions))
+    encoded = [(token, _encode_postings(entries)) for token, entries in postings.items()]
+    return path, stat.st_mtime_ns, stat.st_size, len(subtitle.cues), encoded
+
+
+class SubtitleIndex:
+    """
+    Persistent full-text index over many subtitle files.
+    持久化的多文件字幕全文索引。
+
+    The index lives in one SQLite file. update() parses new or modified files (by
+    modification time and size) in parallel worker processes; search() answers
+    phrase queries from the postings alone, without opening the subtitle files.
+    索引保存在一个 SQLite 文件中。update() 在多个工作进程中并行解析新增或修改过的文件
+    (按修改时间和大小判断)；search() 只根据倒排表回答短语查询，不需要打开字幕文件。
+
+    Example:
+        with SubtitleIndex("library.idx") as index:
+            index.update(glob.glob("shows/**/*.srt", recursive=True))
+            for hit in index.search("see you tomorrow"):
+                print(hit.path, hit.start)
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._db = sqlite3.connect(index_path)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                cues INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                token TEXT NOT NULL,
+                file_id INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (token, file_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+            """
+        )
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None:
+            self._db.execute(
+                "INSERT INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),)
+            )
+            self._db.commit()
+        elif int(row[0]) != INDEX_VERSION:
+            self._db.close()
+            raise ValueError(f"Unsupported index version: {row[0]}")
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self) -> "SubtitleIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def __contains__(self, path: str) -> bool:
+        path = os.path.abspath(path)
+        query = "SELECT 1 FROM files WHERE path = ?"
+        return self._db.execute(query, (path,)).fetchone() is not None
+
+    def update(
+        self,
+        file_paths: Iterable[str],
+        format: str = "auto",
+        encoding: str = "utf-8",
+        errors: Optional[str] = None,
+        workers: Optional[int] = None,
+        chunksize: int = 16,
+    ) -> list[tuple[str, Exception]]:
+        """
+        Indexes new and modified files, files whose modification time and size are
+        unchanged are skipped.
+        索引新增和修改过的文件，修改时间和大小都没有变化的文件会被跳过。
+
+        :param workers: Number of worker processes, defaults to the number of CPUs.
+        :param workers: 工作进程数，默认为 CPU 数。
+        :return: (path, exception) of the files that could not be read or parsed.
+        :return: 无法读取或解析的文件的 (路径, 异常) 列表。
+        """
+        known = {
+            path: (mtime_ns, size)
+            for path, mtime_ns, size in self._db.execute(
+                "SELECT path, mtime_ns, size FROM files"
+            )
+        }
+        jobs = []
+        failures = []
+        for path in file_paths:
+            path = os.path.abspath(path)
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                failures.append((path, e))
+                continue
+            if known.get(path) != (stat.st_mtime_ns, stat.st_size):
+                jobs.append((path, format, encoding, errors))
+        if not jobs:
+            return failures
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(_index_file, jobs, chunksize=chunksize)
+            for job, result in zip(jobs, results):
+                if isinstance(result, Exception):
+                    failures.append((job[0], result))
+                else:
+                    self._store(*result)
+        self._db.commit()
+        return failures
+
+    def _store(self, path: str, mtime_ns: int, size: int, cues: int, postings: list):
+        """Replaces the postings of one file"""
+        db = self._db
+        row = db.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            file_id = db.execute(
+                "INSERT INTO files (path, mtime_ns, size, cues) VALUES (?, ?, ?, ?)",
+                (path, mtime_ns, size, cues),
+            ).lastrowid
+        else:
+            file_id = row[0]
+            db.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, cues = ? WHERE id = ?",
+                (mtime_ns, size, cues, file_id),
+            )
+            db.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+        db.executemany(
+            "INSERT INTO postings VALUES (?, ?, ?)",
+            [(token, file_id, data) for token, data in postings],
+        )
+
+    def remove(self, path: str) -> bool:
+        """Removes a file from the index, returns whether it was indexed
+        从索引中删除一个文件，返回该文件是否在索引中"""
+        path = os.path.abspath(path)
+        db = self._db
+        row = db.execute("SELECT id FROM files WHERE path = ?", (path,)).fetchone()
+        if row is None:
+            return False
+        db.execute("DELETE FROM postings WHERE file_id = ?", row)
+        db.execute("DELETE FROM files WHERE id = ?", row)
+        db.commit()
+        return True
+
+    def prune(self) -> list[str]:
+        """Removes the files that no longer exist, returns their paths
+        删除已经不存在的文件，返回它们的路径"""
+        missing = [
+            path
+            for (path,) in self._db.execute("SELECT path FROM files")
+            if not os.path.exists(path)
+        ]
+        for path in missing:
+            self.remove(path)
+        return missing
+
+    def search(self, phrase: str, limit: Optional[int] = None) -> list[SearchHit]:
+        """
+        Finds the cues containing phrase, ordered by file and start time.
+        查找包含 phrase 的字幕块，按文件和开始时间排序。
+
+        Matching ignores case, markup and fullwidth / halfwidth differences; the
+        words (or CJK characters) must appear consecutively in one cue.
+        匹配时忽略大小写、标签和全角 / 半角的差异；单词 (或 CJK 文字) 必须在同一字幕块中连续出现。
+        """
+        tokens = _query_tokens(phrase)
+        if not tokens:
+            return []
+
+        # 1. 读取每个词的倒排记录，从最少的开始求文件交集
+        postings = [self._postings(token, prefix) for _, token, prefix in tokens]
+        order = sorted(range(len(tokens)), key=lambda k: len(postings[k]))
+        file_ids = set(postings[order[0]])
+        for k in order[1:]:
+            file_ids &= postings[k].keys()
+            if not file_ids:
+                return []
+
+        # 2. 在每个候选文件中检查词的位置是否连续
+        paths = self._paths(list(file_ids))
+        hits = []
+        for file_id in file_ids:
+            entries = [self._decode(postings[k][file_id]) for k in range(len(tokens))]
+            first = entries[order[0]]
+            for cue in sorted(first):
+                start, positions = first[cue]
+                if not all(cue in entry for entry in entries):
+                    continue
+                base = tokens[order[0]][0]
+                for position in positions:
+                    offset = position - base
+                    if all(
+                        offset + tokens[k][0] in entries[k][cue][1]
+                        for k in range(len(tokens))
+                    ):
+                        hits.append(SearchHit(paths[file_id], cue, start / 1000))
+                        break
+        hits.sort(key=lambda hit: (hit.path, hit.start, hit.cue))
+        return hits[:limit] if limit is not None else hits
+
+    def _paths(self, file_ids: list) -> dict:
+        """file id -> path, queried in batches of _ID_BATCH ids"""
+        paths = {}
+        for i in range(0, len(file_ids), _ID_BATCH):
+            batch = file_ids[i : i + _ID_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            query = f"SELECT id, path FROM files WHERE id IN ({placeholders})"
+            paths.update(self._db.execute(query, batch))
+        return paths
+
+    def _postings(self, token: str, prefix: bool) -> dict:
+        """file id -> list of postings blobs of the token (several for a prefix)"""
+        if prefix:
+            rows = self._db.execute(
+                "SELECT file_id, data FROM postings WHERE token >= ? AND token < ?",
+                (token, token + "\U0010ffff"),
+            )
+        else:
+            rows = self._db.execute(
+                "SELECT file_id, data FROM postings WHERE token = ?", (token,)
+            )
+        postings = {}
+        for file_id, data in rows:
+            postings.setdefault(file_id, []).append(data)
+        return postings
+
+    @staticmethod
+    def _decode(blobs: list) -> dict:
+        """cue -> (start ms, set of positions), merging the blobs of a prefix token"""
+        merged = {}
+        for data in blobs:
+            for cue, (start, positions) in _decode_postings(data).items():
+                if cue in merged:
+                    merged[cue][1].update(positions)
+                else:
+                    merged[cue] = (start, set(positions))
+        return merged
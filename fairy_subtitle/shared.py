@@ -0,0 +1,125 @@
+# fairy_subtitle/shared.py
+# 多线程共享的字幕：读者无锁读取不可变的已发布版本，写者修改私有副本后原子地发布新版本
+# Subtitle shared between threads: readers use the immutable published version
+# without locking, writers edit a private copy and atomically publish a new version
+
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, NamedTuple
+
+from .history import SubtitleSnapshot
+from .models import Subtitle
+
+
+class Version(NamedTuple):
+    """A published version of a SharedSubtitle
+    SharedSubtitle 的一个已发布版本"""
+
+    number: int  # 0 for the initial version, +1 per successful edit
+    snapshot: SubtitleSnapshot  # Cues and information of this version
+
+
+class SharedSubtitle:
+    """
+    A subtitle shared between threads, read without locks.
+    在线程之间共享、读取时无需加锁的字幕。
+
+    Readers get the current version, an immutable SubtitleSnapshot whose cues,
+    info.size and info.duration always agree; it stays valid while newer versions
+    are published. Writers are serialized: each edits a private Subtitle and
+    publishes its snapshot with a single reference assignment, so readers never see
+    half of an edit. Unchanged chunks are shared between versions (see
+    fairy_subtitle.history), so publishing a local edit costs little memory. The
+    information, other_info (styles, header ...) included, is copied for every
+    version, and snapshot.info returns a further copy, so no version is changed by
+    later edits or by its readers.
+    读者获取当前版本，即一个不可变的 SubtitleSnapshot，其字幕块与 info.size、
+    info.duration 始终一致，发布新版本后旧版本仍然可用。写者依次执行：每个写者修改私有的
+    Subtitle，再用一次引用赋值发布它的快照，读者不会看到修改到一半的状态。各版本共享未变化
+    的块 (见 fairy_subtitle.history)，发布局部修改只占用很少的内存。字幕信息 (包括
+    other_info 中的样式、文件头等) 每个版本各复制一份，snapshot.info 返回的也是副本，
+    之后的修改和读者都不会改变已发布的版本。
+
+    Example:
+        shared = SharedSubtitle(subtitle)
+        # 读者 / reader threads
+        snapshot = shared.current
+        texts = [cue.text for cue in snapshot]
+        # 写者 / writer threads
+        with shared.edit() as subtitle:
+            subtitle.merge(3, 4)
+    """
+
+    def __init__(self, subtitle: Subtitle):
+        """
+        :param subtitle: Initial content, copied; later changes to it are not seen.
+        :param subtitle: 初始内容，会被复制，之后对它的修改不会反映到共享字幕中。
+        """
+        snapshot = subtitle.snapshot()
+        # 写者的私有副本，始终与最新版本一致 / Writers' copy, equal to the latest version
+        self._working = snapshot.to_subtitle()
+        self._published = Version(0, snapshot)
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        number, snapshot = self._published
+        return f"SharedSubtitle(version={number}, cues={len(snapshot)})"
+
+    @property
+    def current(self) -> SubtitleSnapshot:
+        """The latest published version, lock-free
+        最新发布的版本，无需加锁"""
+        return self._published.snapshot
+
+    @property
+    def version(self) -> Version:
+        """The latest version number and snapshot, read together
+        同时读取的最新版本号及快照"""
+        return self._published
+
+    def to_subtitle(self) -> Subtitle:
+        """
+        Returns a new Subtitle with the cues of the latest version, for methods that
+        need a Subtitle (save, to_srt ...); changes to it are not published.
+        返回包含最新版本字幕块的新 Subtitle，用于需要 Subtitle 的方法 (save、to_srt ...)；
+        对它的修改不会被发布。
+        """
+        return self._published.snapshot.to_subtitle()
+
+    @contextmanager
+    def edit(self, verify: bool = False) -> Iterator[Subtitle]:
+        """
+        Edits the subtitle and publishes the result as a new version on exit.
+        修改字幕，退出时把结果发布为新版本。
+
+        Writers wait for each other; readers are never blocked. If the block raises,
+        nothing is published and the edits are discarded. The Subtitle given must not
+        be used after the block.
+        写者之间互相等待，读者永远不会被阻塞。代码块抛出异常时不发布任何内容，修改被丢弃。
+        代码块结束后不要再使用得到的 Subtitle。
+
+        :param verify: Set it when Cue objects are changed directly instead of through
+                       the Subtitle methods (see Subtitle.snapshot).
+        :param verify: 直接修改 Cue 对象而不是通过 Subtitle 的方法修改时设置
+                       (见 Subtitle.snapshot)。
+        """
+        with self._lock:
+            working = self._working
+            try:
+                yield working
+            except BaseException:
+                working.restore(self._published.snapshot)
+                raise
+            number = self._published.number
+            self._published = Version(number + 1, working.snapshot(verify))
+
+    def update(self, func: Callable[[Subtitle], object], verify: bool = False):
+        """
+        Calls func with the subtitle inside edit() and returns its result.
+        在 edit() 中以字幕为参数调用 func，并返回其结果。
+
+        Example:
+            shared.update(lambda subtitle: subtitle.shift(1.5))
+        """
+        with self.edit(verify) as subtitle:
+            return func(subtitle)
@@ -0,0 +1,231 @@
+# fairy_subtitle/similar.py
+# 跨文件查找相似的字幕行 (OCR 错误、翻译的细微差异)
+# Find near-duplicate cue texts across many subtitles (OCR errors, small variants)
+#
+# 相似度为规范化文本的字符 n-gram 集合的 Jaccard 系数。查找使用前缀过滤
+# (All-Pairs / PPJoin)：n-gram 按出现频率从低到高排序，相似度达到阈值的两条文本
+# 一定在各自最前面的几个 n-gram 中有一个相同，因此只需为这些前缀建立倒排表，
+# 候选对再计算精确的相似度。
+# Similarity is the Jaccard coefficient of the character n-gram sets of the
+# normalized texts. Pairs are found by prefix filtering (All-Pairs / PPJoin): with
+# n-grams ordered from rarest to most frequent, two texts reaching the threshold
+# must share one of their first few n-grams, so only those prefixes are indexed and
+# the candidates are verified exactly.
+
+import math
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Iterable, NamedTuple, Optional, Union
+
+from .models import Subtitle
+from .stats import _MARKUP
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+class CueRef(NamedTuple):
+    """A cue of one of the indexed subtitles
+    已索引字幕中的一个字幕块"""
+
+    source: object  # Name given to add(), or the subtitle path
+    index: int  # Position of the cue in its subtitle
+    text: str  # Original cue text
+
+
+class SimilarPair(NamedTuple):
+    """Two cues whose texts are similar
+    文本相似的两个字幕块"""
+
+    a: CueRef
+    b: CueRef
+    similarity: float  # Jaccard coefficient of the n-gram sets, 0 - 1
+
+
+@dataclass(frozen=True)
+class Normalizer:
+    """
+    Configurable text normalization applied before comparing cues.
+    比较字幕块之前的文本规范化，各步骤可以单独开关。
+    """
+
+    markup: bool = True  # Strip HTML / ASS tags and \N line breaks
+    width: bool = True  # Fold fullwidth / halfwidth forms (NFKC)
+    case: bool = True  # Ignore case
+    punctuation: bool = False  # Ignore punctuation
+
+    def __call__(self, text: str) -> str:
+        if self.markup:
+            if "<" in text or "{" in text:
+                text = _MARKUP.sub(" ", text)
+            text = text.replace("\\N", " ").replace("\\n", " ")
+        if self.width and not text.isascii():
+            text = unicodedata.normalize("NFKC", text)
+        if self.case:
+            text = text.casefold()
+        if self.punctuation:
+            text = _PUNCTUATION.sub(" ", text)
+        return " ".join(text.split())
+
+
+class SimilarityIndex:
+    """
+    Collects the cue texts of many subtitles and finds near-duplicate pairs.
+    收集多个字幕的字幕块文本，查找相似的字幕块对。
+
+    Identical normalized texts are grouped before the search, so repeated lines
+    ("Yes.", "♪") are compared once.
+    规范化后相同的文本在查找前合并，重复出现的台词只比较一次。
+
+    Example:
+        index = SimilarityIndex()
+        for path in paths:
+            index.add(path, SubtitleLoader.load(path))
+        for pair in index.pairs(threshold=0.8):
+            print(pair.similarity, pair.a.text, pair.b.text)
+    """
+
+    def __init__(self, ngram: int = 3, normalize: Optional[Callable[[str], str]] = None):
+        """
+        :param ngram: Length of the character n-grams compared.
+        :param ngram: 比较的字符 n-gram 长度。
+        :param normalize: Text -> normalized text, defaults to Normalizer().
+        :param normalize: 文本 -> 规范化文本，默认为 Normalizer()。
+        """
+        if ngram <= 0:
+            raise ValueError("ngram must be positive")
+        self.ngram = ngram
+        self.normalize = normalize or Normalizer()
+        # 规范化文本 -> 具有该文本的字幕块 / Normalized text -> cues having it
+        self._groups: dict[str, list[CueRef]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(refs) for refs in self._groups.values())
+
+    def add(self, source, subtitle: Subtitle) -> "SimilarityIndex":
+        """
+        Adds the cues of a subtitle; cues with no text after normalization are skipped.
+        添加一个字幕的字幕块；规范化后没有文本的字幕块被忽略。
+
+        :param source: Name reported in CueRef.source, e.g. the file path.
+        :param source: CueRef.source 中报告的名称，例如文件路径。
+        """
+        groups = self._groups
+        normalize = self.normalize
+        for i, cue in enumerate(subtitle.cues):
+            key = normalize(cue.text)
+            if key:
+                groups.setdefault(key, []).append(CueRef(source, i, cue.text))
+        return self
+
+    def pairs(
+        self, threshold: float = 0.8, same_source: bool = True
+    ) -> list[SimilarPair]:
+        """
+        Returns the pairs of cues whose similarity is at least threshold, most
+        similar first.
+        返回相似度不低于 threshold 的字幕块对，相似度高的在前。
+
+        :param threshold: Minimum Jaccard similarity, in (0, 1].
+        :param threshold: 最低 Jaccard 相似度，取值 (0, 1]。
+        :param same_source: Also report pairs within one subtitle.
+        :param same_source: 是否也报告同一字幕内部的字幕块对。
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        keys = list(self._groups)
+        sets = [self._shingles(key) for key in keys]
+        result = []
+        # 1. 相同文本内部的字幕块对 / Pairs of cues with the same text
+        for key in keys:
+            refs = self._groups[key]
+            for i in range(len(refs)):
+                for j in range(i + 1, len(refs)):
+                    self._emit(result, refs[i], refs[j], 1.0, same_source)
+        # 2. 不同文本之间的相似对 / Similar pairs of distinct texts
+        for x, y, similarity in _join(sets, threshold):
+            for a in self._groups[keys[x]]:
+                for b in self._groups[keys[y]]:
+                    self._emit(result, a, b, similarity, same_source)
+        result.sort(key=lambda pair: -pair.similarity)
+        return result
+
+    def _shingles(self, text: str) -> set:
+        n = self.ngram
+        if len(text) <= n:
+            return {text}
+        return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+    @staticmethod
+    def _emit(result: list, a: CueRef, b: CueRef, similarity: float, same_source):
+        if same_source or a.source != b.source:
+            result.append(SimilarPair(a, b, similarity))
+
+
+def find_similar(
+    subtitles: Union[dict, Iterable[Subtitle]],
+    threshold: float = 0.8,
+    ngram: int = 3,
+    normalize: Optional[Callable[[str], str]] = None,
+    same_source: bool = True,
+) -> list[SimilarPair]:
+    """
+    Finds near-duplicate cues across subtitles, see SimilarityIndex.
+    在多个字幕之间查找相似的字幕块，见 SimilarityIndex。
+
+    :param subtitles: name -> Subtitle, or Subtitle objects (named by their path).
+    :param subtitles: 名称 -> Subtitle 的字典，或 Subtitle 对象 (以路径命名)。
+    """
+    index = SimilarityIndex(ngram, normalize)
+    if isinstance(subtitles, dict):
+        items = subtitles.items()
+    else:
+        items = ((subtitle.info.path, subtitle) for subtitle in subtitles)
+    for source, subtitle in items:
+        index.add(source, subtitle)
+    return index.pairs(threshold, same_source)
+
+
+def _join(sets: list, threshold: float) -> Iterable[tuple]:
+    """Yields (i, j, similarity) for every pair of sets with Jaccard >= threshold"""
+    # n-gram 按出现频率从低到高编号，前缀中是最少见的 n-gram，候选对最少
+    frequency = Counter(token for tokens in sets for token in tokens)
+    rank = {
+        token: r
+        for r, token in enumerate(sorted(frequency, key=lambda t: (frequency[t], t)))
+    }
+    records = [sorted(rank[token] for token in tokens) for tokens in sets]
+    # 按集合大小从小到大处理，已建立索引的集合都不大于当前集合
+    order = sorted(range(len(records)), key=lambda i: len(records[i]))
+    sizes = [len(record) for record in records]
+    # 倒排表按集合大小递增，开头过小的集合以后也不会再成为候选，记录跳过的位置
+    # Postings grow in size order; the too-small head is skipped for good
+    inverted: dict[int, list[int]] = {}
+    skipped: dict[int, int] = {}
+    for x in order:
+        record = records[x]
+        size = sizes[x]
+        # 相似度达到阈值时，较小集合的大小至少为 threshold * size (减去浮点误差)
+        min_size = threshold * size - 1e-9
+        prefix = size - math.ceil(threshold * size - 1e-9) + 1
+        candidates = set()
+        for token in record[:prefix]:
+            postings = inverted.get(token)
+            if postings is None:
+                inverted[token] = [x]
+                continue
+            start = skipped.get(token, 0)
+            while start < len(postings) and sizes[postings[start]] < min_size:
+                start += 1
+            skipped[token] = start
+            candidates.update(postings[start:])
+            postings.append(x)
+        if not candidates:
+            continue
+        tokens = sets[x]
+        for y in candidates:
+            overlap = len(tokens & sets[y])
+            similarity = overlap / (size + sizes[y] - overlap)
+            if similarity >= threshold:
+                yield (y, x, similarity) if y < x else (x, y, similarity)
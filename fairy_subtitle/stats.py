@@ -0,0 +1,222 @@
+# fairy_subtitle/stats.py
+# 阅读速度与行长统计
+# Reading speed and line length statistics
+
+import math
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Union
+
+from .exceptions import SubtitleError
+from .models import Subtitle
+
+# 标签: HTML 风格标签 (<i>, <c.red>, <00:00:01.000>) 和 ASS 覆盖标签 ({\b1})
+# Markup: HTML-like tags and ASS override blocks
+_MARKUP = re.compile(r"<[^>\n]*>|\{[^}\n]*\}")
+# 全角 / 宽字符 (CJK 统一表意文字、假名、谚文、全角标点等)，显示宽度为 2
+# Wide and fullwidth characters (CJK ideographs, kana, hangul, fullwidth forms)
+_WIDE = re.compile(
+    "[\u1100-\u115f\u2e80-\u303e\u3041-\u33ff\u3400-\u4dbf\u4e00-\u9fff"
+    "\ua000-\ua4cf\uac00-\ud7a3\uf900-\ufaff\ufe30-\ufe4f\uff00-\uff60"
+    "\uffe0-\uffe6\U00020000-\U0003fffd]"
+)
+# 组合字符，显示宽度为 0
+# Combining characters, zero display width
+_COMBINING = re.compile("[\u0300-\u036f\u1ab0-\u1aff\u20d0-\u20ff\ufe20-\ufe2f]")
+# 英文等以空白分词的单词
+# Words of whitespace separated scripts
+_WORD = re.compile(
+    "[^\\s\u1100-\u115f\u2e80-\u303e\u3041-\u33ff\u3400-\u4dbf\u4e00-\u9fff"
+    "\uac00-\ud7a3\uf900-\ufaff\uff00-\uff60]+"
+)
+
+# 统计的百分位数 / Reported percentiles
+PERCENTILES = (50, 90, 95, 99)
+
+
+@dataclass
+class Distribution:
+    """Summary of one metric over all cues
+    一项指标在所有字幕块上的分布"""
+
+    min: float
+    max: float
+    mean: float
+    percentiles: dict  # Percentile (50, 90, 95, 99) -> value
+
+    @classmethod
+    def from_values(cls, values: Iterable[float]) -> "Distribution":
+        """Builds the summary, non-finite values (e.g. CPS of zero-length cues) are
+        left out"""
+        values = sorted(values)
+        while values and values[-1] == math.inf:
+            values.pop()
+        if not values:
+            return cls(0.0, 0.0, 0.0, {p: 0.0 for p in PERCENTILES})
+        return cls(
+            min=values[0],
+            max=values[-1],
+            mean=math.fsum(values) / len(values),
+            percentiles={p: _percentile(values, p) for p in PERCENTILES},
+        )
+
+
+@dataclass
+class SubtitleStats:
+    """Reading speed and layout statistics of a subtitle
+    字幕的阅读速度与排版统计"""
+
+    cues: int  # Number of cues
+    cps: Distribution  # Characters per second
+    wpm: Distribution  # Words per minute
+    line_length: Distribution  # Longest line of each cue, in display columns
+    line_count: Distribution  # Number of lines of each cue
+    duration: Distribution  # Display duration of each cue in seconds
+    columns: Optional[dict] = None  # Metric name -> per cue array, when per_cue=True
+
+    @property
+    def max_cps(self) -> float:
+        return self.cps.max
+
+    @property
+    def max_line_length(self) -> int:
+        return int(self.line_length.max)
+
+    @property
+    def max_line_count(self) -> int:
+        return int(self.line_count.max)
+
+    @property
+    def min_duration(self) -> float:
+        return self.duration.min
+
+
+def text_width(text: str) -> int:
+    """
+    Returns the display width of a single line, CJK and fullwidth characters count 2.
+    返回单行文本的显示宽度，CJK 和全角字符计为 2。
+    """
+    if text.isascii():
+        return len(text)
+    return len(text) + len(_WIDE.findall(text)) - len(_COMBINING.findall(text))
+
+
+def compute_stats(subtitle: Subtitle, per_cue: bool = False) -> SubtitleStats:
+    """
+    Computes every metric in one pass over the cues.
+    对所有字幕块做一次遍历，计算全部指标。
+
+    Characters are counted without markup, spaces and line breaks, each CJK
+    character counts as one word.
+    字符数不含标签、空格和换行，每个 CJK 字符计为一个词。
+
+    :param per_cue: Whether to keep the per cue values in SubtitleStats.columns.
+    :param per_cue: 是否在 SubtitleStats.columns 中保留每个字幕块的数值。
+    """
+    cps = array("d")
+    wpm = array("d")
+    line_length = array("d")
+    line_count = array("d")
+    duration = array("d")
+
+    for cue in subtitle.cues:
+        text = cue.text
+        if "<" in text or "{" in text:
+            text = _MARKUP.sub("", text)
+        text = text.replace("\\N", "\n").replace("\\n", "\n")
+        lines = [line.strip() for line in text.split("\n")]
+
+        # 字符数和词数按整段文本统计，只有最长行需要逐行计算
+        chars = len(text) - text.count(" ") - text.count("\n")
+        if text.isascii():
+            words = len(text.split())
+            longest = max(map(len, lines))
+        else:
+            wide = len(_WIDE.findall(text))
+            combining = len(_COMBINING.findall(text))
+            # 宽字符逐字计为一个词，组合字符不计入字符数
+            chars -= combining
+            words = len(_WORD.findall(text)) + wide
+            longest = max(map(text_width if wide or combining else len, lines))
+
+        seconds = cue.end - cue.start
+        duration.append(seconds)
+        line_count.append(len(lines) - lines.count(""))
+        line_length.append(longest)
+        if seconds > 0:
+            cps.append(chars / seconds)
+            wpm.append(words * 60 / seconds)
+        else:
+            cps.append(math.inf if chars else 0.0)
+            wpm.append(math.inf if words else 0.0)
+
+    columns = None
+    if per_cue:
+        columns = {
+            "cps": cps,
+            "wpm": wpm,
+            "line_length": line_length,
+            "line_count": line_count,
+            "duration": duration,
+        }
+    return SubtitleStats(
+        cues=len(duration),
+        cps=Distribution.from_values(cps),
+        wpm=Distribution.from_values(wpm),
+        line_length=Distribution.from_values(line_length),
+        line_count=Distribution.from_values(line_count),
+        duration=Distribution.from_values(duration),
+        columns=columns,
+    )
+
+
+def _load_stats(args: tuple) -> Union[SubtitleStats, Exception]:
+    """Worker: loads one file and computes its statistics"""
+    from .subtitle import SubtitleLoader
+
+    file_path, format, encoding = args
+    try:
+        return compute_stats(SubtitleLoader.load(file_path, format, encoding))
+    except (OSError, UnicodeDecodeError, SubtitleError) as e:
+        return e
+
+
+def batch_stats(
+    file_paths: Iterable[str],
+    format: str = "auto",
+    encoding: str = "utf-8",
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+) -> Iterator[tuple[str, Union[SubtitleStats, Exception]]]:
+    """
+    Computes the statistics of many files in parallel worker processes.
+    使用多个工作进程并行计算大量文件的统计信息。
+
+    Files that cannot be read or parsed yield the exception instead of stopping
+    the batch.
+    无法读取或解析的文件产出对应的异常，而不会中断整个批次。
+
+    :param file_paths: Paths of the subtitle files.
+    :param file_paths: 字幕文件路径。
+    :param workers: Number of worker processes, defaults to the number of CPUs.
+    :param workers: 工作进程数，默认为 CPU 数。
+    :param chunksize: Number of files sent to a worker at a time.
+    :param chunksize: 每次发送给工作进程的文件数。
+    :return: An iterator of (file_path, SubtitleStats or exception), in input order.
+    :return: (文件路径, SubtitleStats 或异常) 的迭代器，顺序与输入相同。
+    """
+    file_paths = list(file_paths)
+    jobs = [(file_path, format, encoding) for file_path in file_paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_load_stats, jobs, chunksize=chunksize)
+        yield from zip(file_paths, results)
+
+
+def _percentile(values: list, percentile: float) -> float:
+    """Linear interpolation between the closest ranks of sorted values"""
+    position = (len(values) - 1) * percentile / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
@@ -2,80 +2,62 @@
 # A simple and powerful subtitle parsing library
 
 import os
-import re
+from typing import Iterator, Optional
 
 from .exceptions import UnsupportedFormatError
-from .models import Subtitle
-from .parsers import parse_ass, parse_sbv, parse_srt, parse_sub, parse_vtt
-
-# 未来可以导入更多解析器
-# from .parsers import parse_vtt, parse_ass
-
-
-def _validate_srt_format(content: str) -> bool:
-    """
-    Validates if content matches SRT format characteristics
-    验证内容是否符合SRT格式特征
-
-    SRT format typically starts with numbers followed by timestamp format (00:00:00,000 --> 00:00:00,000)
-    SRT格式通常以数字开头，后面跟着时间戳格式 (00:00:00,000 --> 00:00:00,000)
-    """
-    # 检查是否包含SRT时间戳格式
-    srt_timestamp_pattern = r"\d{2}:\d{2}:\d{2},\d{3} --> \d{2}:\d{2}:\d{2},\d{3}"
-    return bool(re.search(srt_timestamp_pattern, content))
-
-
-def _validate_vtt_format(content: str) -> bool:
-    """
-    Validates if content matches VTT format characteristics
-    验证内容是否符合VTT格式特征
-
-    VTT format typically starts with "WEBVTT"
-    VTT格式通常以"WEBVTT"开头
-    """
-    return content.strip().startswith("WEBVTT")
-
-
-def _validate_ass_format(content: str) -> bool:
-    """
-    Validates if content matches ASS format characteristics
-    验证内容是否符合ASS格式特征
-
-    ASS format typically starts with "[Script Info]"
-    ASS格式通常以"[Script Info]"开头
-    """
-    return content.strip().startswith("[Script Info]")
-
-
-def _validate_sbv_format(content: str) -> bool:
-    """
-    Validates if content matches SBV format characteristics
-    验证内容是否符合SBV格式特征
-
-    SBV format typically starts with timestamps in format "00:00:00.000,00:00:00.000"
-    SBV格式通常以时间戳格式 "00:00:00.000,00:00:00.000" 开头
-    """
-    # 检查是否包含SBV时间戳格式
-    sbv_timestamp_pattern = r"\d{2}:\d{2}:\d{2}\.\d{3},\d{2}:\d{2}:\d{2}\.\d{3}"
-    return bool(re.search(sbv_timestamp_pattern, content))
-
-
-def _validate_sub_format(content: str) -> bool:
-    """
-    Validates if content matches MicroDVD (.sub) format characteristics
-    验证内容是否符合MicroDVD (.sub)格式特征
-
-    MicroDVD format typically uses {frame_range}text format
-    MicroDVD格式通常使用{帧范围}文本格式
-    """
-    # 检查是否包含MicroDVD格式特征
-    sub_pattern = r"\{[0-9]+\}[0-9]+\}"
-    return bool(re.search(sub_pattern, content))
+from .models import Cue, Subtitle
+from .profiling import stage
+from .registry import detect_format, get_format, list_formats
+
+# 流式加载时用于识别格式的文件开头长度
+# Number of characters read from the start of the file to detect its format when streaming
+_DETECT_HEAD_SIZE = 4096
+
+
+def _resolve_format(content: str, file_path: str, format: str) -> str:
+    """Validates the specified format, or detects it from the content
+    验证指定的格式，或根据内容检测格式"""
+    # 1. 处理格式指定
+    if format != "auto":
+        # 验证文件内容是否与指定格式匹配
+        format = format.lower()
+        if not get_format(format).validate(content):
+            # 如果验证失败，尝试自动检测格式
+            print(f"警告：文件内容与指定格式 '{format}' 不匹配，尝试自动检测格式...")
+            format = "auto"
+
+    # 2. 自动检测格式 (如果需要)
+    if format == "auto":
+        format = detect_format(content, file_path)
+        if format is None:
+            names = "', '".join(list_formats())
+            raise UnsupportedFormatError(
+                f"无法自动检测格式，请手动指定 '{names}'。"
+                f"Unable to automatically detect format, please manually specify '{names}'."
+            )
+
+    return format
+
+
+def _shift_diagnostics(diagnostics: list, offset: int, lines: int) -> list:
+    """Moves diagnostics by offset characters and lines
+    将诊断信息的位置移动 offset 个字符、lines 行"""
+    return [
+        diagnostic._replace(
+            line=diagnostic.line + lines, offset=diagnostic.offset + offset
+        )
+        for diagnostic in diagnostics
+    ]
 
 
 class SubtitleLoader:
     @staticmethod
-    def load(file_path: str, format: str = "auto", encoding: str = "utf-8") -> Subtitle:
+    def load(
+        file_path: str,
+        format: str = "auto",
+        encoding: str = "utf-8",
+        errors: Optional[str] = None,
+    ) -> Subtitle:
         """
         Loads a subtitle file.
         加载字幕文件。
@@ -86,80 +68,76 @@ class SubtitleLoader:
         :param format: 字幕格式 ('srt', 'vtt', 'ass', 'sbv', 'sub', 'auto')。
         :param encoding: File encoding.
         :param encoding: 文件编码。
+        :param errors: Error policy ('strict', 'lenient', 'collect'), defaults to the parser's own.
+        :param errors: 错误策略 ('strict', 'lenient', 'collect')，默认使用解析器自身的策略。
         :return: A Subtitle object.
         :return: 一个 Subtitle 对象。
         """
         file_path = os.path.abspath(file_path)
 
         # 1. 读取文件内容
+        with stage("read", file_path) as stats:
+            with open(file_path, "r", encoding=encoding) as f:
+                raw_content = f.read()
+                if stats is not None:
+                    stats.size = os.fstat(f.fileno()).st_size
+        return SubtitleLoader._parse_content(file_path, raw_content, format, errors)
+
+    @staticmethod
+    def _parse_content(
+        file_path: str, raw_content: str, format: str, errors: Optional[str]
+    ) -> Subtitle:
+        """Parses the text of a file that has already been read, see load()
+        解析已经读取的文件内容，见 load()"""
+        content = raw_content.strip()
+
+        # 2. 确定格式
+        with stage("detect", file_path):
+            format = _resolve_format(content, file_path, format)
+
+        # 3. 使用注册表中对应的解析器 (解析器模块在此时才被导入)
+        with stage("parse", file_path) as stats:
+            subtitle = get_format(format).parse(file_path, content, errors)
+            if stats is not None:
+                stats.size = len(content)
+                stats.cues = len(subtitle.cues)
+
+        # 4. 诊断信息的位置以原始文件为准 (补上被去掉的开头空白)
+        leading = len(raw_content) - len(raw_content.lstrip())
+        if leading and subtitle.info.diagnostics:
+            subtitle.info.diagnostics = _shift_diagnostics(
+                subtitle.info.diagnostics,
+                leading,
+                raw_content.count("\n", 0, leading),
+            )
+        return subtitle
+
+    @staticmethod
+    def stream(
+        file_path: str, format: str = "auto", encoding: str = "utf-8"
+    ) -> Iterator[Cue]:
+        """
+        Reads a subtitle file cue by cue without loading it into memory.
+        逐条读取字幕文件，而不将整个文件载入内存。
+
+        :param file_path: Path to the subtitle file.
+        :param file_path: 文件路径。
+        :param format: Subtitle format, must support streaming ('srt', 'vtt', 'sbv', 'auto').
+        :param format: 字幕格式，须支持流式解析 ('srt', 'vtt', 'sbv', 'auto')。
+        :param encoding: File encoding.
+        :param encoding: 文件编码。
+        :return: An iterator of Cue objects.
+        :return: Cue 对象的迭代器。
+        """
+        file_path = os.path.abspath(file_path)
+
         with open(file_path, "r", encoding=encoding) as f:
-            content = f.read().strip()
-
-        # 2. 处理格式指定
-        if format != "auto":
-            # 验证文件内容是否与指定格式匹配
-            format = format.lower()
-            validation_functions = {
-                "srt": _validate_srt_format,
-                "vtt": _validate_vtt_format,
-                "ass": _validate_ass_format,
-                "sbv": _validate_sbv_format,
-                "sub": _validate_sub_format,
-            }
-
-            if format in validation_functions:
-                if not validation_functions[format](content):
-                    # 如果验证失败，尝试自动检测格式
-                    print(
-                        f"警告：文件内容与指定格式 '{format}' 不匹配，尝试自动检测格式..."
-                    )
-                    format = "auto"
-
-        # 3. 自动检测格式 (如果需要)
-        if format == "auto":
-            # 先尝试基于内容检测
-            if _validate_srt_format(content):
-                format = "srt"
-            elif _validate_vtt_format(content):
-                format = "vtt"
-            elif _validate_ass_format(content):
-                format = "ass"
-            elif _validate_sbv_format(content):
-                format = "sbv"
-            elif _validate_sub_format(content):
-                format = "sub"
-            else:
-                # Fallback detection based on file extension
-                # 基于扩展名的后备检测
-                if file_path.lower().endswith(".srt"):
-                    format = "srt"
-                elif file_path.lower().endswith(".vtt"):
-                    format = "vtt"
-                elif file_path.lower().endswith(".ass"):
-                    format = "ass"
-                elif file_path.lower().endswith(".sbv"):
-                    format = "sbv"
-                elif file_path.lower().endswith(".sub"):
-                    format = "sub"
-                else:
-                    raise UnsupportedFormatError(
-                        "无法自动检测格式，请手动指定 'srt', 'vtt', 'ass', 'sbv' 或 'sub'。"
-                        "Unable to automatically detect format, please manually specify 'srt', 'vtt', 'ass', 'sbv' or 'sub'."
-                    )
-
-        # 4. 根据格式选择对应的解析器
-        if format == "srt":
-            return parse_srt(file_path, content)
-        elif format == "vtt":
-            return parse_vtt(file_path, content)
-        elif format == "ass":
-            return parse_ass(file_path, content)
-        elif format == "sbv":
-            return parse_sbv(file_path, content)
-        elif format == "sub":
-            return parse_sub(file_path, content)
-        else:
-            raise UnsupportedFormatError(f"不支持的格式: {format}")
+            # 只根据文件开头识别格式
+            head = f.read(_DETECT_HEAD_SIZE).strip()
+            format = _resolve_format(head, file_path, format)
+            subtitle_format = get_format(format)
+            f.seek(0)
+            yield from subtitle_format.iter_cues(f)
 
 
 # For user convenience, a simpler alias can be provided in the package's __init__.py
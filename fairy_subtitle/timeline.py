@@ -0,0 +1,199 @@
+# fairy_subtitle/timeline.py
+# 预编译的播放时间轴：按事件边界切分，每段保存当前显示的字幕块
+# Precompiled playback timeline: boundaries between events, each segment holding
+# the cues shown during it
+
+import json
+from array import array
+from bisect import bisect_right
+from typing import Optional
+
+from .models import Cue, Subtitle
+
+# 序列化格式版本 / Serialization format version
+TIMELINE_VERSION = 1
+
+
+class Timeline:
+    """
+    Cue boundaries of a subtitle, compiled for real-time lookup by a player.
+    为播放器实时查询而编译的字幕时间边界。
+
+    Segment k covers [boundaries[k], boundaries[k + 1]) and lists the indices of the
+    cues visible during it, in cue order. Use cursor() for playback (O(1) amortized
+    while time moves forward) and active() for random access (O(log n)).
+    第 k 段覆盖 [boundaries[k], boundaries[k + 1])，保存该段内显示的字幕块序号 (按字幕顺序)。
+    播放时使用 cursor() (时间单调递增时均摊 O(1))，随机访问使用 active() (O(log n))。
+    """
+
+    __slots__ = ("cues", "boundaries", "segments")
+
+    def __init__(self, cues: list, boundaries: array, segments: list):
+        self.cues = cues  # Cue objects, segments index into this list
+        self.boundaries = boundaries  # Sorted distinct start / end times
+        self.segments = segments  # len(boundaries) - 1 tuples of cue indices
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def __repr__(self) -> str:
+        return f"Timeline(cues={len(self.cues)}, segments={len(self.segments)})"
+
+    def segment_at(self, time: float) -> int:
+        """Returns the segment containing time, -1 outside the timeline"""
+        k = bisect_right(self.boundaries, time) - 1
+        return k if k < len(self.segments) else -1
+
+    def active(self, time: float) -> tuple:
+        """
+        Returns the indices of the cues visible at time (binary search).
+        返回指定时间显示的字幕块序号 (二分查找)。
+        """
+        k = self.segment_at(time)
+        return self.segments[k] if k >= 0 else ()
+
+    def active_cues(self, time: float) -> list[Cue]:
+        """Returns the cues visible at time
+        返回指定时间显示的字幕块"""
+        return [self.cues[i] for i in self.active(time)]
+
+    def cursor(self) -> "TimelineCursor":
+        """Returns a playback cursor positioned at the start
+        返回位于开头的播放游标"""
+        return TimelineCursor(self)
+
+    def to_dict(self) -> dict:
+        """
+        Converts the timeline to a JSON compatible dictionary.
+        将时间轴转换为可序列化为 JSON 的字典。
+        """
+        return {
+            "version": TIMELINE_VERSION,
+            "cues": [[cue.start, cue.end, cue.text] for cue in self.cues],
+            "boundaries": list(self.boundaries),
+            "segments": [list(segment) for segment in self.segments],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Timeline":
+        """
+        Loads a timeline produced by to_dict() without recompiling it.
+        加载 to_dict() 生成的时间轴，无需重新编译。
+        """
+        version = data.get("version")
+        if version != TIMELINE_VERSION:
+            raise ValueError(f"Unsupported timeline version: {version}")
+        cues = [
+            Cue(start=start, end=end, text=text, index=i)
+            for i, (start, end, text) in enumerate(data["cues"])
+        ]
+        boundaries = array("d", data["boundaries"])
+        segments = [tuple(segment) for segment in data["segments"]]
+        if len(segments) != max(len(boundaries) - 1, 0):
+            raise ValueError("Timeline segments do not match its boundaries")
+        return cls(cues, boundaries, segments)
+
+    def save(self, file_path: str) -> "Timeline":
+        """Writes the timeline as JSON
+        将时间轴保存为 JSON"""
+        with open(file_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        return self
+
+    @classmethod
+    def load(cls, file_path: str) -> "Timeline":
+        """Reads a timeline written by save()
+        读取 save() 保存的时间轴"""
+        with open(file_path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+class TimelineCursor:
+    """
+    Playback position on a Timeline.
+    Timeline 上的播放位置。
+
+    Remembers the current segment: a forward step only moves past the boundaries
+    crossed since the last call, a backward jump falls back to binary search.
+    记住当前所在的段：向前播放时只越过上次调用后经过的边界，向后跳转时使用二分查找。
+    """
+
+    __slots__ = ("timeline", "_segment")
+
+    def __init__(self, timeline: Timeline):
+        self.timeline = timeline
+        self._segment = -1  # -1: before the first boundary
+
+    def seek(self, time: float) -> tuple:
+        """Moves to time with a binary search and returns the visible cue indices
+        使用二分查找移动到指定时间，返回显示的字幕块序号"""
+        boundaries = self.timeline.boundaries
+        self._segment = min(bisect_right(boundaries, time), len(boundaries)) - 1
+        return self._current()
+
+    def advance(self, time: float) -> tuple:
+        """
+        Returns the cue indices visible at time, optimized for increasing times.
+        返回指定时间显示的字幕块序号，针对递增的时间优化。
+        """
+        boundaries = self.timeline.boundaries
+        k = self._segment
+        if k >= 0 and time < boundaries[k]:
+            return self.seek(time)
+        last = len(boundaries) - 1
+        while k < last and boundaries[k + 1] <= time:
+            k += 1
+        self._segment = k
+        return self._current()
+
+    __call__ = advance
+
+    def _current(self) -> tuple:
+        k = self._segment
+        segments = self.timeline.segments
+        return segments[k] if 0 <= k < len(segments) else ()
+
+
+def compile_timeline(subtitle: Subtitle) -> Timeline:
+    """
+    Compiles a subtitle into a Timeline with one sweep over the sorted boundaries.
+    对排序后的边界做一次扫描，把字幕编译为 Timeline。
+
+    Cues with end <= start are never visible and do not appear in any segment.
+    Consecutive segments with the same visible cues are merged.
+    end <= start 的字幕块不会显示，不出现在任何段中。显示内容相同的相邻段会被合并。
+    """
+    cues = list(subtitle.cues)
+    events = []  # (time, kind, cue index); kind 0 = end, 1 = start
+    for i, cue in enumerate(cues):
+        if cue.end > cue.start:
+            events.append((cue.start, 1, i))
+            events.append((cue.end, 0, i))
+    events.sort()
+
+    boundaries = array("d")
+    segments = []
+    active = set()
+    previous: Optional[tuple] = None
+    n = 0
+    while n < len(events):
+        time = events[n][0]
+        # 同一时间的所有结束和开始事件一起处理
+        while n < len(events) and events[n][0] == time:
+            _, kind, i = events[n]
+            if kind:
+                active.add(i)
+            else:
+                active.discard(i)
+            n += 1
+        segment = tuple(sorted(active))
+        if segment == previous:
+            continue
+        boundaries.append(time)
+        segments.append(segment)
+        previous = segment
+
+    # 最后一个边界之后没有字幕显示，去掉末尾的空段
+    if segments:
+        segments.pop()
+    return Timeline(cues, boundaries, segments)
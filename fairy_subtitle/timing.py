@@ -0,0 +1,219 @@
+# fairy_subtitle/timing.py
+# 帧精确的时间模型：精确的有理数帧率与整数 tick
+# Frame accurate timing: exact rational framerates and integer ticks
+#
+# 23.976 之类的 NTSC 帧率实际是 24000/1001，用浮点数表示会在长片中累积出整帧的误差。
+# Timebase 以整数 tick 表示时间，每秒的 tick 数同时是 1000 (毫秒)、100 (ASS 厘秒)
+# 和帧率分子的倍数，因此帧、毫秒和厘秒之间的转换都是无损的。
+# NTSC rates such as 23.976 are really 24000/1001. A Timebase counts time in integer
+# ticks, with ticks per second a multiple of 1000, 100 and the framerate numerator,
+# so frames, milliseconds and ASS centiseconds all convert losslessly.
+#
+# Cue 仍以浮点秒数保存时间 (所有格式和调用方都依赖这一点)。浮点数在 3 小时内的误差小于
+# 1e-12 秒，远小于半个 tick (24000/1001 时约 2e-5 秒)，from_seconds 取最近的 tick 即可
+# 精确还原帧号、毫秒和厘秒；tick 只在换算时使用。
+# Cue keeps float seconds, which every format and caller relies on. Within hours a
+# float is off by less than 1e-12 s, far below half a tick (about 2e-5 s at
+# 24000/1001), so from_seconds recovers the exact frame, millisecond or centisecond
+# by rounding to the nearest tick; ticks are only used while converting.
+
+import math
+from fractions import Fraction
+from typing import Union
+
+from .models import Subtitle
+
+FramerateLike = Union[int, float, str, Fraction]
+
+# NTSC 帧率 (N * 1000 / 1001)，按常见的小数写法识别
+# NTSC framerates (N * 1000 / 1001), recognised from their usual decimal spelling
+NTSC_FRAMERATES = {
+    round(n * 1000 / 1001, 3): Fraction(n * 1000, 1001) for n in (24, 30, 48, 60, 120)
+}
+
+# 取整方式 / Rounding modes
+NEAREST = "nearest"
+FLOOR = "floor"
+CEIL = "ceil"
+
+
+def parse_framerate(value: FramerateLike) -> Fraction:
+    """
+    Returns a framerate as an exact fraction.
+    将帧率转换为精确的分数。
+
+    Accepts ints, Fractions, "24000/1001" and decimals; the decimal spellings of NTSC
+    rates (23.976, 29.97, 59.94, ...) map to N*1000/1001.
+    接受整数、Fraction、"24000/1001" 和小数；NTSC 帧率的小数写法 (23.976, 29.97, 59.94 等)
+    会转换为 N*1000/1001。
+    """
+    if isinstance(value, Fraction):
+        framerate = value
+    elif isinstance(value, int):
+        framerate = Fraction(value)
+    else:
+        text = str(value).strip()
+        try:
+            framerate = Fraction(text)
+        except ValueError:
+            raise ValueError(f"Invalid framerate: {value}")
+        if framerate.denominator != 1 and "/" not in text:
+            # 小数写法: 优先识别为 NTSC 帧率
+            ntsc = NTSC_FRAMERATES.get(round(float(framerate), 3))
+            if ntsc is None:
+                ntsc = NTSC_FRAMERATES.get(round(float(framerate), 2))
+            if ntsc is not None:
+                framerate = ntsc
+    if framerate <= 0:
+        raise ValueError(f"Invalid framerate: {value}")
+    return framerate
+
+
+def plain_framerate(framerate: FramerateLike) -> Union[int, Fraction]:
+    """Returns integral framerates as int and the others as Fraction
+    整数帧率返回 int，其他帧率返回 Fraction"""
+    framerate = parse_framerate(framerate)
+    return framerate.numerator if framerate.denominator == 1 else framerate
+
+
+def format_framerate(framerate: FramerateLike) -> str:
+    """Returns the usual decimal spelling of a framerate ("24", "23.976", "25")
+    返回帧率的常见小数写法 ("24", "23.976", "25")"""
+    framerate = parse_framerate(framerate)
+    if framerate.denominator == 1:
+        return str(framerate.numerator)
+    return f"{float(framerate):.3f}".rstrip("0").rstrip(".")
+
+
+def _round(value: Fraction, rounding: str) -> int:
+    if rounding == NEAREST:
+        # 四舍五入 (0.5 进位)，不使用银行家舍入
+        return math.floor(value + Fraction(1, 2))
+    if rounding == FLOOR:
+        return math.floor(value)
+    if rounding == CEIL:
+        return math.ceil(value)
+    raise ValueError(f"Unknown rounding: {rounding}, expected one of nearest/floor/ceil")
+
+
+class Timebase:
+    """
+    Integer tick time base of a framerate.
+    某个帧率的整数 tick 时间基准。
+
+    ticks_per_second is the least common multiple of 1000 and the framerate
+    numerator, e.g. 24000 ticks per second for 24000/1001 (one frame = 1001 ticks,
+    one millisecond = 24 ticks).
+    ticks_per_second 是 1000 与帧率分子的最小公倍数，例如 24000/1001 对应每秒 24000 tick
+    (一帧 = 1001 tick，一毫秒 = 24 tick)。
+    """
+
+    __slots__ = ("framerate", "ticks_per_second", "ticks_per_frame")
+
+    def __init__(self, framerate: FramerateLike):
+        self.framerate = parse_framerate(framerate)
+        self.ticks_per_second = math.lcm(1000, self.framerate.numerator)
+        self.ticks_per_frame = (
+            self.ticks_per_second // self.framerate.numerator
+        ) * self.framerate.denominator
+
+    def __repr__(self) -> str:
+        return f"Timebase({self.framerate})"
+
+    # 帧 / Frames
+    def from_frames(self, frames: int) -> int:
+        return frames * self.ticks_per_frame
+
+    def to_frames(self, ticks: int, rounding: str = NEAREST) -> int:
+        return _round(Fraction(ticks, self.ticks_per_frame), rounding)
+
+    # 毫秒 / Milliseconds
+    def from_ms(self, ms: int) -> int:
+        return ms * (self.ticks_per_second // 1000)
+
+    def to_ms(self, ticks: int, rounding: str = NEAREST) -> int:
+        return _round(Fraction(ticks * 1000, self.ticks_per_second), rounding)
+
+    # ASS 厘秒 / ASS centiseconds
+    def from_centiseconds(self, centiseconds: int) -> int:
+        return centiseconds * (self.ticks_per_second // 100)
+
+    def to_centiseconds(self, ticks: int, rounding: str = NEAREST) -> int:
+        return _round(Fraction(ticks * 100, self.ticks_per_second), rounding)
+
+    # 秒 (Cue 中使用的浮点数) / Seconds, as stored in Cue
+    def from_seconds(self, seconds: float) -> int:
+        """Rounds to the nearest tick: milliseconds and frame boundaries are whole
+        ticks, so this removes the float noise (7.8 is 7.79999...) exactly"""
+        return _round(Fraction(seconds) * self.ticks_per_second, NEAREST)
+
+    def to_seconds(self, ticks: int) -> float:
+        return ticks / self.ticks_per_second
+
+    def frame_to_seconds(self, frame: int) -> float:
+        """Exact start time of a frame, rounded once to float
+        帧的精确开始时间，只在最后转换一次为浮点数"""
+        return float(frame / self.framerate)
+
+    def seconds_to_frame(self, seconds: float, rounding: str = NEAREST) -> int:
+        return self.to_frames(self.from_seconds(seconds), rounding)
+
+
+def snap_to_frames(
+    subtitle: Subtitle, framerate: FramerateLike, rounding: str = NEAREST
+) -> Subtitle:
+    """
+    In-place modification. Moves every start and end time onto the frame grid.
+    就地修改。把所有开始和结束时间对齐到帧边界。
+
+    Times are rounded to the nearest frame start by default; use rounding="floor"
+    or "ceil" to snap in one direction.
+    默认取最近的帧边界；rounding="floor" 或 "ceil" 时只向一个方向对齐。
+    """
+    timebase = Timebase(framerate)
+    subtitle._before_mutation()
+    cache = {}
+    for cue in subtitle.cues:
+        # 相邻字幕块的结束和开始时间往往相同，缓存可以省去重复计算
+        for name in ("start", "end"):
+            seconds = getattr(cue, name)
+            snapped = cache.get(seconds)
+            if snapped is None:
+                frame = timebase.seconds_to_frame(seconds, rounding)
+                snapped = cache[seconds] = timebase.frame_to_seconds(frame)
+            setattr(cue, name, snapped)
+    subtitle._recalcluate_duration()
+    return subtitle
+
+
+def convert_framerate(
+    subtitle: Subtitle, source: FramerateLike, target: FramerateLike
+) -> Subtitle:
+    """
+    In-place modification. Retimes a subtitle made for a video at source fps to the
+    same video played at target fps (e.g. PAL 25 -> film 23.976), keeping every cue
+    on the same frame.
+    就地修改。把按 source 帧率制作的字幕转换为以 target 帧率播放的同一视频
+    (例如 PAL 25 -> 电影 23.976)，每个字幕块保持在原来的帧上。
+
+    Frame numbers are computed exactly at the source rate and mapped to the target
+    rate, so times land on target frame boundaries without accumulated drift. For
+    frame-based formats the stored fps is updated as well.
+    帧号按 source 帧率精确计算后映射到 target 帧率，时间落在 target 的帧边界上，
+    不会累积误差。对基于帧的格式，同时更新保存的帧率。
+    """
+    source_timebase = Timebase(source)
+    target_timebase = Timebase(target)
+    subtitle._before_mutation()
+    for cue in subtitle.cues:
+        start_frame = source_timebase.seconds_to_frame(cue.start)
+        end_frame = source_timebase.seconds_to_frame(cue.end)
+        cue.start = target_timebase.frame_to_seconds(start_frame)
+        cue.end = target_timebase.frame_to_seconds(end_frame)
+
+    other_info = subtitle.info.other_info
+    if isinstance(other_info, dict) and "fps" in other_info:
+        # 复制一份，避免修改与其他视图共享的字典
+        subtitle.info.other_info = {**other_info, "fps": plain_framerate(target)}
+    subtitle._recalcluate_duration()
+    return subtitle
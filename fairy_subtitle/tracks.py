@@ -0,0 +1,307 @@
+# fairy_subtitle/tracks.py
+# 多轨字幕：在同一条时间轴上对齐双语 / 多语字幕
+# Multi-track subtitles aligned on a shared timeline (bilingual / multilingual)
+
+import heapq
+from bisect import bisect_right
+from typing import Iterator, NamedTuple, Optional
+
+from .models import Cue, Subtitle
+
+# 一个字幕块至少有这么大比例的时长落在当前分组内才会并入该分组
+# Fraction of a cue's duration that must fall inside a group for the cue to join it
+_MIN_OVERLAP = 0.5
+
+
+class MergedCue(NamedTuple):
+    """Cues of several tracks that overlap in time
+    多个轨道中时间重叠的字幕块"""
+
+    start: float  # Earliest start of the grouped cues
+    end: float  # Latest end of the grouped cues
+    cues: dict  # Track name -> list of Cue objects, in track order
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class _Track:
+    """A track's cues sorted by start time, with the lookup arrays for cue_at()"""
+
+    __slots__ = ("name", "subtitle", "cues", "starts", "max_ends")
+
+    def __init__(self, name: str, subtitle: Subtitle):
+        cues = list(subtitle.cues)
+        # 解析结果通常已经有序，只有无序时才排序
+        if any(cues[i].start > cues[i + 1].start for i in range(len(cues) - 1)):
+            cues.sort(key=lambda cue: cue.start)
+        self.name = name
+        self.subtitle = subtitle
+        self.cues = cues
+        self.starts = [cue.start for cue in cues]
+        # max_ends[i] 为前 i+1 个字幕块的最晚结束时间，用于处理同一轨道内的重叠
+        self.max_ends = []
+        latest = float("-inf")
+        for cue in cues:
+            latest = max(latest, cue.end)
+            self.max_ends.append(latest)
+
+    def cue_at(self, time: float) -> Optional[Cue]:
+        """Returns the latest starting cue with start <= time < end"""
+        i = bisect_right(self.starts, time) - 1
+        while i >= 0 and self.max_ends[i] > time:
+            if self.cues[i].end > time:
+                return self.cues[i]
+            i -= 1
+        return None
+
+
+class SubtitleTrackSet:
+    """
+    Holds several subtitle tracks (e.g. one per language) over a shared timeline.
+    在同一条时间轴上保存多个字幕轨道 (例如每种语言一个)。
+
+    The cues of each track are copied into a sorted list when the track is added,
+    later edits of the Subtitle object require adding the track again.
+    添加轨道时会保存一份排好序的字幕块列表，之后修改 Subtitle 对象需要重新添加该轨道。
+    """
+
+    def __init__(self, tracks: Optional[dict] = None):
+        self._tracks = {}
+        for name, subtitle in (tracks or {}).items():
+            self.add_track(name, subtitle)
+
+    @classmethod
+    def load(cls, files: dict, **kwargs) -> "SubtitleTrackSet":
+        """
+        Loads one subtitle file per track.
+        为每个轨道加载一个字幕文件。
+
+        :param files: Track name -> file path, e.g. {"zh": "a.zh.srt", "en": "a.en.srt"}.
+        :param files: 轨道名称 -> 文件路径，例如 {"zh": "a.zh.srt", "en": "a.en.srt"}。
+        :param kwargs: Passed to SubtitleLoader.load (format, encoding, errors).
+        :param kwargs: 传给 SubtitleLoader.load 的参数 (format, encoding, errors)。
+        """
+        from .subtitle import SubtitleLoader
+
+        return cls(
+            {name: SubtitleLoader.load(path, **kwargs) for name, path in files.items()}
+        )
+
+    def add_track(self, name: str, subtitle: Subtitle) -> "SubtitleTrackSet":
+        """Adds or replaces a track
+        添加或替换一个轨道"""
+        self._tracks[name] = _Track(name, subtitle)
+        return self
+
+    def remove_track(self, name: str) -> "SubtitleTrackSet":
+        """Removes a track
+        删除一个轨道"""
+        del self._tracks[name]
+        return self
+
+    @property
+    def names(self) -> list[str]:
+        """Track names in the order they were added
+        按添加顺序排列的轨道名称"""
+        return list(self._tracks)
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tracks
+
+    def __getitem__(self, name: str) -> Subtitle:
+        return self._tracks[name].subtitle
+
+    def __iter__(self) -> Iterator[MergedCue]:
+        return self.merge()
+
+    def get_duration(self) -> float:
+        """Returns the time span covered by all tracks
+        返回所有轨道覆盖的时长"""
+        tracks = [track for track in self._tracks.values() if track.cues]
+        if not tracks:
+            return 0.0
+        earliest_start = min(track.starts[0] for track in tracks)
+        latest_end = max(track.max_ends[-1] for track in tracks)
+        return latest_end - earliest_start
+
+    def cue_at(self, time: float) -> dict:
+        """
+        Returns the cue shown at the given time in every track (None if there is none).
+        返回每个轨道在指定时间显示的字幕块 (没有则为 None)。
+        """
+        return {name: track.cue_at(time) for name, track in self._tracks.items()}
+
+    def merge(self, min_overlap: float = _MIN_OVERLAP) -> Iterator[MergedCue]:
+        """
+        Groups overlapping cues of all tracks in one k-way sweep over the sorted tracks.
+        对所有有序轨道做一次 k 路归并扫描，将时间重叠的字幕块分为一组。
+
+        A cue joins the current group when at least min_overlap of its duration lies
+        inside the group, so slightly misaligned neighbours are not chained together.
+        字幕块至少有 min_overlap 比例的时长落在当前分组内时才并入该分组，
+        避免首尾略有重叠的相邻字幕被连成一片。
+
+        :param min_overlap: Minimum overlapping fraction of a cue's duration (0 - 1).
+        :param min_overlap: 字幕块时长中重叠部分的最小比例 (0 - 1)。
+        :return: An iterator of MergedCue objects ordered by start time.
+        :return: 按开始时间排序的 MergedCue 对象迭代器。
+        """
+        streams = [
+            _timeline(track_no, track.cues)
+            for track_no, track in enumerate(self._tracks.values())
+        ]
+
+        group = None
+        group_start = group_end = 0.0
+        for start, track_no, _, cue in heapq.merge(*streams):
+            if group is not None:
+                overlap = min(cue.end, group_end) - start
+                if start < group_end and overlap >= min_overlap * (cue.end - start):
+                    group[track_no].append(cue)
+                    group_end = max(group_end, cue.end)
+                    continue
+                yield self._merged_cue(group_start, group_end, group)
+            group = [[] for _ in streams]
+            group[track_no].append(cue)
+            group_start, group_end = start, cue.end
+        if group is not None:
+            yield self._merged_cue(group_start, group_end, group)
+
+    def _merged_cue(self, start: float, end: float, group: list) -> MergedCue:
+        cues = {name: cues for name, cues in zip(self._tracks, group) if cues}
+        return MergedCue(start=start, end=end, cues=cues)
+
+    def to_subtitle(
+        self, separator: str = "\n", min_overlap: float = _MIN_OVERLAP
+    ) -> Subtitle:
+        """
+        Returns a single Subtitle whose cues stack the texts of all tracks.
+        返回一个 Subtitle 对象，每个字幕块按轨道顺序叠放所有轨道的文本。
+        """
+        from .models import SubtitleInfo
+
+        cues = [
+            Cue(
+                start=merged.start,
+                end=merged.end,
+                text=_stacked_text(merged, separator),
+                index=i,
+            )
+            for i, merged in enumerate(self.merge(min_overlap))
+        ]
+        duration = 0.0
+        if cues:
+            duration = max(cue.end for cue in cues) - cues[0].start
+        info = SubtitleInfo(
+            path=None,
+            format="srt",
+            duration=round(duration, 3),
+            size=len(cues),
+        )
+        return Subtitle(cues=cues, info=info)
+
+    def render(
+        self, format: str = "srt", min_overlap: float = _MIN_OVERLAP
+    ) -> Iterator[str]:
+        """
+        Renders the merged tracks chunk by chunk, in a single pass over the tracks.
+        对轨道做一次扫描，逐块渲染合并后的字幕。
+
+        'srt' and 'vtt' stack the texts of all tracks in one cue, 'ass' writes one
+        Dialogue line per track with one style per track.
+        'srt' 和 'vtt' 把所有轨道的文本叠放在同一个字幕块中，
+        'ass' 为每个轨道输出一行 Dialogue，每个轨道使用一个样式。
+
+        :param format: Output format ('srt', 'vtt', 'ass').
+        :param format: 输出格式 ('srt', 'vtt', 'ass')。
+        :return: An iterator of strings, joined they form the whole file.
+        :return: 字符串迭代器，拼接起来即为完整的文件内容。
+        """
+        format = format.lower()
+        merged_cues = self.merge(min_overlap)
+        if format == "srt":
+            from .formats.srt import _format_srt_time
+
+            for i, merged in enumerate(merged_cues, 1):
+                start_time = _format_srt_time(merged.start)
+                end_time = _format_srt_time(merged.end)
+                text = _stacked_text(merged, "\n")
+                yield f"{i}\n{start_time} --> {end_time}\n{text}\n\n"
+        elif format == "vtt":
+            from .formats.vtt import _format_vtt_time
+
+            yield "WEBVTT\n\n"
+            for merged in merged_cues:
+                start_time = _format_vtt_time(merged.start)
+                end_time = _format_vtt_time(merged.end)
+                text = _stacked_text(merged, "\n")
+                yield f"{start_time} --> {end_time}\n{text}\n\n"
+        elif format == "ass":
+            from .formats.ass import _format_ass_time
+
+            yield self._ass_header()
+            for merged in merged_cues:
+                start_time = _format_ass_time(merged.start)
+                end_time = _format_ass_time(merged.end)
+                for name, cues in merged.cues.items():
+                    text = "\\N".join(cue.text for cue in cues).replace("\n", "\\N")
+                    yield f"Dialogue: 0,{start_time},{end_time},{name},,0,0,0,,{text}\n"
+        else:
+            raise ValueError(f"Unsupported format: {format}")
+
+    def _ass_header(self) -> str:
+        """[Script Info] and [V4+ Styles] with one style per track, the first track
+        uses the larger font"""
+        lines = [
+            "[Script Info]",
+            "Title: Merged Subtitle",
+            "ScriptType: v4.00+",
+            "PlayResX: 1920",
+            "PlayResY: 1080",
+            "WrapStyle: 0",
+            "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+        ]
+        for i, name in enumerate(self._tracks):
+            fontsize = 20 if i == 0 else 16
+            lines.append(
+                f"Style: {name},Arial,{fontsize},&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,2,2,10,10,10,1"
+            )
+        lines += [
+            "",
+            "[Events]",
+            "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def save(
+        self, file_path: str, format: str = "srt", min_overlap: float = _MIN_OVERLAP
+    ) -> "SubtitleTrackSet":
+        """
+        Writes the merged tracks to a file without building the whole output in memory.
+        将合并后的字幕写入文件，不在内存中构建完整的输出。
+        """
+        with open(file_path, "w", encoding="utf-8") as f:
+            for chunk in self.render(format, min_overlap):
+                f.write(chunk)
+        return self
+
+
+def _timeline(track_no: int, cues: list) -> Iterator[tuple]:
+    """Sort keys of a sorted track for heapq.merge, ties are broken by track and
+    position so Cue objects are never compared"""
+    for i, cue in enumerate(cues):
+        yield cue.start, track_no, i, cue
+
+
+def _stacked_text(merged: MergedCue, separator: str) -> str:
+    """Texts of all tracks in track order, one track per line group"""
+    return separator.join(
+        "\n".join(cue.text for cue in cues) for cues in merged.cues.values()
+    )
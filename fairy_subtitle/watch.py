@@ -0,0 +1,329 @@
+# fairy_subtitle/watch.py
+# 监视字幕文件，文件保存后只重新解析修改过的字幕块
+# Watch a subtitle file and re-parse only the blocks that changed on each save
+
+import os
+import re
+import time
+from bisect import bisect_left, bisect_right
+from typing import Callable, Iterator, Optional
+
+from .models import Subtitle
+from .registry import get_format
+from .subtitle import SubtitleLoader, _resolve_format, _shift_diagnostics
+
+# 以空行分隔字幕块、且每块可以单独解析的格式
+# Formats made of blank line separated blocks that parse independently
+_BLOCK_FORMATS = ("srt", "vtt", "sbv")
+# 字幕块之间的空行 (可以有多个，可以只含空白字符)
+# Blank lines between blocks (possibly several, possibly whitespace only)
+_BLOCK_SEPARATOR = re.compile(r"\n[ \t\r]*\n(?:[ \t\r]*\n)*")
+_BLANK_LINES = re.compile(r"(?:[ \t\r]*\n)*")
+
+
+class SubtitleWatcher:
+    """
+    Keeps a Subtitle in sync with a file that is being edited.
+    让 Subtitle 对象与正在编辑的文件保持同步。
+
+    The file is polled by modification time and size, no OS specific notification
+    API is needed. On a change the new text is compared with the previous one block
+    by block, only the changed blocks are parsed, and their cues are spliced into
+    the same Subtitle object, so a reload costs time proportional to the edit.
+    Formats that are not block based (ASS, MicroDVD) are fully re-parsed.
+    通过修改时间和文件大小轮询文件，不依赖操作系统的文件通知接口。文件变化时按字幕块
+    比较新旧内容，只解析修改过的字幕块，并把结果替换到同一个 Subtitle 对象中，
+    因此重新加载的开销与修改量成正比。不以字幕块组织的格式 (ASS、MicroDVD) 会完整重新解析。
+
+    Example:
+        watcher = SubtitleWatcher("movie.srt")
+        for subtitle in watcher.watch(interval=0.5):
+            preview(subtitle)
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        format: str = "auto",
+        encoding: str = "utf-8",
+        errors: Optional[str] = None,
+    ):
+        self.file_path = os.path.abspath(file_path)
+        self.requested_format = format  # 完整重新解析时使用，与 SubtitleLoader.load 一致
+        self.encoding = encoding
+        self.errors = errors
+        self._stat = None
+        self._content = ""
+        self._leading = 0
+        self._leading_lines = 0
+        # 每个字幕块在 _content 中的开始、结束位置和解析出的字幕数，整体重新解析时为 None
+        # Start, end and cue count of every block, None when the format is re-parsed
+        self._starts = None
+        self._ends = None
+        self._counts = None
+
+        stat, raw_content = self._read()
+        self.subtitle = SubtitleLoader._parse_content(
+            self.file_path, raw_content, format, errors
+        )
+        self.format = self.subtitle.info.format
+        self._stat = stat
+        self._set_buffer(raw_content)
+
+    def changed(self) -> bool:
+        """Returns whether the file's modification time or size changed
+        返回文件的修改时间或大小是否变化"""
+        try:
+            return _stat_key(os.stat(self.file_path)) != self._stat
+        except FileNotFoundError:
+            # 编辑器保存时可能先删除再重建文件
+            return False
+
+    def poll(self) -> bool:
+        """
+        Reloads the file if it changed.
+        如果文件发生变化则重新加载。
+
+        :return: Whether the subtitle was reloaded.
+        :return: 是否重新加载了字幕。
+        """
+        if not self.changed():
+            return False
+        self.reload()
+        return True
+
+    def watch(
+        self, interval: float = 0.5, stop: Optional[Callable[[], bool]] = None
+    ) -> Iterator[Subtitle]:
+        """
+        Polls the file every interval seconds, yielding the subtitle after each reload.
+        每隔 interval 秒轮询一次文件，每次重新加载后产出字幕对象。
+
+        :param stop: Called before each poll, watching ends when it returns True.
+        :param stop: 每次轮询前调用，返回 True 时结束监视。
+        """
+        while stop is None or not stop():
+            if self.poll():
+                yield self.subtitle
+            time.sleep(interval)
+
+    def reload(self) -> Subtitle:
+        """
+        Reads the file again and updates the subtitle in place.
+        重新读取文件并就地更新字幕。
+        """
+        stat, raw_content = self._read()
+        # 字幕在两次加载之间被直接修改过时，字幕块与字幕的对应关系已失效
+        if self._counts is None or sum(self._counts) != len(self.subtitle.cues):
+            self._replace(raw_content)
+        else:
+            self._splice(raw_content)
+        self._stat = stat
+        return self.subtitle
+
+    def _read(self) -> tuple:
+        with open(self.file_path, "r", encoding=self.encoding) as f:
+            stat = os.fstat(f.fileno())
+            return _stat_key(stat), f.read()
+
+    def _set_buffer(self, raw_content: str):
+        """Remembers the text and, for block formats, the cue count of every block"""
+        self._content = raw_content.strip()
+        self._leading = len(raw_content) - len(raw_content.lstrip())
+        self._leading_lines = raw_content.count("\n", 0, self._leading)
+        self._starts = self._ends = self._counts = None
+        if self.format not in _BLOCK_FORMATS:
+            return
+        blocks = _split_blocks(self._content)
+        _, counts, _ = self._parse_blocks(self._content, blocks)
+        # 逐块解析的结果与整体解析一致时才能增量更新，否则每次都完整重新解析
+        if sum(counts) == len(self.subtitle.cues):
+            self._starts = [offset for offset, _ in blocks]
+            self._ends = [offset + len(block) for offset, block in blocks]
+            self._counts = counts
+
+    def _parse_blocks(self, content: str, blocks: list) -> tuple:
+        """Parses (offset, block) pairs one by one, returns (cues, counts, diagnostics)
+        with the diagnostics positioned in content"""
+        subtitle_format = get_format(self.format)
+        cues = []
+        counts = []
+        diagnostics = []
+        line, line_offset = 0, 0  # 行号按偏移量递增计算
+        for offset, block in blocks:
+            subtitle = subtitle_format.parse(self.file_path, block, self.errors)
+            cues.extend(subtitle.cues)
+            counts.append(len(subtitle.cues))
+            if subtitle.info.diagnostics:
+                line += content.count("\n", line_offset, offset)
+                line_offset = offset
+                diagnostics += _shift_diagnostics(
+                    subtitle.info.diagnostics, offset, line
+                )
+        return cues, counts, diagnostics
+
+    def _replace(self, raw_content: str):
+        """Full re-parse, the Subtitle object is updated in place"""
+        new = SubtitleLoader._parse_content(
+            self.file_path, raw_content, self.requested_format, self.errors
+        )
+        subtitle = self.subtitle
+        subtitle._before_mutation()
+        subtitle.cues[:] = new.cues
+        subtitle.info = new.info
+        self.format = new.info.format
+        self._set_buffer(raw_content)
+
+    def _splice(self, raw_content: str):
+        """Re-parses the blocks between the unchanged head and tail of the file"""
+        content = raw_content.strip()
+        leading = len(raw_content) - len(raw_content.lstrip())
+        leading_lines = raw_content.count("\n", 0, leading)
+        old_content = self._content
+        starts, ends = self._starts, self._ends
+        if content == old_content and leading == self._leading:
+            return
+
+        # 1. 找出新旧内容相同的开头和结尾，只有两者之间的字幕块需要重新解析
+        prefix = _common_prefix(old_content, content)
+        suffix = _common_suffix(old_content, content, prefix)
+        delta = len(content) - len(old_content)
+        # 开头: 与下一块之间的分隔也没有变化的字幕块
+        lo = bisect_right(starts, prefix) - 1
+        # 第一块 (VTT 文件头) 变化或格式识别结果变化时完整重新解析
+        if lo <= 0 or (
+            _resolve_format(content, self.file_path, self.requested_format)
+            != self.format
+        ):
+            self._replace(raw_content)
+            return
+        # 结尾: 与上一块之间的分隔也没有变化的字幕块
+        old_hi = max(bisect_left(ends, len(old_content) - suffix) + 1, lo)
+        old_hi = min(old_hi, len(starts))
+        region_start = starts[lo]
+        region_end = starts[old_hi] + delta if old_hi < len(starts) else len(content)
+        # 修改可能在区域开头插入了空行
+        block_start = _BLANK_LINES.match(content, region_start, region_end).end()
+        blocks = [
+            (block_start + offset, block)
+            for offset, block in _split_blocks(content[block_start:region_end])
+        ]
+        # VTT 的 STYLE / REGION 块保存在 info.other_info 中，它们变化时完整重新解析
+        # VTT STYLE / REGION blocks live in info.other_info, re-parse when they change
+        if self.format == "vtt" and (
+            any(_is_vtt_metadata(block) for _, block in blocks)
+            or any(
+                _is_vtt_metadata(old_content[starts[i] : ends[i]])
+                for i in range(lo, old_hi)
+            )
+        ):
+            self._replace(raw_content)
+            return
+
+        # 2. 只解析修改过的字幕块 (严格模式下出错时抛出异常，字幕保持不变)
+        new_cues, new_counts, new_diagnostics = self._parse_blocks(content, blocks)
+
+        # 3. 替换对应的字幕块
+        subtitle = self.subtitle
+        cues = subtitle.cues
+        start = sum(self._counts[:lo])
+        end = len(cues) - sum(self._counts[old_hi:])
+        subtitle._before_mutation()
+        cues[start:end] = new_cues
+        self._counts[lo:old_hi] = new_counts
+        self._starts = (
+            starts[:lo]
+            + [offset for offset, _ in blocks]
+            + [offset + delta for offset in starts[old_hi:]]
+        )
+        self._ends = (
+            ends[:lo]
+            + [offset + len(block) for offset, block in blocks]
+            + [offset + delta for offset in ends[old_hi:]]
+        )
+
+        if self.format == "srt":
+            # SRT 的序号来自文件中的编号
+            subtitle.info.size = len(cues)
+        elif len(new_cues) == end - start:
+            for i in range(start, end):
+                cues[i].index = i
+        else:
+            subtitle._recalculate_indices(start)
+        subtitle._recalcluate_duration()
+        subtitle.info.duration = round(subtitle.info.duration, 3)
+
+        # 4. 诊断信息: 开头和结尾部分按位置差移动，修改部分使用新结果
+        if subtitle.info.diagnostics or new_diagnostics:
+            old_leading, old_leading_lines = self._leading, self._leading_lines
+            old_tail = region_end - delta
+            tail_line_shift = (
+                content.count("\n", region_start, region_end)
+                - old_content.count("\n", region_start, old_tail)
+                + leading_lines
+                - old_leading_lines
+            )
+            diagnostics = subtitle.info.diagnostics
+            subtitle.info.diagnostics = (
+                _shift_diagnostics(
+                    [d for d in diagnostics if d.offset < old_leading + region_start],
+                    leading - old_leading,
+                    leading_lines - old_leading_lines,
+                )
+                + _shift_diagnostics(new_diagnostics, leading, leading_lines)
+                + _shift_diagnostics(
+                    [d for d in diagnostics if d.offset >= old_leading + old_tail],
+                    delta + leading - old_leading,
+                    tail_line_shift,
+                )
+            )
+
+        self._content = content
+        self._leading = leading
+        self._leading_lines = leading_lines
+
+
+def _stat_key(stat: os.stat_result) -> tuple:
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _common_prefix(a: str, b: str) -> int:
+    """Length of the common prefix, found by binary search over slice comparisons
+    (each comparison is a memcmp, much faster than comparing character by character)"""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a: str, b: str, prefix: int) -> int:
+    """Length of the common suffix that does not overlap the common prefix"""
+    lo, hi = 0, min(len(a), len(b)) - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid : len(a) - lo] == b[len(b) - mid : len(b) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _is_vtt_metadata(block: str) -> bool:
+    """Whether a VTT block is not a cue (STYLE, REGION, NOTE ...)"""
+    return "-->" not in block or block.startswith(("STYLE", "REGION", "NOTE"))
+
+
+def _split_blocks(content: str) -> list:
+    """Splits content into (offset, block) pairs at blank lines"""
+    blocks = []
+    position = 0
+    for match in _BLOCK_SEPARATOR.finditer(content):
+        blocks.append((position, content[position : match.start()]))
+        position = match.end()
+    if position < len(content):
+        blocks.append((position, content[position:]))
+    return blocks
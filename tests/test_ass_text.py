@@ -0,0 +1,155 @@
+# tests/test_ass_text.py
+# ASS 覆盖标签与卡拉 OK 音节：解析结果与逐个音节构造的预期一致，编辑字幕后缓存保持正确
+# ASS override tags and karaoke syllables: parsing matches the syllables a line was
+# built from, and the cache stays correct while the subtitle is edited
+
+import copy
+import os
+import random
+
+import pytest
+
+from fairy_subtitle import SubtitleLoader
+from fairy_subtitle.ass_text import (
+    AssText,
+    Segment,
+    Tag,
+    karaoke_timings,
+    strip_overrides,
+    tokenize_ass,
+)
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), os.pardir, "examples")
+SYLLABLES = ["ka", "ra", "o", "ke", "夜", "空", " ", "la\\Nla", "hi\\h"]
+DECORATIONS = ["", "\\b1", "\\1c&H00FF00&", "\\t(0,200,\\fscx120)", "\\pos(10,20)"]
+
+
+def _subtitle(texts: list) -> Subtitle:
+    cues = [Cue(i * 10.0, i * 10.0 + 8.0, text, i) for i, text in enumerate(texts)]
+    info = SubtitleInfo(path="test.ass", format="ass", duration=0.0, size=len(cues))
+    return Subtitle(cues=cues, info=info)
+
+
+def _karaoke_line(rng: random.Random) -> tuple:
+    """A karaoke line and its (start, end, kind, text) syllables in centiseconds"""
+    parts = []
+    expected = []
+    offset = 0
+    if rng.random() < 0.3:
+        parts.append("intro ")
+    for _ in range(rng.randint(1, 6)):
+        tags = rng.choice(DECORATIONS)
+        if rng.random() < 0.15:
+            offset = rng.randrange(300)
+            tags += f"\\kt{offset}"
+        kind = rng.choice(["k", "K", "kf", "ko"])
+        duration = rng.randrange(0, 120)
+        tags += f"\\{kind}{duration}" + rng.choice(DECORATIONS)
+        text = rng.choice(SYLLABLES)
+        parts.append("{" + tags + "}" + text)
+        if rng.random() < 0.2:
+            # 注释不影响音节 / Comments do not affect syllables
+            parts.append("{note}")
+        expected.append((offset, offset + duration, kind, strip_overrides(text)))
+        offset += duration
+    return "".join(parts), expected
+
+
+def _table_rows(table) -> list:
+    return list(zip(table.cue, table.start, table.end, table.kind, table.text))
+
+
+def _expected_rows(subtitle: Subtitle, lines: list) -> list:
+    rows = []
+    for index, (cue, syllables) in enumerate(zip(subtitle.cues, lines)):
+        for start, end, kind, text in syllables:
+            rows.append(
+                (index, cue.start + start / 100, cue.start + end / 100, kind, text)
+            )
+    return rows
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_karaoke_matches_the_syllables(seed):
+    rng = random.Random(seed)
+    texts = []
+    lines = []
+    for _ in range(50):
+        if rng.random() < 0.2:
+            texts.append("{\\an8}no karaoke here")
+            lines.append([])
+            continue
+        text, syllables = _karaoke_line(rng)
+        texts.append(text)
+        lines.append(syllables)
+    subtitle = _subtitle(texts)
+    assert _table_rows(subtitle.karaoke()) == _expected_rows(subtitle, lines)
+
+
+def test_model_follows_edits():
+    rng = random.Random(9)
+    lines = [_karaoke_line(rng) for _ in range(20)]
+    subtitle = _subtitle([text for text, _ in lines])
+    model = AssText(subtitle)
+    model.karaoke()
+    for step in range(60):
+        choice = rng.random()
+        i = rng.randrange(len(subtitle.cues))
+        if choice < 0.4:
+            subtitle.cues[i].text = _karaoke_line(rng)[0]
+        elif choice < 0.6:
+            subtitle.insert(i, Cue(i * 10.0, i * 10.0 + 1.0, _karaoke_line(rng)[0]))
+        elif choice < 0.8 and len(subtitle.cues) > 1:
+            subtitle.remove(i)
+        else:
+            subtitle.cues[i].start += 1.0
+        if step % 3 == 0:
+            assert model[i % len(subtitle.cues)] == tokenize_ass(
+                subtitle.cues[i % len(subtitle.cues)].text
+            )
+        fresh = karaoke_timings(copy.deepcopy(subtitle))
+        assert _table_rows(model.karaoke()) == _table_rows(fresh)
+    assert len(model) == len(subtitle.cues)
+
+
+def test_tokenize():
+    text = "{\\fscx120\\fs20\\t(0,500,\\clip(1,2,3,4))}a{\\k20}{\\kf30}b{\\pos(1,2)}"
+    assert tokenize_ass(text) == (
+        Segment(
+            (
+                Tag("fscx", ("120",)),
+                Tag("fs", ("20",)),
+                Tag("t", ("0", "500", "\\clip(1,2,3,4)")),
+            ),
+            "a",
+        ),
+        Segment((Tag("k", ("20",)), Tag("kf", ("30",))), "b"),
+        Segment((Tag("pos", ("1", "2")),), ""),
+    )
+    assert tokenize_ass("plain") == (Segment((), "plain"),)
+    assert tokenize_ass("{\\fnArial Bold\\1c&H00FF00&\\r}x")[0].tags == (
+        Tag("fn", ("Arial Bold",)),
+        Tag("1c", ("&H00FF00&",)),
+        Tag("r", ("",)),
+    )
+
+
+def test_strip_overrides():
+    assert strip_overrides("{\\b1}one{comment}\\Ntwo\\hthree") == "one\ntwo\u00a0three"
+    assert strip_overrides("no tags") == "no tags"
+
+
+def test_plain_text_of_the_example():
+    subtitle = SubtitleLoader.load(os.path.join(EXAMPLES, "example.ass"))
+    model = AssText(subtitle)
+    for i, cue in enumerate(subtitle.cues):
+        plain = model.plain_text(i)
+        assert plain == strip_overrides(cue.text)
+    assert len(subtitle.karaoke()) > 0
+
+
+def test_invalid_karaoke_values():
+    table = _subtitle(["{\\k}a{\\kfx}b{\\k1.5}c"]).karaoke()
+    assert list(table.text) == ["a", "b", "c"]
+    assert list(table.end) == [0.0, 0.0, 0.01]
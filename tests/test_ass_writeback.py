@@ -0,0 +1,121 @@
+# tests/test_ass_writeback.py
+# ASS 回写：编辑后的字幕块保留原行的字段，未修改的行和注释按原文输出
+# ASS write-back: edited cues keep the fields of their source rows, untouched rows
+# and comments are written as in the source
+
+import os
+
+import pytest
+
+from fairy_subtitle import SubtitleLoader
+from fairy_subtitle.models import Cue
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), os.pardir, "examples", "example.ass")
+
+SOURCE = """[Script Info]
+ScriptType: v4.00+
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
+Style: Default,Arial,20,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,2,2,10,10,10,1
+Style: Sign,Arial,30,&H00FFFFFF,&H000000FF,&H00000000,&H00000000,0,0,0,0,100,100,0,0,1,2,2,8,10,10,10,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:01.00,0:00:02.00,Default,Alice,0,0,0,,first
+; sign block
+Dialogue: 2,0:00:03.00,0:00:05.00,Sign,Bob,11,12,13,Scroll up;10;20,second
+
+; closing
+Dialogue: 0,0:00:06.00,0:00:07.00,Default,Alice,0,0,0,,third
+"""
+
+SIGN_FIELDS = "2,{start},{end},Sign,Bob,11,12,13,Scroll up;10;20,{text}"
+
+
+@pytest.fixture
+def subtitle(tmp_path):
+    path = tmp_path / "fixture.ass"
+    path.write_text(SOURCE, encoding="utf-8")
+    return SubtitleLoader.load(str(path))
+
+
+def _events(text: str) -> list:
+    body = text.split("[Events]", 1)[1]
+    return body.splitlines()[2:]
+
+
+def test_unchanged_round_trip(subtitle):
+    assert _events(subtitle.to_ass()) == _events(SOURCE)
+
+
+def test_split_keeps_row_fields(subtitle):
+    subtitle.split(1, 4.0)
+    events = _events(subtitle.to_ass())
+    assert events[1] == "; sign block"
+    assert events[2] == "Dialogue: " + SIGN_FIELDS.format(
+        start="0:00:03.00", end="0:00:04.00", text="second"
+    )
+    assert events[3] == "Dialogue: " + SIGN_FIELDS.format(
+        start="0:00:04.00", end="0:00:05.00", text="second"
+    )
+
+
+def test_merge_keeps_first_row_fields_and_comments(subtitle):
+    subtitle.merge(1, 2)
+    events = _events(subtitle.to_ass())
+    assert events == [
+        "Dialogue: 0,0:00:01.00,0:00:02.00,Default,Alice,0,0,0,,first",
+        "; sign block",
+        "Dialogue: "
+        + SIGN_FIELDS.format(start="0:00:03.00", end="0:00:07.00", text="second")
+        + "\\Nthird",
+        "",
+        "; closing",
+    ]
+
+
+def test_insert_uses_previous_row_fields(subtitle):
+    subtitle.insert(2, Cue(5.5, 5.8, "inserted"))
+    events = _events(subtitle.to_ass())
+    assert events[3] == "Dialogue: " + SIGN_FIELDS.format(
+        start="0:00:05.50", end="0:00:05.80", text="inserted"
+    )
+    assert events[4:6] == ["", "; closing"]
+
+
+def test_remove_keeps_lines_before_row(subtitle):
+    subtitle.remove(1)
+    assert _events(subtitle.to_ass()) == [
+        "Dialogue: 0,0:00:01.00,0:00:02.00,Default,Alice,0,0,0,,first",
+        "; sign block",
+        "",
+        "; closing",
+        "Dialogue: 0,0:00:06.00,0:00:07.00,Default,Alice,0,0,0,,third",
+    ]
+
+
+def test_remove_last_row_keeps_comment(subtitle):
+    subtitle.remove(2)
+    events = _events(subtitle.to_ass())
+    assert events[-2:] == ["", "; closing"]
+
+
+def test_example_split_keeps_karaoke_style():
+    subtitle = SubtitleLoader.load(EXAMPLE)
+    subtitle.split(27, 30.0)
+    lines = subtitle.to_ass().splitlines()
+    halves = [line for line in lines if line.startswith("Dialogue: 0,0:00:")]
+    first = next(i for i, line in enumerate(halves) if "0:00:28.00,0:00:30.00" in line)
+    assert halves[first].split(",")[3] == "Karaoke"
+    assert halves[first + 1].startswith("Dialogue: 0,0:00:30.00,0:00:35.00,Karaoke,")
+
+
+def test_written_file_parses_back(subtitle, tmp_path):
+    subtitle.split(1, 4.0).remove(0)
+    path = tmp_path / "out.ass"
+    subtitle.save(str(path))
+    reloaded = SubtitleLoader.load(str(path))
+    assert [(c.start, c.end, c.text) for c in reloaded.cues] == [
+        (c.start, c.end, c.text) for c in subtitle.cues
+    ]
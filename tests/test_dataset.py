@@ -0,0 +1,142 @@
+# tests/test_dataset.py
+# 数据集导出：读回的各行与直接加载字幕文件的结果一致
+# Dataset export: the rows read back match the cues of the loaded files
+
+import random
+
+import pytest
+
+from fairy_subtitle import SubtitleLoader
+from fairy_subtitle.dataset import (
+    CUE_SCHEMA,
+    PAIR_SCHEMA,
+    export_dataset,
+    export_pairs,
+    read_dataset,
+)
+
+
+def _srt(cues: list) -> str:
+    blocks = []
+    for i, (start, end, text) in enumerate(cues):
+        blocks.append(f"{i + 1}\n{_time(start)} --> {_time(end)}\n{text}")
+    return "\n\n".join(blocks) + "\n"
+
+
+def _time(ms: int) -> str:
+    seconds, ms = divmod(ms, 1000)
+    return f"00:{seconds // 60:02d}:{seconds % 60:02d},{ms:03d}"
+
+
+def _write(path, cues: list) -> str:
+    path.write_text(_srt(cues), encoding="utf-8")
+    return str(path)
+
+
+def _rows(path: str) -> list:
+    return [row for batch in read_dataset(path) for row in batch.to_pylist()]
+
+
+def test_cue_rows_match_loaded_files(tmp_path):
+    rng = random.Random(5)
+    words = ["hello", "世界", "naïve", "line", "été", ""]
+    paths = []
+    for n in range(7):
+        cues = []
+        for i in range(rng.randint(0, 40)):
+            start = i * 2000 + rng.randrange(1000)
+            text = " ".join(rng.choice(words) for _ in range(3)).strip() or "x"
+            cues.append((start, start + 900, text))
+        paths.append(_write(tmp_path / f"episode{n}.srt", cues))
+
+    output = str(tmp_path / "cues.fsd")
+    report = export_dataset(
+        paths,
+        output,
+        language=lambda path: "en" if path.endswith("0.srt") else "zh",
+        row_group_size=16,
+        workers=2,
+    )
+    expected = []
+    for path in paths:
+        subtitle = SubtitleLoader.load(path)
+        for i, cue in enumerate(subtitle.cues):
+            expected.append(
+                {
+                    "file": path,
+                    "index": i,
+                    "start_ms": round(cue.start * 1000),
+                    "end_ms": round(cue.end * 1000),
+                    "text": cue.text,
+                    "language": "en" if path.endswith("0.srt") else "zh",
+                    "format": "srt",
+                }
+            )
+    assert _rows(output) == expected
+    assert report.files == len(paths)
+    assert report.rows == len(expected)
+    assert report.row_groups == -(-len(expected) // 16)
+    assert report.failures == []
+
+    batches = list(read_dataset(output))
+    assert all(len(batch) == 16 for batch in batches[:-1])
+    assert list(batches[0].columns) == [name for name, _ in CUE_SCHEMA]
+
+
+def test_failures_are_reported(tmp_path):
+    good = _write(tmp_path / "good.srt", [(0, 1000, "good")])
+    bad = tmp_path / "bad.srt"
+    bad.write_text("1\n00:00:0x,000 --> 00:00:01,000\nbroken\n", encoding="utf-8")
+    missing = str(tmp_path / "missing.srt")
+    output = str(tmp_path / "cues.fsd")
+    report = export_dataset([good, str(bad), missing], output, workers=1)
+    assert [path for path, _ in report.failures] == [str(bad), missing]
+    assert report.files == 1
+    assert [row["text"] for row in _rows(output)] == ["good"]
+
+
+def test_empty_export(tmp_path):
+    output = str(tmp_path / "empty.fsd")
+    report = export_dataset([], output, workers=1)
+    assert report == (0, 0, 0, [])
+    assert _rows(output) == []
+
+
+def test_pairs_are_aligned_by_time(tmp_path):
+    source = _write(
+        tmp_path / "en.srt",
+        [(0, 1000, "Hello"), (2000, 3000, "Goodbye"), (8000, 9000, "Only here")],
+    )
+    target = _write(
+        tmp_path / "zh.srt",
+        [(100, 1100, "你好"), (2000, 2500, "再"), (2500, 3000, "见")],
+    )
+    output = str(tmp_path / "pairs.fsd")
+    report = export_pairs([(source, target)], output, ("en", "zh"), workers=1)
+    rows = _rows(output)
+    assert report.rows == len(rows) == 2
+    assert list(rows[0]) == [name for name, _ in PAIR_SCHEMA]
+    assert [(row["source_text"], row["target_text"]) for row in rows] == [
+        ("Hello", "你好"),
+        ("Goodbye", "再\n见"),
+    ]
+    assert [(row["start_ms"], row["end_ms"]) for row in rows] == [
+        (0, 1100),
+        (2000, 3000),
+    ]
+    assert {row["source_language"] for row in rows} == {"en"}
+    assert {row["target_language"] for row in rows} == {"zh"}
+    assert [row["index"] for row in rows] == [0, 1]
+
+
+def test_invalid_row_group_size(tmp_path):
+    with pytest.raises(ValueError):
+        export_dataset([], str(tmp_path / "x.fsd"), row_group_size=0)
+
+
+def test_parquet_round_trip(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = _write(tmp_path / "a.srt", [(0, 1000, "one"), (1000, 2000, "two")])
+    output = str(tmp_path / "cues.parquet")
+    export_dataset([path], output, row_group_size=1, workers=1)
+    assert [row["text"] for row in _rows(output)] == ["one", "two"]
@@ -0,0 +1,100 @@
+# tests/test_diff.py
+# 差异与补丁：对旧字幕应用 diff 的结果得到新字幕
+# Diff and patch: applying the diff of two subtitles to the old one gives the new one
+
+import copy
+import random
+
+import pytest
+
+from fairy_subtitle.diff import INSERT, MERGE, REMOVE, RETEXT, RETIME, SPLIT, Edit
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+
+
+def _subtitle(cues: list) -> Subtitle:
+    for i, cue in enumerate(cues):
+        cue.index = i
+    info = SubtitleInfo(path="test.srt", format="srt", duration=0.0, size=len(cues))
+    subtitle = Subtitle(cues=cues, info=info)
+    subtitle._recalcluate_duration()
+    return subtitle
+
+
+def _numbered(count: int) -> Subtitle:
+    return _subtitle([Cue(i * 3.0, i * 3.0 + 2.0, f"line {i}") for i in range(count)])
+
+
+def _state(subtitle: Subtitle) -> list:
+    return [(cue.start, cue.end, cue.text, cue.index) for cue in subtitle.cues]
+
+
+def _round_trip(old: Subtitle, new: Subtitle) -> list:
+    edits = old.diff(new)
+    patched = copy.deepcopy(old).apply_patch(edits)
+    assert _state(patched) == _state(new)
+    assert patched.info.size == len(new.cues)
+    assert patched.info.duration == new.info.duration
+    return edits
+
+
+def test_identical_subtitles():
+    assert _numbered(20).diff(_numbered(20)) == []
+
+
+@pytest.mark.parametrize(
+    "edit, op",
+    [
+        (lambda s: s.merge(4, 5), MERGE),
+        (lambda s: s.split(4, 13.0), SPLIT),
+        (lambda s: s.remove(4), REMOVE),
+        (lambda s: s.insert(4, Cue(10.5, 11.5, "new")), INSERT),
+        (lambda s: setattr(s.cues[4], "text", "changed"), RETEXT),
+        (lambda s: setattr(s.cues[4], "end", 13.5), RETIME),
+    ],
+)
+def test_single_edits(edit, op):
+    old = _numbered(10)
+    new = _numbered(10)
+    edit(new)
+    edits = _round_trip(old, new)
+    assert [e.op for e in edits] == [op]
+    assert edits[0].index == 4
+
+
+def test_random_edits_round_trip():
+    rng = random.Random(7)
+    for _ in range(30):
+        old = _numbered(rng.randint(0, 60))
+        new = copy.deepcopy(old)
+        for _ in range(rng.randint(1, 8)):
+            count = len(new.cues)
+            choice = rng.random()
+            if count >= 2 and choice < 0.2:
+                i = rng.randrange(count - 1)
+                new.merge(i, i + 1)
+            elif count and choice < 0.4:
+                cue = new.cues[rng.randrange(count)]
+                new.split(cue.index, (cue.start + cue.end) / 2)
+            elif count and choice < 0.6:
+                new.remove(rng.randrange(count))
+            elif choice < 0.8:
+                start = rng.uniform(0, 200)
+                new.insert(rng.randint(0, count), Cue(start, start + 1, "inserted"))
+            elif count:
+                new.cues[rng.randrange(count)].text += " (edited)"
+        new._recalcluate_duration()
+        _round_trip(old, new)
+
+
+def test_invalid_edit_keeps_indices_consistent():
+    subtitle = _numbered(5)
+    edits = [Edit(REMOVE, 1), Edit(REMOVE, 10)]
+    with pytest.raises(IndexError):
+        subtitle.apply_patch(edits)
+    assert [cue.index for cue in subtitle] == [0, 1, 2, 3]
+    assert subtitle.info.size == 4
+
+
+def test_split_outside_the_cue():
+    with pytest.raises(ValueError):
+        _numbered(3).apply_patch([Edit(SPLIT, 0, start=5.0)])
@@ -0,0 +1,89 @@
+# tests/test_error_policies.py
+# 错误策略：每个解析器在 strict / lenient / collect 下处理同一个无效字幕块
+# Error policies: every parser handles an invalid block under strict, lenient and
+# collect, and reports where it starts
+
+import pytest
+
+from fairy_subtitle import SubtitleLoader
+from fairy_subtitle.diagnostics import COLLECT, LENIENT, STRICT, Diagnostic
+from fairy_subtitle.exceptions import ParseError
+from fairy_subtitle.registry import get_format
+
+# 每种格式: 内容 (第二个字幕块无效)、无效字幕块开头的文本
+# Per format: content whose second block is invalid, and the text it starts with
+CASES = {
+    "srt": (
+        "1\n00:00:01,000 --> 00:00:02,000\nfirst\n\n"
+        "2\n00:00:0x,000 --> 00:00:04,000\nbad\n\n"
+        "3\n00:00:05,000 --> 00:00:06,000\nthird\n",
+        "2\n00:00:0x",
+    ),
+    "vtt": (
+        "WEBVTT\n\n00:01.000 --> 00:02.000\nfirst\n\n"
+        "00:0x.000 --> 00:04.000\nbad\n\n"
+        "00:05.000 --> 00:06.000\nthird\n",
+        "00:0x",
+    ),
+    "sbv": (
+        "0:00:01.000,0:00:02.000\nfirst\n\n"
+        "0:00:0x.000,0:00:04.000\nbad\n\n"
+        "0:00:05.000,0:00:06.000\nthird\n",
+        "0:00:0x",
+    ),
+    "ass": (
+        "[Script Info]\nScriptType: v4.00+\n\n[Events]\n"
+        "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n"
+        "Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,first\n"
+        "Dialogue: 0,0:00:0x.00,0:00:04.00,Default,,0,0,0,,bad\n"
+        "Dialogue: 0,0:00:05.00,0:00:06.00,Default,,0,0,0,,third\n",
+        "Dialogue: 0,0:00:0x",
+    ),
+    "sub": (
+        # 帧号过大，无法转换为秒数 / A frame number too large to convert to seconds
+        "{1}{1}25\n{25}{50}first\n{75}{1" + "0" * 400 + "}bad\n{125}{150}third\n",
+        "{75}",
+    ),
+}
+
+
+@pytest.mark.parametrize("policy", [STRICT, LENIENT, COLLECT])
+@pytest.mark.parametrize("name", list(CASES))
+def test_invalid_block(name, policy):
+    content, bad_start = CASES[name]
+    fmt = get_format(name)
+    if policy == STRICT:
+        with pytest.raises(ParseError):
+            fmt.parse(f"test.{name}", content, policy)
+        return
+
+    subtitle = fmt.parse(f"test.{name}", content, policy)
+    assert [cue.text for cue in subtitle] == ["first", "third"]
+    assert subtitle.info.size == 2
+    if policy == LENIENT:
+        assert subtitle.info.diagnostics == []
+        return
+
+    (diagnostic,) = subtitle.info.diagnostics
+    assert isinstance(diagnostic, Diagnostic)
+    offset = content.index(bad_start)
+    assert diagnostic.offset == offset
+    assert diagnostic.line == content.count("\n", 0, offset) + 1
+    assert diagnostic.reason
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        get_format("srt").parse("test.srt", CASES["srt"][0], "ignore")
+
+
+def test_diagnostics_point_into_the_file(tmp_path):
+    content, bad_start = CASES["srt"]
+    raw = "\n\n  \n" + content
+    path = tmp_path / "padded.srt"
+    path.write_text(raw, encoding="utf-8")
+    subtitle = SubtitleLoader.load(str(path), errors=COLLECT)
+    (diagnostic,) = subtitle.get_diagnostics()
+    offset = raw.index(bad_start)
+    assert diagnostic.offset == offset
+    assert diagnostic.line == raw.count("\n", 0, offset) + 1
@@ -0,0 +1,103 @@
+# tests/test_history.py
+# 快照与撤销：恢复快照后字幕块和字幕信息 (包括 other_info) 都回到快照时的状态
+# Snapshots and undo: restoring a snapshot brings back the cues and the whole
+# information, other_info included
+
+import os
+
+from fairy_subtitle import SubtitleLoader
+from fairy_subtitle.history import CHUNK_SIZE
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), os.pardir, "examples")
+
+
+def _subtitle(count: int) -> Subtitle:
+    cues = [Cue(i * 2.0, i * 2.0 + 1.5, f"line {i}", i) for i in range(count)]
+    info = SubtitleInfo(
+        path="test.srt", format="srt", duration=count * 2.0 - 0.5, size=count
+    )
+    return Subtitle(cues=cues, info=info)
+
+
+def _state(subtitle: Subtitle) -> list:
+    return [(cue.start, cue.end, cue.text, cue.index) for cue in subtitle.cues]
+
+
+def test_restore_undoes_edits():
+    subtitle = _subtitle(1000)
+    before = _state(subtitle)
+    snapshot = subtitle.snapshot()
+    subtitle.merge(10, 12).split(500, 1005.0).remove(900).shift(3)
+    subtitle.restore(snapshot)
+    assert _state(subtitle) == before
+    assert subtitle.info.size == 1000
+    assert subtitle.info.duration == 1999.5
+
+
+def test_snapshot_is_immutable():
+    subtitle = _subtitle(10)
+    snapshot = subtitle.snapshot()
+    snapshot[0].text = "changed"
+    subtitle.cues[1].text = "changed"
+    snapshot.info.diagnostics.append("note")
+    assert snapshot[0].text == "line 0"
+    assert snapshot[1].text == "line 1"
+    assert snapshot.info.diagnostics == []
+
+
+def test_restore_twice():
+    subtitle = _subtitle(10)
+    snapshot = subtitle.snapshot()
+    subtitle.remove(0)
+    subtitle.restore(snapshot)
+    subtitle.cues[0].text = "changed"
+    subtitle.restore(snapshot)
+    assert subtitle.cues[0].text == "line 0"
+
+
+def test_local_edit_shares_chunks():
+    subtitle = _subtitle(CHUNK_SIZE * 8)
+    first = subtitle.snapshot()
+    subtitle.merge(CHUNK_SIZE * 4, CHUNK_SIZE * 4 + 1)
+    second = subtitle.snapshot()
+    shared = {id(chunk) for chunk in first._chunks} & {
+        id(chunk) for chunk in second._chunks
+    }
+    assert len(shared) >= 6
+    assert [cue.index for cue in second] == list(range(len(second)))
+
+
+def test_verify_sees_direct_changes():
+    subtitle = _subtitle(CHUNK_SIZE * 2)
+    subtitle.snapshot()
+    subtitle.cues[5].text = "direct"
+    assert subtitle.snapshot()[5].text == "line 5"  # not tracked without verify
+    subtitle.cues[6].text = "direct"
+    assert subtitle.snapshot(verify=True)[6].text == "direct"
+
+
+def test_undo_restores_ass_header_and_styles():
+    subtitle = SubtitleLoader.load(os.path.join(EXAMPLES, "example.ass"))
+    before = subtitle.to_ass()
+    snapshot = subtitle.snapshot()
+
+    ass_info = subtitle.info.other_info
+    ass_info.script_Info["Title"] = "changed"
+    ass_info.v4_Styles["Default"][1] = "Comic Sans"
+    ass_info.rows[0].fields[3] = "Title"
+    assert subtitle.to_ass() != before
+
+    subtitle.restore(snapshot)
+    assert subtitle.to_ass() == before
+    assert snapshot.info.other_info.script_Info["Title"] == "综合测试字幕"
+
+
+def test_snapshot_info_is_not_shared_with_subtitle():
+    subtitle = SubtitleLoader.load(os.path.join(EXAMPLES, "example.vtt"))
+    snapshot = subtitle.snapshot()
+    subtitle.info.other_info.styles.append("::cue { color: red }")
+    restored = snapshot.to_subtitle()
+    assert restored.info.other_info.styles == []
+    restored.info.other_info.styles.append("::cue { color: blue }")
+    assert snapshot.info.other_info.styles == []
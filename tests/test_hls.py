@@ -0,0 +1,125 @@
+# tests/test_hls.py
+# HLS 分段：每个分段包含与它重叠的全部字幕块，播放列表覆盖整个媒体时长
+# HLS segments: every segment holds all the cues overlapping it, and the playlist
+# covers the whole media
+
+import os
+import random
+
+import pytest
+
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+from fairy_subtitle.registry import get_format
+
+
+def _subtitle(cues: list) -> Subtitle:
+    for i, cue in enumerate(cues):
+        cue.index = i
+    info = SubtitleInfo(path="test.vtt", format="vtt", duration=0.0, size=len(cues))
+    return Subtitle(cues=cues, info=info)
+
+
+def _random_subtitle(seed: int, count: int = 120) -> Subtitle:
+    rng = random.Random(seed)
+    cues = []
+    for i in range(count):
+        start = rng.randrange(0, 12000) / 100
+        end = start + rng.choice([0, 100, 250, 600, 1300]) / 100
+        cues.append(Cue(start, end, f"cue {i}"))
+    return _subtitle(cues)
+
+
+def _read(out_dir: str, file_name: str) -> tuple:
+    with open(os.path.join(out_dir, file_name), encoding="utf-8") as f:
+        content = f.read()
+    subtitle = get_format("vtt").parse(file_name, content)
+    return content, [cue.text for cue in subtitle.cues]
+
+
+def _playlist(out_dir: str) -> list:
+    with open(os.path.join(out_dir, "index.m3u8"), encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+@pytest.mark.parametrize("duration", [2.5, 6.0, 10.0])
+@pytest.mark.parametrize("seed", range(3))
+def test_segments_hold_overlapping_cues(seed, duration, tmp_path):
+    subtitle = _random_subtitle(seed)
+    out_dir = str(tmp_path)
+    segments = subtitle.segment(duration, out_dir, mpegts=900000)
+    total = max(cue.end for cue in subtitle.cues)
+    assert sum(s.duration for s in segments) == pytest.approx(total)
+    assert all(0 < s.duration <= duration for s in segments)
+
+    placed = set()
+    for k, s in enumerate(segments):
+        start, end = k * duration, (k + 1) * duration
+        assert s.start == start
+        expected = [
+            cue.text
+            for cue in sorted(subtitle.cues, key=lambda cue: cue.start)
+            if cue.start < end and (cue.end > start or cue.start >= start)
+        ]
+        content, texts = _read(out_dir, s.file_name)
+        assert content.startswith(
+            "WEBVTT\nX-TIMESTAMP-MAP=MPEGTS:900000,LOCAL:00:00:00.000\n"
+        )
+        assert texts == expected
+        assert s.cues == len(expected)
+        placed.update(texts)
+    # 每个字幕块至少出现在一个分段中 / Every cue lands in at least one segment
+    assert placed == {cue.text for cue in subtitle.cues}
+
+
+def test_playlist(tmp_path):
+    subtitle = _subtitle([Cue(1.0, 2.0, "a"), Cue(13.0, 14.5, "b")])
+    segments = subtitle.segment(6.0, str(tmp_path), name="part{}.vtt")
+    assert [(s.file_name, s.start, s.duration, s.cues) for s in segments] == [
+        ("part0.vtt", 0.0, 6.0, 1),
+        ("part1.vtt", 6.0, 6.0, 0),
+        ("part2.vtt", 12.0, 2.5, 1),
+    ]
+    assert _playlist(str(tmp_path)) == [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        "#EXT-X-TARGETDURATION:6",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+        "#EXTINF:6.000,",
+        "part0.vtt",
+        "#EXTINF:6.000,",
+        "part1.vtt",
+        "#EXTINF:2.500,",
+        "part2.vtt",
+        "#EXT-X-ENDLIST",
+    ]
+    # 空分段也会写入 / Empty segments are still written
+    assert _read(str(tmp_path), "part1.vtt")[1] == []
+
+
+def test_live_playlist_and_total(tmp_path):
+    subtitle = _subtitle([Cue(1.0, 2.0, "a")])
+    segments = subtitle.segment(4.0, str(tmp_path), total=10.0, live=True)
+    assert [s.duration for s in segments] == [4.0, 4.0, 2.0]
+    lines = _playlist(str(tmp_path))
+    assert "#EXT-X-ENDLIST" not in lines
+    assert "#EXT-X-PLAYLIST-TYPE:VOD" not in lines
+
+
+def test_cue_spanning_boundaries_keeps_its_timing(tmp_path):
+    subtitle = _subtitle([Cue(3.0, 9.0, "long")])
+    segments = subtitle.segment(2.0, str(tmp_path))
+    assert [s.cues for s in segments] == [0, 1, 1, 1, 1]
+    content = _read(str(tmp_path), segments[3].file_name)[0]
+    assert "00:00:03.000 --> 00:00:09.000" in content
+
+
+def test_empty_subtitle(tmp_path):
+    segments = _subtitle([]).segment(6.0, str(tmp_path))
+    assert [(s.duration, s.cues) for s in segments] == [(0.0, 0)]
+    assert "#EXT-X-TARGETDURATION:6" in _playlist(str(tmp_path))
+
+
+def test_invalid_duration(tmp_path):
+    with pytest.raises(ValueError):
+        _subtitle([]).segment(0, str(tmp_path))
@@ -0,0 +1,48 @@
+# tests/test_import_time.py
+# import fairy_subtitle 必须保持轻量：不加载任何解析器，冷启动耗时不超过预算
+# import fairy_subtitle must stay light: no parser is loaded and the cold import
+# stays under a fixed budget
+
+import os
+import subprocess
+import sys
+
+# 冷启动导入 fairy_subtitle 的累计耗时上限 (微秒)，本地测得约 0.6 ms，留出 CI 的波动余量
+# Budget for the cumulative cold import time of fairy_subtitle in microseconds;
+# it measures about 0.6 ms locally, the rest is headroom for slow CI machines
+IMPORT_BUDGET_US = 50_000
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+
+def _importtime() -> dict:
+    """Module name -> cumulative import time in microseconds, from -X importtime"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import fairy_subtitle"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return modules
+
+
+def test_import_does_not_load_formats():
+    modules = _importtime()
+    assert "fairy_subtitle" in modules
+    loaded = [name for name in modules if name.startswith("fairy_subtitle.formats")]
+    assert loaded == []
+
+
+def test_import_time_under_budget():
+    modules = _importtime()
+    assert modules["fairy_subtitle"] < IMPORT_BUDGET_US
@@ -0,0 +1,161 @@
+# tests/test_live.py
+# 直播字幕：分块输入的结果与一次解析整个文件相同，窗口和查找与逐个检查的结果一致
+# Live captions: chunked input parses like the whole file, and the window and lookups
+# match a brute-force check
+
+import io
+import random
+
+import pytest
+
+from fairy_subtitle.diagnostics import COLLECT, STRICT
+from fairy_subtitle.exceptions import ParseError
+from fairy_subtitle.live import LiveSubtitle
+from fairy_subtitle.models import Cue
+from fairy_subtitle.registry import get_format
+
+
+def _stream(name: str, count: int, rng: random.Random) -> str:
+    blocks = ["WEBVTT"] if name == "vtt" else []
+    separator = "," if name == "srt" else "."
+    for i in range(count):
+        start = i * 2
+        time = f"00:{start // 60:02d}:{start % 60:02d}"
+        if rng.random() < 0.1:
+            time = "00:00:0x"
+        if name == "vtt" and rng.random() < 0.1:
+            blocks.append(f"NOTE comment {i}")
+        cue_id = f"{i + 1}\n" if name == "srt" else ""
+        lines = "\n".join(f"line {i}.{k}" for k in range(rng.randint(1, 2)))
+        blocks.append(
+            f"{cue_id}{time}{separator}000 --> {time}{separator}900\n{lines}"
+        )
+    separators = ["\n\n", "\n\n\n", "\n \n", "\n\t\n"]
+    content = "".join(block + rng.choice(separators) for block in blocks)
+    if rng.random() < 0.5:
+        content = content.replace("\n", "\r\n")
+    return content
+
+
+def _chunks(content: str, rng: random.Random) -> list:
+    chunks = []
+    position = 0
+    while position < len(content):
+        size = rng.choice([1, 2, 3, 7, 50, 400])
+        chunks.append(content[position : position + size])
+        position += size
+    return chunks
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("name", ["srt", "vtt"])
+def test_chunked_feed_matches_full_parse(name, seed):
+    rng = random.Random(seed)
+    content = _stream(name, 60, rng)
+    live = LiveSubtitle(window=10**6, errors=COLLECT)
+    appended = []
+    for chunk in _chunks(content, rng):
+        appended += live.feed(chunk)
+    appended += live.close()
+
+    # 加载文件时换行符已统一为 \n / Loading a file already folds \r\n into \n
+    expected = get_format(name).parse(
+        f"test.{name}", content.replace("\r\n", "\n"), COLLECT
+    )
+    assert live.format == name
+    assert [(c.start, c.end, c.text) for c in live] == [
+        (c.start, c.end, c.text) for c in expected.cues
+    ]
+    assert [cue.index for cue in appended] == list(range(len(appended)))
+    diagnostics = expected.info.diagnostics
+    assert [d.line for d in live.diagnostics] == [d.line for d in diagnostics]
+    # 位置指向输入文本中无效字幕块的第一行 / Offsets point at the first line of
+    # the invalid block in the text as fed
+    for d in live.diagnostics:
+        assert content[d.offset - 1] == "\n" and not content[d.offset].isspace()
+        assert "00:00:0x" in "".join(content[d.offset :].split("\n", 2)[:2])
+    if "\r" not in content:
+        assert [d.offset for d in live.diagnostics] == [d.offset for d in diagnostics]
+
+
+def test_window_eviction_and_lookup():
+    rng = random.Random(3)
+    live = LiveSubtitle(window=30.0)
+    cues = []
+    start = 0.0
+    for _ in range(2000):
+        start += rng.choice([0.0, 0.5, 1.0, 2.0])
+        cue = Cue(start, start + rng.choice([0.5, 2.0, 6.0, 40.0]), "x")
+        cues.append(cue)
+        cue_id = live.append(cue)
+        assert cue_id == len(cues) - 1 == live.last_id
+
+        kept = cues[live.first_id :]
+        assert list(live) == kept
+        # 最旧的字幕块仍在窗口内 / The oldest cue kept is still inside the window
+        assert kept[0].end > live.now - live.window
+        assert all(cue.end <= live.now - live.window for cue in cues[: live.first_id])
+        for time in (start, start + 0.25, start - 1.0, start - 20.0):
+            assert live.active(time) == [c for c in kept if c.start <= time < c.end]
+
+    first = live.first_id
+    assert live.get(first) is cues[first]
+    assert live[-1] is cues[-1]
+    assert first in live and first - 1 not in live
+    with pytest.raises(KeyError):
+        live.get(first - 1)
+    with pytest.raises(KeyError):
+        live.get(len(cues))
+    with pytest.raises(IndexError):
+        live[len(live)]
+
+
+def test_max_cues():
+    live = LiveSubtitle(window=10**6, max_cues=5)
+    for i in range(12):
+        live.append(Cue(float(i), i + 1.0, f"cue {i}"))
+    assert [cue.index for cue in live] == [7, 8, 9, 10, 11]
+    assert live.first_id == 7
+
+
+def test_to_subtitle():
+    live = LiveSubtitle(window=3.0, format="vtt")
+    for i in range(6):
+        live.append(Cue(i * 2.0, i * 2.0 + 1.5, f"cue {i}"))
+    subtitle = live.to_subtitle()
+    assert [(cue.index, cue.text) for cue in subtitle] == [(0, "cue 4"), (1, "cue 5")]
+    assert subtitle.info.format == "vtt"
+    assert subtitle.info.duration == 3.5
+    # 副本不影响直播字幕 / Copies leave the live cues alone
+    assert live[0].index == 4
+
+
+def test_strict_feed_raises():
+    live = LiveSubtitle(errors=STRICT)
+    with pytest.raises(ParseError):
+        live.feed("1\n00:00:0x,000 --> 00:00:01,000\nbad\n\n")
+
+
+def test_bom_and_follow():
+    content = "\ufeff1\n00:00:01,000 --> 00:00:02,000\nfirst\n\n"
+    live = LiveSubtitle()
+    stream = io.StringIO(content)
+    calls = []
+
+    def stop():
+        calls.append(None)
+        return len(calls) > 1
+
+    assert [cue.text for cue in live.follow(stream, interval=0, stop=stop)] == [
+        "first"
+    ]
+    assert live.format == "srt"
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        LiveSubtitle(window=0)
+    with pytest.raises(ValueError):
+        LiveSubtitle(format="ass")
+    with pytest.raises(ValueError):
+        LiveSubtitle(errors="ignore")
@@ -0,0 +1,39 @@
+# tests/test_profiling.py
+# 加载统计：每种格式的解析器都报告 scan 和 build 阶段
+# Load profiling: every format parser reports its scan and build stages
+
+import os
+import threading
+
+import pytest
+
+from fairy_subtitle import SubtitleLoader, profile
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), os.pardir, "examples")
+
+
+@pytest.mark.parametrize("extension", ["srt", "vtt", "ass", "sbv", "sub"])
+def test_parsers_report_scan_and_build(extension):
+    path = os.path.join(EXAMPLES, f"example.{extension}")
+    with profile() as profiler:
+        subtitle = SubtitleLoader.load(path)
+    names = [stats.name for stats in profiler.stages]
+    assert names == ["read", "detect", "scan", "build", "parse"]
+    stages = {stats.name: stats for stats in profiler.stages}
+    assert stages["build"].cues == len(subtitle.cues)
+    assert stages["scan"].size > 0
+    assert stages["parse"].path == os.path.abspath(path)
+
+
+def test_profilers_are_per_thread():
+    path = os.path.join(EXAMPLES, "example.srt")
+    seen = []
+
+    def load_unprofiled():
+        SubtitleLoader.load(path)
+
+    with profile(callback=seen.append) as profiler:
+        thread = threading.Thread(target=load_unprofiled)
+        thread.start()
+        thread.join()
+    assert profiler.stages == seen == []
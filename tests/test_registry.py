@@ -0,0 +1,138 @@
+# tests/test_registry.py
+# 格式注册表：内置格式的识别与能力，第三方格式的注册、替换和延迟导入
+# Format registry: detection and capabilities of the built-in formats, registering,
+# replacing and lazily importing third-party formats
+
+import os
+import sys
+
+import pytest
+
+from fairy_subtitle import SubtitleLoader, registry
+from fairy_subtitle.exceptions import UnsupportedFormatError
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+from fairy_subtitle.registry import (
+    CAP_CUE_SETTINGS,
+    CAP_FRAME_BASED,
+    CAP_STYLES,
+    SubtitleFormat,
+    detect_format,
+    get_format,
+    list_formats,
+    register_format,
+)
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), os.pardir, "examples")
+BUILT_IN = ["srt", "vtt", "ass", "sbv", "sub"]
+
+
+@pytest.fixture
+def clean_registry():
+    """Restores the registry after a test registers formats"""
+    formats = dict(registry._formats)
+    extensions = dict(registry._extensions)
+    yield
+    registry._formats.clear()
+    registry._formats.update(formats)
+    registry._extensions.clear()
+    registry._extensions.update(extensions)
+    registry._detector = None
+
+
+def parse_lines(file_path, content, errors="strict"):
+    cues = [
+        Cue(float(i), float(i) + 0.5, line, i)
+        for i, line in enumerate(content.split("\n")[1:])
+    ]
+    info = SubtitleInfo(path=file_path, format="lines", duration=0.0, size=len(cues))
+    return Subtitle(cues=cues, info=info)
+
+
+def write_lines(subtitle):
+    return "LINES\n" + "\n".join(cue.text for cue in subtitle.cues)
+
+
+def test_built_in_formats_are_registered():
+    assert set(BUILT_IN) <= set(list_formats())
+
+
+@pytest.mark.parametrize("name", BUILT_IN)
+def test_examples_are_detected_from_content(name):
+    with open(os.path.join(EXAMPLES, f"example.{name}"), encoding="utf-8") as f:
+        content = f.read().strip()
+    assert detect_format(content) == name
+    assert detect_format("\ufeff" + content) == name
+
+
+def test_extension_is_the_last_resort():
+    assert detect_format("nothing recognisable", "movie.SBV") == "sbv"
+    assert detect_format("nothing recognisable", "movie.txt") is None
+
+
+@pytest.mark.parametrize(
+    "name, capability",
+    [("vtt", CAP_CUE_SETTINGS), ("ass", CAP_STYLES), ("sub", CAP_FRAME_BASED)],
+)
+def test_capabilities(name, capability):
+    assert get_format(name).supports(capability)
+    assert not get_format("srt").supports(capability)
+
+
+def test_stream_and_write_support():
+    assert get_format("srt").can_stream and get_format("srt").can_write
+    assert not get_format("ass").can_stream
+    with pytest.raises(UnsupportedFormatError):
+        get_format("sub").iter_cues([])
+
+
+def test_unknown_format():
+    with pytest.raises(UnsupportedFormatError):
+        get_format("no-such-format")
+
+
+def test_register_custom_format(clean_registry, tmp_path):
+    register_format(
+        SubtitleFormat(
+            name="Lines",
+            extensions=(".lines",),
+            signature=r"LINES\n",
+            parser=parse_lines,
+            writer=write_lines,
+        )
+    )
+    assert get_format("LINES").name == "lines"
+    assert detect_format("LINES\na\nb") == "lines"
+
+    path = tmp_path / "test.lines"
+    path.write_text("LINES\nfirst\nsecond", encoding="utf-8")
+    subtitle = SubtitleLoader.load(str(path))
+    assert [cue.text for cue in subtitle] == ["first", "second"]
+    assert get_format("lines").write(subtitle) == "LINES\nfirst\nsecond"
+
+
+def test_duplicate_registration(clean_registry):
+    with pytest.raises(ValueError):
+        register_format(SubtitleFormat(name="srt", extensions=(".srt",)))
+    replacement = SubtitleFormat(name="srt", extensions=(".srt",))
+    register_format(replacement, replace=True)
+    assert get_format("srt") is replacement
+    with pytest.raises(UnsupportedFormatError):
+        replacement.parse("a.srt", "")
+
+
+def test_string_references_are_imported_on_first_use(clean_registry, monkeypatch):
+    module = type(sys)("lines_plugin")
+    module.parse_lines = parse_lines
+    monkeypatch.setitem(sys.modules, "lines_plugin", module)
+    fmt = register_format(
+        SubtitleFormat(
+            name="lines",
+            extensions=(".lines",),
+            parser="lines_plugin:parse_lines",
+            validator="lines_plugin:missing",
+        )
+    )
+    assert fmt.parser == "lines_plugin:parse_lines"
+    assert [cue.text for cue in fmt.parse("x.lines", "LINES\nonly").cues] == ["only"]
+    with pytest.raises(AttributeError):
+        fmt.validate("LINES")
@@ -0,0 +1,86 @@
+# tests/test_resegment.py
+# 按规则重新切分字幕：拆分结果满足限制、时间不越界，VTT 标识符和设置被保留
+# Rule based re-segmentation: pieces satisfy the limits and stay inside the cue,
+# VTT identifiers and settings are kept
+
+import pytest
+
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+from fairy_subtitle.resegment import resegment
+
+
+def _subtitle(*cues: Cue) -> Subtitle:
+    for i, cue in enumerate(cues):
+        cue.index = i
+    info = SubtitleInfo(path="test.vtt", format="vtt", duration=0.0, size=len(cues))
+    subtitle = Subtitle(cues=list(cues), info=info)
+    subtitle._recalcluate_duration()
+    return subtitle
+
+
+def test_split_by_chars_at_punctuation():
+    subtitle = _subtitle(Cue(0.0, 6.0, "First sentence. Second sentence here."))
+    resegment(subtitle, max_chars=25)
+    assert [cue.text for cue in subtitle] == [
+        "First sentence.",
+        "Second sentence here.",
+    ]
+    assert subtitle[0].start == 0.0 and subtitle[-1].end == 6.0
+    assert subtitle[0].end == subtitle[1].start
+    assert [cue.index for cue in subtitle] == [0, 1]
+
+
+def test_split_by_lines():
+    subtitle = _subtitle(Cue(0.0, 4.0, "a\nb\nc\nd"))
+    resegment(subtitle, max_lines=2)
+    assert [cue.text for cue in subtitle] == ["a\nb", "c\nd"]
+
+
+def test_pieces_stay_inside_the_cue():
+    subtitle = _subtitle(Cue(1.0004, 1.0016, "one two three four five six"))
+    resegment(subtitle, max_chars=5)
+    for cue in subtitle:
+        assert 1.0004 <= cue.start <= cue.end <= 1.0016
+
+
+def test_short_cues_are_merged():
+    subtitle = _subtitle(Cue(0.0, 0.3, "Hi"), Cue(0.3, 2.0, "there"))
+    resegment(subtitle, min_duration=0.5)
+    assert [(cue.start, cue.end, cue.text) for cue in subtitle] == [
+        (0.0, 2.0, "Hi\nthere")
+    ]
+
+
+def test_split_keeps_vtt_identifier_and_settings():
+    cue = Cue(0.0, 6.0, "First sentence. Second sentence here.")
+    cue.identifier = "intro"
+    cue.settings = "align:start line:10%"
+    subtitle = _subtitle(cue)
+    resegment(subtitle, max_chars=25)
+    assert [piece.identifier for piece in subtitle] == ["intro", None]
+    assert [piece.settings for piece in subtitle] == ["align:start line:10%"] * 2
+
+
+def test_merge_keeps_vtt_identifier_and_settings():
+    first = Cue(0.0, 0.3, "Hi", identifier="greeting", settings="position:20%")
+    second = Cue(0.3, 2.0, "there", identifier="second", settings="align:end")
+    subtitle = _subtitle(first, second)
+    resegment(subtitle, min_duration=0.5)
+    assert (subtitle[0].identifier, subtitle[0].settings) == (
+        "greeting",
+        "position:20%",
+    )
+
+
+@pytest.mark.parametrize(
+    "options", [{"max_lines": 2.0}, {"max_chars": 10.5}, {"max_lines": "2"}]
+)
+def test_non_integer_limits_are_rejected(options):
+    with pytest.raises(TypeError):
+        resegment(_subtitle(Cue(0.0, 1.0, "a\nb\nc")), **options)
+
+
+@pytest.mark.parametrize("options", [{"max_lines": 0}, {"max_duration": -1.0}])
+def test_non_positive_limits_are_rejected(options):
+    with pytest.raises(ValueError):
+        resegment(_subtitle(Cue(0.0, 1.0, "a")), **options)
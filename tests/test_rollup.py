@@ -0,0 +1,65 @@
+# tests/test_rollup.py
+# 合并滚动字幕：只在词的边界处把字幕块视为前一条的延长
+# Collapsing roll-up captions: a cue only extends the previous one at a word boundary
+
+import pytest
+
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+from fairy_subtitle.rollup import collapse_repeats
+
+
+def _subtitle(*texts: str, step: float = 1.0) -> Subtitle:
+    cues = [Cue(i * step, i * step + step, text, i) for i, text in enumerate(texts)]
+    info = SubtitleInfo(
+        path="test.srt", format="srt", duration=len(texts) * step, size=len(texts)
+    )
+    return Subtitle(cues=cues, info=info)
+
+
+def test_roll_up_run_is_collapsed():
+    subtitle = _subtitle("Hello", "Hello there", "Hello there, Tom", "Bye")
+    report = collapse_repeats(subtitle)
+    assert (report.before, report.after, report.removed) == (4, 2, 2)
+    assert [cue.text for cue in subtitle] == ["Hello there, Tom", "Bye"]
+    assert (subtitle[0].start, subtitle[0].end) == (0.0, 3.0)
+    assert [cue.index for cue in subtitle] == [0, 1]
+    assert subtitle.info.size == 2
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [("No", "Nobody came"), ("He", "Hello"), ("12", "123 go")],
+)
+def test_prefix_inside_a_word_is_kept(first, second):
+    subtitle = _subtitle(first, second)
+    collapse_repeats(subtitle)
+    assert [cue.text for cue in subtitle] == [first, second]
+
+
+@pytest.mark.parametrize(
+    "first, second",
+    [("No", "No, sir"), ("No", "No sir"), ("Wait -", "Wait -Tom"), ("你好", "你好世界")],
+)
+def test_prefix_at_a_word_boundary_is_merged(first, second):
+    subtitle = _subtitle(first, second)
+    collapse_repeats(subtitle)
+    assert [cue.text for cue in subtitle] == [second]
+
+
+def test_identical_only_without_prefix():
+    subtitle = _subtitle("Hello", "Hello", "Hello there")
+    collapse_repeats(subtitle, prefix=False)
+    assert [cue.text for cue in subtitle] == ["Hello", "Hello there"]
+
+
+def test_gap_stops_a_run():
+    subtitle = _subtitle("Hello", "Hello there", step=2.0)
+    subtitle.cues[1].start += 1.0
+    collapse_repeats(subtitle, max_gap=0.5)
+    assert len(subtitle.cues) == 2
+
+
+def test_whitespace_is_collapsed_by_default():
+    subtitle = _subtitle("Hello\nthere", "Hello there  Tom")
+    collapse_repeats(subtitle)
+    assert [cue.text for cue in subtitle] == ["Hello there  Tom"]
@@ -0,0 +1,72 @@
+# tests/test_scanner.py
+# C 扫描器与纯 Python 扫描器在同一语料上的结果必须完全一致
+# The C scanner and the pure-Python scanner must return identical columns on the
+# same corpus
+
+import os
+
+import pytest
+
+from fairy_subtitle.formats.scanner import scan_blocks_py
+
+_scanner = pytest.importorskip(
+    "fairy_subtitle._scanner", reason="C scanner extension is not built"
+)
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), os.pardir, "examples")
+
+CORPUS = {
+    "srt": (
+        "1\n00:00:01,000 --> 00:00:02,500\nHello\n\n"
+        "2\n00:00:03,000 --> 00:00:04,000 X1:10 X2:20\nWorld\nsecond line\n"
+    ),
+    "vtt": (
+        "WEBVTT - header\n\nSTYLE\n::cue { color: red }\n\n"
+        "intro\n00:01.000 --> 00:02.000 align:start position:10%\nHi\n\n"
+        "NOTE a comment --> with an arrow\n\n"
+        "01:00:00.000 --> 01:00:01.250\nAn hour in\n"
+    ),
+    "crlf": (
+        "1\r\n00:00:01,000 --> 00:00:02,000\r\nCRLF text\r\n\r\n"
+        "2\r\n00:00:03,000 --> 00:00:04,000\r\nmore\r\n"
+    ),
+    "bom": "\ufeff1\n00:00:01,000 --> 00:00:02,000\nBOM first block\n",
+    "missing_arrow": (
+        "1\n00:00:01,000 00:00:02,000\nno arrow\n\n"
+        "2\n00:00:03,000 -> 00:00:04,000\nshort arrow\n\n"
+        "3\n-->\nbare arrow\n\n"
+        "4\n00:00:05,000 -->\nno end time\n"
+    ),
+    "long_digits": (
+        "1\n0000000001:00:00,000 --> 00:00:01,000\nten digit hours\n\n"
+        "2\n999999999:59:59,999 --> 999999999:59:59,999\nnine digits\n\n"
+        "3\n00:00:01,0000000000 --> 00:00:02,000\nlong fraction\n\n"
+        "4\n00:00:01,000 --> 00:00:02,0001\nfour digit fraction\n"
+    ),
+    "non_ascii": (
+        "1\n00:00:01,000 --> 00:00:02,000\n你好，世界\n\n"
+        "2\n\uff10\uff10:00:03,000 --> 00:00:04,000\nfullwidth digits\n\n"
+        "3\n00:00:05,000\u00a0--> 00:00:06,000\nno-break space\n\n"
+        "4\n00:00:07,000 --> 00:00:08,000\n\U0001f600 emoji \U0001d49c\n"
+    ),
+    "blank_lines": "\n\n  \n1\n00:00:01,000 --> 00:00:02,000\n  indented  \n \t\n\n",
+    "empty": "",
+    "only_text": "no timing at all\nsecond line",
+}
+
+
+def _corpus():
+    for name, text in CORPUS.items():
+        yield name, text
+    for file_name in sorted(os.listdir(EXAMPLES)):
+        if file_name.endswith((".srt", ".vtt", ".sbv")):
+            with open(os.path.join(EXAMPLES, file_name), encoding="utf-8") as f:
+                yield file_name, f.read()
+
+
+@pytest.mark.parametrize("decimal", [",", "."])
+@pytest.mark.parametrize("name, text", list(_corpus()))
+def test_c_scanner_matches_python(name, text, decimal):
+    expected = [list(column) for column in scan_blocks_py(text, decimal)]
+    actual = [list(column) for column in _scanner.scan_blocks(text, decimal)]
+    assert actual == expected
@@ -0,0 +1,141 @@
+# tests/test_search.py
+# 全文索引：短语查询的结果与逐个字幕块检查的结果一致
+# Full-text index: phrase queries match a brute-force check of every cue
+
+import random
+
+import pytest
+
+from fairy_subtitle.exceptions import SubtitleError
+from fairy_subtitle.search import SearchHit, SubtitleIndex, normalize, tokenize
+
+WORDS = ["see", "you", "tomorrow", "good", "night", "Good", "NIGHT", "again"]
+
+
+def _srt(texts: list) -> str:
+    blocks = [
+        f"{i + 1}\n00:00:{i:02d},000 --> 00:00:{i:02d},500\n{text}"
+        for i, text in enumerate(texts)
+    ]
+    return "\n\n".join(blocks) + "\n"
+
+
+def _write(path, texts: list) -> str:
+    path.write_text(_srt(texts), encoding="utf-8")
+    return str(path)
+
+
+def _matches(text: str, phrase: str) -> bool:
+    words = [token for _, token in tokenize(text)]
+    query = [token for _, token in tokenize(phrase)]
+    return any(
+        words[i : i + len(query)] == query for i in range(len(words) - len(query) + 1)
+    )
+
+
+@pytest.fixture
+def index(tmp_path):
+    with SubtitleIndex(str(tmp_path / "library.idx")) as index:
+        yield index
+
+
+def test_random_phrases_match_brute_force(index, tmp_path):
+    rng = random.Random(3)
+    files = {}
+    for n in range(6):
+        texts = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 6)))
+            for _ in range(30)
+        ]
+        files[_write(tmp_path / f"episode{n}.srt", texts)] = texts
+    assert index.update(files, workers=2) == []
+    assert len(index) == len(files)
+
+    for _ in range(40):
+        phrase = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+        expected = sorted(
+            SearchHit(path, i, float(i))
+            for path, texts in files.items()
+            for i, text in enumerate(texts)
+            if _matches(text, phrase)
+        )
+        assert index.search(phrase) == expected
+        assert index.search(phrase, limit=2) == expected[:2]
+
+
+def test_normalization(index, tmp_path):
+    path = _write(
+        tmp_path / "a.srt",
+        ["<i>Ｓｅｅ</i> YOU tomorrow", "see\\Nyou", "{\\b1}see{\\b0} them"],
+    )
+    index.update([path], workers=1)
+    assert [hit.cue for hit in index.search("see you")] == [0, 1]
+    assert [hit.cue for hit in index.search("SEE")] == [0, 1, 2]
+    assert normalize("Ｓｅｅ") == "see"
+
+
+def test_cjk_phrases(index, tmp_path):
+    path = _write(tmp_path / "zh.srt", ["你好吗", "我很好", "你们好", "好"])
+    index.update([path], workers=1)
+    assert [hit.cue for hit in index.search("你好")] == [0]
+    assert [hit.cue for hit in index.search("好吗")] == [0]
+    assert [hit.cue for hit in index.search("很好")] == [1]
+    # 单个汉字按前缀匹配，包括以它开头的双字词 / A single character is a prefix
+    assert [hit.cue for hit in index.search("好")] == [0, 1, 2, 3]
+    assert [hit.cue for hit in index.search("你")] == [0, 2]
+    assert index.search("好你") == []
+    assert tokenize("你好吗") == [(0, "你好"), (1, "好吗"), (2, "吗")]
+
+
+def test_update_skips_unchanged_and_reindexes_modified(index, tmp_path):
+    path = _write(tmp_path / "a.srt", ["good night"])
+    missing = str(tmp_path / "missing.srt")
+    failures = index.update([path, missing], workers=1)
+    assert [p for p, _ in failures] == [missing]
+    assert index.search("night") == [SearchHit(path, 0, 0.0)]
+
+    _write(tmp_path / "a.srt", ["see you", "good morning"])
+    index.update([path], workers=1)
+    assert index.search("night") == []
+    assert index.search("morning") == [SearchHit(path, 1, 1.0)]
+
+
+def test_parse_failures_are_reported(index, tmp_path):
+    bad = tmp_path / "bad.srt"
+    bad.write_text("1\n00:00:0x,000 --> 00:00:01,000\nbroken\n", encoding="utf-8")
+    ((path, error),) = index.update([str(bad)], workers=1)
+    assert isinstance(error, SubtitleError)
+    assert path == str(bad)
+    assert str(bad) not in index
+
+
+def test_remove_and_prune(index, tmp_path):
+    a = _write(tmp_path / "a.srt", ["good night"])
+    b = _write(tmp_path / "b.srt", ["good night"])
+    index.update([a, b], workers=1)
+    assert index.remove(a)
+    assert not index.remove(a)
+    assert [hit.path for hit in index.search("good night")] == [b]
+
+    (tmp_path / "b.srt").unlink()
+    assert index.prune() == [b]
+    assert len(index) == 0
+    assert index.search("good") == []
+
+
+def test_index_is_persistent(tmp_path):
+    path = _write(tmp_path / "a.srt", ["see you"])
+    with SubtitleIndex(str(tmp_path / "library.idx")) as index:
+        index.update([path], workers=1)
+    with SubtitleIndex(str(tmp_path / "library.idx")) as index:
+        assert path in index
+        assert index.update([path], workers=1) == []
+        assert index.search("you") == [SearchHit(path, 0, 0.0)]
+
+
+def test_many_matching_files(index, tmp_path):
+    # 超过一次查询绑定的文件 ID 数量 / More files than ids bound per query
+    paths = [_write(tmp_path / f"{n:04d}.srt", ["see you"]) for n in range(950)]
+    index.update(paths, workers=2, chunksize=64)
+    hits = index.search("see you")
+    assert [hit.path for hit in hits] == sorted(paths)
@@ -0,0 +1,85 @@
+# tests/test_shared.py
+# 共享字幕：已发布的版本不受之后的修改影响，失败的修改被完整回滚
+# Shared subtitles: published versions are not affected by later edits, and failed
+# edits are rolled back completely
+
+import os
+import threading
+
+import pytest
+
+from fairy_subtitle import SharedSubtitle, SubtitleLoader
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), os.pardir, "examples")
+
+
+@pytest.fixture
+def shared():
+    return SharedSubtitle(SubtitleLoader.load(os.path.join(EXAMPLES, "example.ass")))
+
+
+def _font(info) -> str:
+    return info.other_info.v4_Styles["Default"][1]
+
+
+def test_style_edit_is_not_seen_before_publishing(shared):
+    published = shared.current
+    with shared.edit() as subtitle:
+        subtitle.info.other_info.v4_Styles["Default"][1] = "Comic Sans"
+        assert _font(shared.current.info) == "Arial"
+    assert _font(published.info) == "Arial"
+    assert _font(shared.current.info) == "Comic Sans"
+    assert shared.version.number == 1
+
+
+def test_published_version_is_frozen(shared):
+    with shared.edit() as subtitle:
+        subtitle.info.other_info.script_Info["Title"] = "v1"
+    version = shared.current
+    with shared.edit() as subtitle:
+        subtitle.info.other_info.script_Info["Title"] = "v2"
+    version.info.other_info.script_Info["Title"] = "reader"
+    assert version.info.other_info.script_Info["Title"] == "v1"
+    assert shared.to_subtitle().info.other_info.script_Info["Title"] == "v2"
+
+
+def test_failed_edit_is_rolled_back(shared):
+    size = len(shared.current)
+    with pytest.raises(RuntimeError):
+        with shared.edit() as subtitle:
+            subtitle.remove(0)
+            subtitle.info.other_info.v4_Styles["Default"][1] = "Comic Sans"
+            raise RuntimeError("abort")
+    assert shared.version.number == 0
+    with shared.edit() as subtitle:
+        assert len(subtitle.cues) == size
+        assert _font(subtitle.info) == "Arial"
+
+
+def test_source_subtitle_is_copied():
+    subtitle = SubtitleLoader.load(os.path.join(EXAMPLES, "example.srt"))
+    shared = SharedSubtitle(subtitle)
+    subtitle.remove(0)
+    assert len(shared.current) == len(subtitle.cues) + 1
+
+
+def test_readers_see_whole_edits(shared):
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        while not stop.is_set():
+            snapshot = shared.current
+            if snapshot.info.size != len(snapshot):
+                errors.append(len(snapshot))
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    for _ in range(50):
+        shared.update(lambda subtitle: subtitle.merge(0, 1))
+    stop.set()
+    for reader in readers:
+        reader.join()
+    assert errors == []
+    assert shared.version.number == 50
@@ -0,0 +1,128 @@
+# tests/test_similar.py
+# 相似字幕查找：前缀过滤找到的字幕块对与两两比较的结果一致
+# Near-duplicate search: prefix filtering finds the same pairs as comparing every pair
+
+import itertools
+import random
+
+import pytest
+
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+from fairy_subtitle.similar import Normalizer, SimilarityIndex, find_similar
+
+BASE = [
+    "I'll see you tomorrow at the station.",
+    "Where did you put the keys?",
+    "我们明天在车站见面吧。",
+    "Yes.",
+    "Don't go.",
+]
+
+
+def _subtitle(path: str, texts: list) -> Subtitle:
+    cues = [Cue(i * 2.0, i * 2.0 + 1.0, text, i) for i, text in enumerate(texts)]
+    info = SubtitleInfo(path=path, format="srt", duration=0.0, size=len(cues))
+    return Subtitle(cues=cues, info=info)
+
+
+def _mutate(text: str, rng: random.Random) -> str:
+    # OCR 式的小错误 / Small OCR-like errors
+    chars = list(text)
+    for _ in range(rng.randrange(3)):
+        i = rng.randrange(len(chars))
+        choice = rng.random()
+        if choice < 0.4:
+            chars[i] = rng.choice("l1I0Oo,. ")
+        elif choice < 0.7:
+            del chars[i]
+        else:
+            chars.insert(i, rng.choice("abc"))
+        if not chars:
+            chars = ["x"]
+    if rng.random() < 0.2:
+        return "<i>" + "".join(chars).upper() + "</i>"
+    return "".join(chars)
+
+
+def _brute_force(subtitles: dict, threshold: float, ngram: int, same_source: bool):
+    index = SimilarityIndex(ngram)
+    refs = []
+    for source, subtitle in subtitles.items():
+        for i, cue in enumerate(subtitle.cues):
+            key = index.normalize(cue.text)
+            if key:
+                refs.append(((source, i), index._shingles(key)))
+    expected = {}
+    for (a, x), (b, y) in itertools.combinations(refs, 2):
+        if not same_source and a[0] == b[0]:
+            continue
+        overlap = len(x & y)
+        similarity = overlap / (len(x) + len(y) - overlap)
+        if similarity >= threshold:
+            expected[frozenset((a, b))] = similarity
+    return expected
+
+
+@pytest.mark.parametrize("threshold", [0.3, 0.5, 0.8, 1.0])
+@pytest.mark.parametrize("ngram", [2, 3])
+def test_pairs_match_brute_force(threshold, ngram):
+    rng = random.Random(int(threshold * 10) + ngram)
+    subtitles = {
+        f"file{n}": _subtitle(
+            f"file{n}.srt", [_mutate(rng.choice(BASE), rng) for _ in range(25)]
+        )
+        for n in range(4)
+    }
+    for same_source in (True, False):
+        pairs = find_similar(subtitles, threshold, ngram, same_source=same_source)
+        found = {
+            frozenset(((p.a.source, p.a.index), (p.b.source, p.b.index))): p.similarity
+            for p in pairs
+        }
+        assert len(found) == len(pairs)
+        assert found == _brute_force(subtitles, threshold, ngram, same_source)
+        similarities = [pair.similarity for pair in pairs]
+        assert similarities == sorted(similarities, reverse=True)
+
+
+def test_identical_texts_are_grouped():
+    subtitle = _subtitle("a.srt", ["Yes.", "YES.", "<b>yes.</b>", "No."])
+    index = SimilarityIndex().add("a", subtitle)
+    assert len(index) == 4
+    pairs = index.pairs(threshold=1.0)
+    assert [(p.a.index, p.b.index, p.similarity) for p in pairs] == [
+        (0, 1, 1.0),
+        (0, 2, 1.0),
+        (1, 2, 1.0),
+    ]
+    assert pairs[0].a.text == "Yes."
+
+
+def test_subtitles_are_named_by_path():
+    a = _subtitle("a.srt", ["Where did you put the keys?"])
+    b = _subtitle("b.srt", ["Where did you put the kcys?"])
+    (pair,) = find_similar([a, b], threshold=0.5)
+    assert (pair.a.source, pair.b.source) == ("a.srt", "b.srt")
+
+
+def test_normalizer_options():
+    assert Normalizer()("<i>Ｈｅｌｌｏ</i>\\NWorld") == "hello world"
+    assert Normalizer(case=False)("Hello") == "Hello"
+    assert Normalizer(markup=False)("<i>a</i>") == "<i>a</i>"
+    assert Normalizer(punctuation=True)("Don't... go!") == "don t go"
+    assert Normalizer(width=False)("Ｈｅｌｌｏ") == "ｈｅｌｌｏ"
+
+
+def test_empty_texts_are_skipped():
+    index = SimilarityIndex().add("a", _subtitle("a.srt", ["", "<i></i>", " "]))
+    assert len(index) == 0
+    assert index.pairs() == []
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        SimilarityIndex(ngram=0)
+    with pytest.raises(ValueError):
+        SimilarityIndex().pairs(threshold=0)
+    with pytest.raises(ValueError):
+        SimilarityIndex().pairs(threshold=1.5)
@@ -0,0 +1,102 @@
+# tests/test_timeline.py
+# 预编译时间轴：任意时间点显示的字幕块与逐个检查字幕块的结果一致
+# Precompiled timeline: the cues visible at any time match a brute-force check
+
+import random
+
+import pytest
+
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+from fairy_subtitle.timeline import Timeline, compile_timeline
+
+
+def _subtitle(cues: list) -> Subtitle:
+    for i, cue in enumerate(cues):
+        cue.index = i
+    info = SubtitleInfo(path="test.srt", format="srt", duration=0.0, size=len(cues))
+    return Subtitle(cues=cues, info=info)
+
+
+def _random_subtitle(seed: int, count: int = 300) -> Subtitle:
+    rng = random.Random(seed)
+    cues = []
+    for i in range(count):
+        # 整数百分之一秒，制造大量相同的边界 / Whole centiseconds, many shared bounds
+        start = rng.randrange(0, 60000) / 100
+        end = start + rng.choice([0, 50, 100, 250, 700]) / 100
+        cues.append(Cue(start, end, f"cue {i}"))
+    return _subtitle(cues)
+
+
+def _visible(subtitle: Subtitle, time: float) -> tuple:
+    return tuple(
+        i for i, cue in enumerate(subtitle.cues) if cue.start <= time < cue.end
+    )
+
+
+def _sample_times(subtitle: Subtitle, seed: int) -> list:
+    rng = random.Random(seed)
+    bounds = [t for cue in subtitle.cues for t in (cue.start, cue.end)]
+    return sorted(bounds + [rng.uniform(-5, 620) for _ in range(500)])
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_active_matches_brute_force(seed):
+    subtitle = _random_subtitle(seed)
+    timeline = compile_timeline(subtitle)
+    for time in _sample_times(subtitle, seed):
+        assert timeline.active(time) == _visible(subtitle, time)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_cursor_playback_and_seeking(seed):
+    subtitle = _random_subtitle(seed)
+    timeline = compile_timeline(subtitle)
+    cursor = timeline.cursor()
+    times = _sample_times(subtitle, seed)
+    for time in times:
+        assert cursor(time) == _visible(subtitle, time)
+    # 向后跳转 / Jumping backwards
+    for time in reversed(times[::37]):
+        assert cursor.advance(time) == _visible(subtitle, time)
+    assert cursor.seek(times[0]) == _visible(subtitle, times[0])
+
+
+def test_segments_are_merged_and_empty_cues_skipped():
+    subtitle = _subtitle(
+        [Cue(0.0, 2.0, "a"), Cue(2.0, 4.0, "a again"), Cue(3.0, 3.0, "empty")]
+    )
+    timeline = compile_timeline(subtitle)
+    assert list(timeline.boundaries) == [0.0, 2.0, 4.0]
+    assert timeline.segments == [(0,), (1,)]
+    assert timeline.active(3.0) == (1,)
+    assert timeline.active(4.0) == ()
+    assert [cue.text for cue in timeline.active_cues(1.0)] == ["a"]
+
+
+def test_empty_subtitle():
+    timeline = compile_timeline(_subtitle([]))
+    assert len(timeline) == 0
+    assert timeline.active(1.0) == ()
+    assert timeline.cursor()(1.0) == ()
+
+
+def test_save_and_load(tmp_path):
+    subtitle = _random_subtitle(5, count=50)
+    timeline = compile_timeline(subtitle)
+    path = tmp_path / "timeline.json"
+    timeline.save(str(path))
+    loaded = Timeline.load(str(path))
+    assert list(loaded.boundaries) == list(timeline.boundaries)
+    assert loaded.segments == timeline.segments
+    assert [(c.start, c.end, c.text) for c in loaded.cues] == [
+        (c.start, c.end, c.text) for c in subtitle.cues
+    ]
+
+
+def test_from_dict_rejects_other_versions():
+    data = compile_timeline(_random_subtitle(1, count=5)).to_dict()
+    with pytest.raises(ValueError):
+        Timeline.from_dict({**data, "version": 99})
+    with pytest.raises(ValueError):
+        Timeline.from_dict({**data, "segments": data["segments"][:-1]})
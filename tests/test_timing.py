@@ -0,0 +1,101 @@
+# tests/test_timing.py
+# 帧精确的时间模型：Cue 中的浮点秒数在 NTSC 帧率下也能无损地往返帧号
+# Frame accurate timing: the float seconds stored in Cue round-trip frame numbers
+# exactly, NTSC framerates included
+
+from fractions import Fraction
+
+import pytest
+
+from fairy_subtitle import SubtitleLoader
+from fairy_subtitle.formats.sub import to_sub
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo
+from fairy_subtitle.timing import (
+    Timebase,
+    convert_framerate,
+    format_framerate,
+    parse_framerate,
+    snap_to_frames,
+)
+
+NTSC = ["23.976", "29.97", "59.94"]
+THREE_HOURS = 3 * 3600
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("23.976", Fraction(24000, 1001)),
+        (29.97, Fraction(30000, 1001)),
+        ("24000/1001", Fraction(24000, 1001)),
+        (25, Fraction(25)),
+        ("25.5", Fraction(51, 2)),
+    ],
+)
+def test_parse_framerate(value, expected):
+    assert parse_framerate(value) == expected
+
+
+@pytest.mark.parametrize("framerate", NTSC + ["25"])
+def test_frames_round_trip_through_float_seconds(framerate):
+    timebase = Timebase(framerate)
+    frames = int(THREE_HOURS * timebase.framerate)
+    for frame in range(0, frames, 61):
+        seconds = timebase.frame_to_seconds(frame)
+        assert timebase.seconds_to_frame(seconds) == frame
+        assert timebase.seconds_to_frame(seconds, "floor") == frame
+        assert timebase.seconds_to_frame(seconds, "ceil") == frame
+
+
+@pytest.mark.parametrize("framerate", NTSC)
+def test_milliseconds_and_centiseconds_round_trip(framerate):
+    timebase = Timebase(framerate)
+    for ms in range(0, THREE_HOURS * 1000, 9973):
+        assert timebase.to_ms(timebase.from_seconds(ms / 1000)) == ms
+    for cs in range(0, THREE_HOURS * 100, 997):
+        assert timebase.to_centiseconds(timebase.from_seconds(cs / 100)) == cs
+
+
+@pytest.mark.parametrize("framerate", ["23.976", "29.97"])
+def test_microdvd_file_round_trip(framerate, tmp_path):
+    last = int(THREE_HOURS * parse_framerate(framerate))
+    blocks = [(frame, frame + 37) for frame in range(0, last, 4001)]
+    content = f"{{1}}{{1}}{framerate}\n" + "\n".join(
+        f"{{{start}}}{{{end}}}line {start}" for start, end in blocks
+    )
+    path = tmp_path / "movie.sub"
+    path.write_text(content, encoding="utf-8")
+    subtitle = SubtitleLoader.load(str(path))
+    assert subtitle.info.other_info["fps"] == parse_framerate(framerate)
+
+    written = to_sub(subtitle).splitlines()
+    assert written[0] == f"{{0}}{{0}}#$#{format_framerate(framerate)}"
+    assert written[1:] == content.splitlines()[1:]
+
+
+def _subtitle(*times: tuple) -> Subtitle:
+    cues = [Cue(start, end, f"line {i}", i) for i, (start, end) in enumerate(times)]
+    info = SubtitleInfo(path="test.srt", format="srt", duration=0.0, size=len(cues))
+    return Subtitle(cues=cues, info=info)
+
+
+def test_snap_to_frames_is_idempotent():
+    subtitle = _subtitle((1.0, 2.5), (3600.123, 3601.987))
+    snap_to_frames(subtitle, "23.976")
+    once = [(cue.start, cue.end) for cue in subtitle]
+    snap_to_frames(subtitle, "23.976")
+    assert [(cue.start, cue.end) for cue in subtitle] == once
+    timebase = Timebase("23.976")
+    assert timebase.seconds_to_frame(once[1][0]) == 86317
+
+
+def test_convert_framerate_there_and_back():
+    timebase = Timebase(25)
+    times = [
+        (timebase.frame_to_seconds(frame), timebase.frame_to_seconds(frame + 50))
+        for frame in range(0, 270000, 9001)
+    ]
+    subtitle = _subtitle(*times)
+    convert_framerate(subtitle, 25, "23.976")
+    convert_framerate(subtitle, "23.976", 25)
+    assert [(cue.start, cue.end) for cue in subtitle] == times
@@ -0,0 +1,88 @@
+# tests/test_views.py
+# find / filter_by_time 返回的视图与父对象互不影响
+# Views returned by find / filter_by_time never affect their parent, and the parent
+# never affects them
+
+import os
+
+import pytest
+
+from fairy_subtitle import SubtitleLoader
+from fairy_subtitle.models import Cue, Subtitle, SubtitleInfo, VttInfo
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), os.pardir, "examples")
+
+
+@pytest.fixture
+def subtitle():
+    cues = [
+        Cue(1.0, 2.0, "apple", 0),
+        Cue(3.0, 4.0, "banana", 1),
+        Cue(5.0, 6.0, "apple pie", 2),
+        Cue(7.0, 9.0, "cherry", 3),
+    ]
+    info = SubtitleInfo(
+        path="test.vtt",
+        format="vtt",
+        duration=8.0,
+        size=4,
+        other_info=VttInfo(header="", styles=["::cue { color: red }"]),
+        diagnostics=[],
+    )
+    return Subtitle(cues=cues, info=info)
+
+
+def test_size_and_duration(subtitle):
+    view = subtitle.find("apple")
+    assert len(view) == view.info.size == 2
+    assert view.info.duration == 5.0
+    assert not view.is_copied
+
+
+def test_changing_cues_read_from_view(subtitle):
+    view = subtitle.find("apple")
+    for cue in view:
+        cue.start += 100
+    assert [cue.start for cue in subtitle] == [1.0, 3.0, 5.0, 7.0]
+    assert [cue.start for cue in view] == [101.0, 105.0]
+    assert view[0] is view.cues[0]
+
+
+def test_view_methods_do_not_touch_parent(subtitle):
+    view = subtitle.filter_by_time(2.5, 6.5)
+    view.shift(10)
+    assert view.is_copied
+    assert [cue.start for cue in view] == [13.0, 15.0]
+    assert [cue.start for cue in subtitle] == [1.0, 3.0, 5.0, 7.0]
+
+
+def test_parent_changes_do_not_reach_view(subtitle):
+    view = subtitle.find("apple")
+    subtitle.shift(1)
+    assert [cue.start for cue in view] == [1.0, 5.0]
+
+
+def test_view_of_view_sees_changed_cues(subtitle):
+    view = subtitle.find("apple")
+    view[1].text = "apple tart"
+    inner = view.find("tart")
+    assert [cue.text for cue in inner] == ["apple tart"]
+    assert subtitle[2].text == "apple pie"
+
+
+def test_info_is_copied(subtitle):
+    view = subtitle.find("apple")
+    view.info.other_info.styles.append("::cue { color: blue }")
+    view.info.diagnostics.append("note")
+    assert subtitle.info.other_info.styles == ["::cue { color: red }"]
+    assert subtitle.info.diagnostics == []
+
+
+def test_ass_view_keeps_selected_events():
+    subtitle = SubtitleLoader.load(os.path.join(EXAMPLES, "example.ass"))
+    view = subtitle.find("欢")
+    ass_info = view.info.other_info
+    assert len(ass_info.rows) == len(view) == 1
+    ass_info.rows[0].fields[3] = "Default"
+    assert subtitle.info.other_info.rows[27].fields[3] == "Karaoke"
+    assert ",Default,," in view.to_ass().split("[Events]")[1]
@@ -0,0 +1,135 @@
+# tests/test_watch.py
+# 文件监视：增量重新加载的结果与完整解析文件的结果一致
+# File watching: an incremental reload gives the same result as parsing the whole file
+
+import os
+import random
+
+import pytest
+
+from fairy_subtitle import SubtitleLoader
+from fairy_subtitle.diagnostics import COLLECT
+from fairy_subtitle.watch import SubtitleWatcher
+
+
+def _srt_block(i: int, rng: random.Random) -> str:
+    start = i * 3
+    if rng.random() < 0.1:
+        return f"{i + 1}\n00:00:0x,000 --> 00:00:01,000\nbroken"
+    time = f"00:{start // 60:02d}:{start % 60:02d}"
+    return f"{i + 1}\n{time},000 --> {time},900\nline {rng.randrange(1000)}"
+
+
+def _vtt_block(i: int, rng: random.Random) -> str:
+    start = i * 3
+    choice = rng.random()
+    if choice < 0.1:
+        return f"NOTE comment {rng.randrange(1000)}"
+    if choice < 0.15:
+        return "STYLE\n::cue { color: yellow }"
+    settings = " align:start" if choice < 0.3 else ""
+    time = f"00:{start // 60:02d}:{start % 60:02d}"
+    return (
+        f"cue-{rng.randrange(1000)}\n{time}.000 --> {time}.900{settings}\n"
+        f"line {rng.randrange(1000)}"
+    )
+
+
+def _sbv_block(i: int, rng: random.Random) -> str:
+    start = i * 3
+    time = f"0:{start // 60:02d}:{start % 60:02d}"
+    return f"{time}.000,{time}.900\nline {rng.randrange(1000)}"
+
+
+FORMATS = {
+    "srt": ("", _srt_block),
+    "vtt": ("WEBVTT\n\n", _vtt_block),
+    "sbv": ("", _sbv_block),
+}
+
+
+def _state(subtitle) -> tuple:
+    cues = [
+        (c.start, c.end, c.text, c.index, c.identifier, c.settings)
+        for c in subtitle.cues
+    ]
+    info = subtitle.info
+    return cues, info.size, info.diagnostics, info.other_info
+
+
+def _write(path, header: str, blocks: list, padding: str = ""):
+    path.write_text(padding + header + "\n\n".join(blocks) + "\n", encoding="utf-8")
+
+
+@pytest.mark.parametrize("name", list(FORMATS))
+def test_random_edits_match_full_parse(name, tmp_path):
+    header, make_block = FORMATS[name]
+    rng = random.Random(11)
+    blocks = [make_block(i, rng) for i in range(40)]
+    path = tmp_path / f"watched.{name}"
+    _write(path, header, blocks)
+    watcher = SubtitleWatcher(str(path), errors=COLLECT)
+    subtitle = watcher.subtitle
+
+    for step in range(60):
+        choice = rng.random()
+        i = rng.randrange(len(blocks))
+        if choice < 0.4:
+            blocks[i] = make_block(i, rng)
+        elif choice < 0.6 and len(blocks) > 1:
+            del blocks[i]
+        elif choice < 0.8:
+            blocks.insert(i, make_block(i, rng))
+        else:
+            blocks[i] = blocks[i] + "\nextra line"
+        padding = "\n" * rng.randrange(2) if step % 7 == 0 else ""
+        _write(path, header, blocks, padding)
+
+        assert watcher.reload() is subtitle
+        expected = SubtitleLoader.load(str(path), errors=COLLECT)
+        assert _state(subtitle) == _state(expected)
+
+
+def test_poll_detects_changes(tmp_path):
+    path = tmp_path / "watched.srt"
+    path.write_text("1\n00:00:01,000 --> 00:00:02,000\nfirst\n", encoding="utf-8")
+    watcher = SubtitleWatcher(str(path))
+    assert not watcher.poll()
+    path.write_text(
+        "1\n00:00:01,000 --> 00:00:02,000\nfirst, longer\n", encoding="utf-8"
+    )
+    assert watcher.poll()
+    assert watcher.subtitle.cues[0].text == "first, longer"
+
+
+def test_ass_is_fully_reparsed(tmp_path):
+    examples = os.path.join(os.path.dirname(__file__), os.pardir, "examples")
+    with open(os.path.join(examples, "example.ass"), encoding="utf-8") as f:
+        content = f.read()
+    path = tmp_path / "watched.ass"
+    path.write_text(content, encoding="utf-8")
+    watcher = SubtitleWatcher(str(path))
+    path.write_text(content.replace("普通文本显示", "changed"), encoding="utf-8")
+    watcher.reload()
+    assert watcher.subtitle.cues[0].text == "changed"
+
+
+def test_direct_edits_fall_back_to_full_parse(tmp_path):
+    path = tmp_path / "watched.srt"
+    blocks = [
+        f"{i + 1}\n00:00:0{i},000 --> 00:00:0{i},500\nline {i}"
+        for i in range(5)
+    ]
+    path.write_text("\n\n".join(blocks), encoding="utf-8")
+    watcher = SubtitleWatcher(str(path))
+    watcher.subtitle.remove(0)
+    blocks[3] = blocks[3].replace("line 3", "changed")
+    path.write_text("\n\n".join(blocks), encoding="utf-8")
+    watcher.reload()
+    assert [cue.text for cue in watcher.subtitle] == [
+        "line 0",
+        "line 1",
+        "line 2",
+        "changed",
+        "line 4",
+    ]